@@ -0,0 +1,4 @@
+"""ASGI-точка входа: uvicorn asgi:application. Загрузки заказов принимаются асинхронно, остальное обслуживает Flask"""
+from photolab.ingest import create_asgi_app
+
+application = create_asgi_app()
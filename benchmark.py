@@ -0,0 +1,314 @@
+"""Нагрузочное тестирование PhotoLab.
+
+Режимы:
+    python benchmark.py client                            - маршруты через Flask test client
+    python benchmark.py http --url http://localhost:1245  - многопроцессный HTTP-генератор нагрузки
+    python benchmark.py startup                           - время импорта и создания приложения
+    python benchmark.py rows --rows 1000                  - чтение списка заказов: ORM-объекты против select()
+
+Базу нужного размера готовит команда flask generate-data. Результат прогона
+можно сохранить как эталон (--save-baseline) и сравнить с ним (--baseline).
+"""
+import argparse
+import http.cookiejar
+import json
+import multiprocessing
+import subprocess
+import sys
+import time
+import tracemalloc
+import urllib.error
+import urllib.parse
+import urllib.request
+
+# Ключевые маршруты: имя -> (роль, путь)
+ROUTES = {
+    'admin_dashboard': ('staff', '/admin_dashboard'),
+    'api_orders': ('staff', '/api/orders'),
+    'search_orders': ('staff', '/search_orders?q=PL&status=pending'),
+    'reports': ('staff', '/reports'),
+    'production_queue': ('staff', '/production_queue'),
+    'order_details': ('staff', '/order/{order_id}'),
+    'client_dashboard': ('client', '/client_dashboard'),
+}
+
+def percentile(sorted_values, fraction):
+    """Перцентиль по ближайшему рангу"""
+    if not sorted_values:
+        return None
+    rank = max(int(fraction * len(sorted_values) + 0.999999) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+def summarize(latencies, errors, elapsed):
+    result = {}
+    for name, values in latencies.items():
+        values = sorted(values)
+        result[name] = {
+            'requests': len(values),
+            'errors': errors.get(name, 0),
+            'rps': len(values) / elapsed[name] if elapsed.get(name) else 0,
+            'p50_ms': percentile(values, 0.50),
+            'p95_ms': percentile(values, 0.95),
+            'p99_ms': percentile(values, 0.99),
+        }
+    return result
+
+def run_client(args):
+    """Прогоняет маршруты последовательно через Flask test client"""
+    from photolab import create_app
+    from photolab.extensions import db
+    from photolab.models import Order, User
+
+    # Лимиты частоты запросов рассчитаны на людей, а не на прогон тысяч запросов подряд
+    app = create_app({'RATELIMIT_ENABLED': False})
+    with app.app_context():
+        staff = User.query.filter(User.role.in_(['admin', 'employee'])).first()
+        client = User.query.filter_by(role='client').first()
+        order_id = args.order_id or db.session.query(db.func.max(Order.id)).scalar()
+
+    test_clients = {}
+    for role, user in (('staff', staff), ('client', client)):
+        if user is None:
+            continue
+        test_client = app.test_client()
+        # Логин через сессию: у сгенерированных пользователей общий пароль, но хешировать его на каждый прогон незачем
+        with test_client.session_transaction() as session:
+            session['_user_id'] = str(user.id)
+            session['_fresh'] = True
+        test_clients[role] = test_client
+
+    latencies, errors, elapsed = {}, {}, {}
+    for name in args.routes:
+        role, path = ROUTES[name]
+        if role not in test_clients or (order_id is None and '{order_id}' in path):
+            print(f'{name}: пропущен, нет данных', file=sys.stderr)
+            continue
+        path = path.format(order_id=order_id)
+        test_client = test_clients[role]
+
+        for _ in range(args.warmup):
+            test_client.get(path)
+
+        values = latencies[name] = []
+        started = time.perf_counter()
+        for _ in range(args.requests):
+            request_started = time.perf_counter()
+            response = test_client.get(path)
+            values.append((time.perf_counter() - request_started) * 1000)
+            if response.status_code != 200:
+                errors[name] = errors.get(name, 0) + 1
+        elapsed[name] = time.perf_counter() - started
+
+    return summarize(latencies, errors, elapsed)
+
+def _login_opener(base_url, credentials):
+    opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()))
+    username, password = credentials.split(':', 1)
+    data = urllib.parse.urlencode({'username': username, 'password': password}).encode()
+    opener.open(base_url + '/login', data=data).read()
+    return opener
+
+def _http_worker(job):
+    """Один процесс генератора: крутит маршруты по кругу до истечения времени"""
+    base_url, credentials, routes, duration = job
+    openers = {role: _login_opener(base_url, login) for role, login in credentials.items()}
+    latencies = {name: [] for name, _, _ in routes}
+    errors = {}
+    deadline = time.monotonic() + duration
+
+    while time.monotonic() < deadline:
+        for name, role, path in routes:
+            started = time.perf_counter()
+            try:
+                with openers[role].open(base_url + path) as response:
+                    response.read()
+                    failed = response.status != 200
+            except (urllib.error.URLError, OSError):
+                failed = True
+            latencies[name].append((time.perf_counter() - started) * 1000)
+            if failed:
+                errors[name] = errors.get(name, 0) + 1
+    return latencies, errors
+
+def run_http(args):
+    """Параллельная нагрузка на запущенный сервер из нескольких процессов"""
+    base_url = args.url.rstrip('/')
+    credentials = {'staff': args.staff}
+    if args.client:
+        credentials['client'] = args.client
+
+    routes = []
+    for name in args.routes:
+        role, path = ROUTES[name]
+        if role not in credentials:
+            print(f'{name}: пропущен, не задан --client', file=sys.stderr)
+            continue
+        routes.append((name, role, path.format(order_id=args.order_id or 1)))
+
+    job = (base_url, credentials, routes, args.duration)
+    with multiprocessing.Pool(args.processes) as pool:
+        results = pool.map(_http_worker, [job] * args.processes)
+
+    latencies, errors = {}, {}
+    for worker_latencies, worker_errors in results:
+        for name, values in worker_latencies.items():
+            latencies.setdefault(name, []).extend(values)
+        for name, count in worker_errors.items():
+            errors[name] = errors.get(name, 0) + count
+    # Все процессы работают одновременно, поэтому пропускная способность считается по общему времени
+    return summarize(latencies, errors, {name: args.duration for name in latencies})
+
+# Этапы запуска, которые платит каждая команда CLI, тест и воркер: код выполняется в чистом интерпретаторе
+STARTUP_STAGES = {
+    'import_photolab': 'import photolab',
+    'create_app': 'import photolab; photolab.create_app()',
+    'first_render': (
+        'import photolab; app = photolab.create_app(); '
+        'app.test_request_context().push(); '
+        'from photolab.templating import render_page; render_page("login.html")'
+    ),
+}
+
+def run_startup(args):
+    """Замеряет время запуска в отдельных процессах, чтобы не мешал кеш модулей"""
+    latencies, elapsed = {}, {}
+    for name, code in STARTUP_STAGES.items():
+        values = latencies[name] = []
+        for _ in range(args.requests):
+            started = time.perf_counter()
+            subprocess.run([sys.executable, '-c', code], check=True)
+            values.append((time.perf_counter() - started) * 1000)
+        elapsed[name] = sum(values) / 1000
+    return summarize(latencies, {}, elapsed)
+
+def _row_loaders(limit):
+    """Способы прочитать limit последних заказов с именами клиента и услуги, как это делают списки"""
+    from photolab.extensions import db
+    from photolab.models import Order
+    from photolab.orders import fetch_order_rows, order_rows_query
+
+    def orm_lazy():
+        # Как было в списках: объекты Order, клиент и услуга подгружаются при обращении из шаблона
+        orders = Order.query.order_by(Order.created_at.desc()).limit(limit).all()
+        for order in orders:
+            order.customer.username, order.service.name
+        return orders
+
+    def orm_joined():
+        orders = (Order.query.options(db.joinedload(Order.customer), db.joinedload(Order.service))
+                  .order_by(Order.created_at.desc()).limit(limit).all())
+        for order in orders:
+            order.customer.username, order.service.name
+        return orders
+
+    def core_rows():
+        return fetch_order_rows(order_rows_query().order_by(Order.created_at.desc()).limit(limit))
+
+    return {'orm_lazy': orm_lazy, 'orm_joined': orm_joined, 'core_rows': core_rows}
+
+def run_rows(args):
+    """Время и память на строку при чтении списка заказов разными способами"""
+    from photolab import create_app
+    from photolab.extensions import db
+
+    app = create_app({'RATELIMIT_ENABLED': False})
+    latencies, elapsed, memory = {}, {}, {}
+    with app.app_context():
+        for name, load in _row_loaders(args.rows).items():
+            for _ in range(args.warmup):
+                load()
+                db.session.remove()
+
+            values = latencies[name] = []
+            started = time.perf_counter()
+            for _ in range(args.requests):
+                load_started = time.perf_counter()
+                load()
+                values.append((time.perf_counter() - load_started) * 1000)
+                # Каждый прогон с пустой сессией, как в новом запросе
+                db.session.remove()
+            elapsed[name] = time.perf_counter() - started
+
+            # Память, которую держит результат (объекты, их состояние и identity map), и пик во время загрузки
+            tracemalloc.start()
+            before = tracemalloc.get_traced_memory()[0]
+            result = load()
+            retained, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            memory[name] = (len(result), retained - before, peak - before)
+            del result
+            db.session.remove()
+
+    results = summarize(latencies, {}, elapsed)
+    print(f"{'способ':<20}{'строк':>8}{'мкс/строку':>12}{'байт/строку':>13}{'пик, байт/строку':>18}")
+    for name, (rows, retained, peak) in memory.items():
+        rows = max(rows, 1)
+        print(f"{name:<20}{rows:>8}{results[name]['p50_ms'] * 1000 / rows:>12.1f}"
+              f"{retained / rows:>13.0f}{peak / rows:>18.0f}")
+    print()
+    return results
+
+def compare(results, baseline, tolerance):
+    """Сравнивает прогон с эталоном, возвращает список регрессий"""
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if not previous:
+            continue
+        if previous['p95_ms'] and current['p95_ms'] > previous['p95_ms'] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {previous['p95_ms']:.1f} -> {current['p95_ms']:.1f} мс")
+        if previous['rps'] and current['rps'] < previous['rps'] * (1 - tolerance):
+            regressions.append(f"{name}: rps {previous['rps']:.1f} -> {current['rps']:.1f}")
+    return regressions
+
+def print_table(results, baseline=None):
+    print(f"{'маршрут':<20}{'запросов':>10}{'ошибок':>8}{'rps':>10}{'p50, мс':>10}{'p95, мс':>10}{'p99, мс':>10}")
+    for name, row in results.items():
+        line = (f"{name:<20}{row['requests']:>10}{row['errors']:>8}{row['rps']:>10.1f}"
+                f"{row['p50_ms']:>10.1f}{row['p95_ms']:>10.1f}{row['p99_ms']:>10.1f}")
+        if baseline and name in baseline and baseline[name]['p95_ms']:
+            line += f"  (p95 {(row['p95_ms'] / baseline[name]['p95_ms'] - 1) * 100:+.0f}%)"
+        print(line)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('mode', choices=['client', 'http', 'startup', 'rows'])
+    parser.add_argument('--routes', nargs='+', choices=list(ROUTES), default=list(ROUTES))
+    parser.add_argument('--order-id', type=int, help='Заказ для order_details (по умолчанию последний)')
+    parser.add_argument('--requests', type=int, default=50,
+                        help='client: запросов на маршрут, startup: запусков на этап, rows: загрузок на способ')
+    parser.add_argument('--warmup', type=int, default=3, help='client: прогревочных запросов на маршрут, rows: прогревочных загрузок')
+    parser.add_argument('--rows', type=int, default=1000, help='rows: заказов в одной загрузке')
+    parser.add_argument('--url', default='http://localhost:1245', help='http: адрес сервера')
+    parser.add_argument('--processes', type=int, default=multiprocessing.cpu_count(), help='http: число процессов')
+    parser.add_argument('--duration', type=float, default=30, help='http: длительность прогона, с')
+    parser.add_argument('--staff', default='admin:admin123', help='http: логин:пароль сотрудника')
+    parser.add_argument('--client', help='http: логин:пароль клиента')
+    parser.add_argument('--save-baseline', metavar='FILE', help='Сохранить результат как эталон')
+    parser.add_argument('--baseline', metavar='FILE', help='Сравнить результат с эталоном')
+    parser.add_argument('--tolerance', type=float, default=0.10, help='Допустимое ухудшение относительно эталона')
+    args = parser.parse_args(argv)
+
+    runners = {'client': run_client, 'http': run_http, 'startup': run_startup, 'rows': run_rows}
+    results = runners[args.mode](args)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)['routes']
+    print_table(results, baseline)
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w', encoding='utf-8') as f:
+            json.dump({'mode': args.mode, 'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'), 'routes': results},
+                      f, ensure_ascii=False, indent=2)
+
+    if baseline:
+        regressions = compare(results, baseline, args.tolerance)
+        for regression in regressions:
+            print('РЕГРЕССИЯ', regression, file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
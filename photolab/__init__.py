@@ -0,0 +1,48 @@
+"""Приложение фотолаборатории.
+
+Импорт пакета дешевый: модели, маршруты и команды подключаются в create_app,
+шаблоны и Pillow загружаются при первом использовании.
+"""
+from flask import Flask
+
+def create_app(config=None):
+    """Фабрика приложения для WSGI-серверов, CLI и тестов.
+
+    Не обращается к базе и не создает папок: соединения открываются
+    лениво при первом запросе уже внутри рабочего процесса.
+    """
+    app = Flask(__name__)
+    app.config.from_object('photolab.config.Config')
+    # Настройки переопределяются переменными окружения PHOTOLAB_*, например PHOTOLAB_SECRET_KEY
+    app.config.from_prefixed_env('PHOTOLAB')
+    if config:
+        app.config.update(config)
+    
+    from .extensions import db, login_manager
+    from . import assets, cli, fragments, models, routes  # noqa: F401 - models регистрирует user_loader
+    from .templating import StringTemplateLoader
+    
+    db.init_app(app)
+    login_manager.init_app(app)
+    app.jinja_loader = StringTemplateLoader()
+    routes.init_app(app)
+    assets.init_app(app)
+    fragments.init_app(app)
+    cli.init_app(app)
+    
+    if app.config['PROFILING_ENABLED']:
+        from . import profiling
+        profiling.init_app(app)
+    
+    # После профилирования, чтобы отказы 429 тоже попадали в метрики
+    if app.config['RATELIMIT_ENABLED']:
+        from . import ratelimit
+        ratelimit.init_app(app)
+    
+    # Подключается последним, поэтому сжимает ответ раньше остальных after_request,
+    # и в метрики профилирования попадает уже сжатый размер
+    if app.config['COMPRESS_ENABLED']:
+        from . import compression
+        compression.init_app(app)
+    
+    return app
@@ -0,0 +1,157 @@
+"""Статические файлы интерфейса: хеш в имени, заранее сжатые копии, вечный кеш.
+
+Исходники лежат в photolab/static, Bootstrap и иконки скопированы туда же,
+поэтому страницы открываются и без доступа к CDN (киоски в точках приема).
+Команда build-assets копирует их в ASSETS_FOLDER под именами с хешем
+содержимого (bootstrap.min.1a2b3c4d5e.css), рядом кладет сжатые gzip и
+brotli копии и manifest.json. Имя меняется вместе с содержимым, поэтому
+такие файлы отдаются с Cache-Control immutable на год и при повторных
+заходах браузер их вообще не запрашивает. Пока сборки нет, asset_url
+ведет на обычную раздачу /static без хешей.
+"""
+from flask import current_app, request, send_from_directory, url_for
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import posixpath
+import re
+
+MANIFEST_NAME = 'manifest.json'
+HASH_LENGTH = 10
+# Шрифты woff/woff2 и картинки уже сжаты, повторное сжатие ничего не дает
+COMPRESSIBLE_EXTENSIONS = ('.css', '.js', '.svg', '.json', '.txt')
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+ENCODING_SUFFIXES = {'br': 'br', 'gzip': 'gz'}
+CSS_URL = re.compile(r'''url\(\s*(['"]?)([^'")]+?)\1\s*\)''')
+
+def _fingerprinted_name(name, content):
+    stem, ext = posixpath.splitext(name)
+    return f'{stem}.{hashlib.sha256(content).hexdigest()[:HASH_LENGTH]}{ext}'
+
+def _rewrite_css_urls(name, content, manifest):
+    """Ссылки из CSS на другие файлы (шрифты иконок) переводятся на имена с хешем"""
+    base = posixpath.dirname(name)
+    
+    def replace(match):
+        quote, url = match.groups()
+        path = re.split(r'[?#]', url, 1)[0]
+        target = posixpath.normpath(posixpath.join(base, path))
+        if ':' in path or target not in manifest:
+            return match.group(0)
+        # Параметр ?v=... для сброса кеша больше не нужен, его роль играет хеш; якорь #... сохраняем
+        fragment = url[url.index('#'):] if '#' in url else ''
+        return f'url({quote}{posixpath.relpath(manifest[target], base or ".")}{fragment}{quote})'
+    
+    return CSS_URL.sub(replace, content.decode('utf-8')).encode('utf-8')
+
+def _write_if_missing(path, data):
+    # Имя определяется содержимым: существующий файл уже правильный
+    if os.path.exists(path):
+        return False
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f'{path}.part'
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    return True
+
+def _compressed_variants(content):
+    """Сжатые копии, которые меньше оригинала: {'br': bytes, 'gzip': bytes}"""
+    variants = {'gzip': gzip.compress(content, compresslevel=9, mtime=0)}
+    try:
+        import brotli
+    except ImportError:
+        pass
+    else:
+        variants['br'] = brotli.compress(content, quality=11)
+    return {encoding: data for encoding, data in variants.items() if len(data) < len(content)}
+
+def build_assets(source=None, output=None, echo=print):
+    """Собирает файлы из static в ASSETS_FOLDER, возвращает манифест"""
+    source = source or current_app.static_folder
+    output = os.path.abspath(output or current_app.config['ASSETS_FOLDER'])
+    
+    names = []
+    for root, dirs, files in os.walk(source):
+        dirs[:] = sorted(d for d in dirs if not d.startswith('.'))
+        for filename in sorted(files):
+            if not filename.startswith('.'):
+                names.append(os.path.relpath(os.path.join(root, filename), source).replace(os.sep, '/'))
+    # CSS ссылается на шрифты, поэтому их имена с хешем должны быть известны раньше
+    names.sort(key=lambda name: name.endswith('.css'))
+    
+    manifest = {'assets': {}, 'encodings': {}}
+    written = 0
+    for name in names:
+        with open(os.path.join(source, name), 'rb') as f:
+            content = f.read()
+        if name.endswith('.css'):
+            content = _rewrite_css_urls(name, content, manifest['assets'])
+        hashed = _fingerprinted_name(name, content)
+        manifest['assets'][name] = hashed
+        written += _write_if_missing(os.path.join(output, hashed), content)
+        
+        if name.endswith(COMPRESSIBLE_EXTENSIONS):
+            variants = _compressed_variants(content)
+            for encoding, data in variants.items():
+                written += _write_if_missing(os.path.join(output, f'{hashed}.{ENCODING_SUFFIXES[encoding]}'), data)
+            if variants:
+                manifest['encodings'][hashed] = sorted(variants)
+    
+    # Манифест подменяется последним: работающие процессы видят либо старую сборку, либо новую целиком
+    tmp_path = os.path.join(output, f'.{MANIFEST_NAME}.part')
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, os.path.join(output, MANIFEST_NAME))
+    echo(f'Статических файлов: {len(names)}, записано новых: {written}, папка {output}')
+    return manifest
+
+def load_manifest():
+    """Манифест сборки; читается один раз на процесс, None - сборки нет"""
+    extensions = current_app.extensions
+    if 'photolab_assets' not in extensions:
+        path = os.path.join(current_app.config['ASSETS_FOLDER'], MANIFEST_NAME)
+        try:
+            with open(path) as f:
+                extensions['photolab_assets'] = json.load(f)
+        except FileNotFoundError:
+            extensions['photolab_assets'] = None
+    return extensions['photolab_assets']
+
+def asset_url(name):
+    """URL статического файла для шаблонов: имя с хешем из сборки, иначе обычный /static"""
+    manifest = load_manifest()
+    hashed = manifest['assets'].get(name) if manifest else None
+    if hashed is None:
+        return url_for('static', filename=name)
+    base_url = current_app.config['ASSETS_BASE_URL']
+    if base_url:
+        return f"{base_url.rstrip('/')}/{hashed}"
+    return url_for('asset_file', filename=hashed)
+
+def serve_asset(filename):
+    """Отдает собранный файл, сжатый brotli или gzip, если браузер их принимает"""
+    manifest = load_manifest() or {'encodings': {}}
+    folder = os.path.abspath(current_app.config['ASSETS_FOLDER'])
+    encoding = None
+    for candidate in manifest['encodings'].get(filename, ()):
+        if request.accept_encodings[candidate] and (
+                encoding is None or request.accept_encodings[candidate] > request.accept_encodings[encoding]):
+            encoding = candidate
+    
+    path = f'{filename}.{ENCODING_SUFFIXES[encoding]}' if encoding else filename
+    mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+    response = send_from_directory(folder, path, mimetype=mimetype, max_age=IMMUTABLE_MAX_AGE)
+    if encoding:
+        response.content_encoding = encoding
+    if filename in manifest['encodings']:
+        response.vary.add('Accept-Encoding')
+    response.cache_control.immutable = True
+    response.cache_control.public = True
+    return response
+
+def init_app(app):
+    app.add_url_rule(app.config['ASSETS_URL_PATH'].rstrip('/') + '/<path:filename>', 'asset_file', serve_asset)
+    app.jinja_env.globals['asset_url'] = asset_url
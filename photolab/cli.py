@@ -0,0 +1,373 @@
+from flask import current_app
+from flask.cli import with_appcontext
+from werkzeug.security import generate_password_hash
+from datetime import datetime, timedelta
+import click
+import contextvars
+import os
+import time
+
+from .assets import build_assets
+from .colorcorrect import color_correction_orders, color_correct_order
+from .datagen import generate_data
+from .duplicates import backfill_hashes
+from .extensions import db
+from .integrity import verify_storage
+from .maintenance import backup_database, optimize_database, enable_incremental_vacuum, enable_wal, database_sizes
+from .printexport import processing_print_orders, export_prints
+from .retention import archive_orders
+from .schema import upgrade_schema
+from .tiers import archive_files
+from .imposition import SHEET_SIZES, pending_print_orders, collect_print_items, plan_imposition, paper_usage, render_sheets
+from .models import User, Service, Order, OrderStatusEvent, DailyOrderStats
+from .orders import rebuild_daily_stats
+
+def init_db():
+    """Инициализация базы данных с тестовыми данными; возвращает список добавленных колонок и индексов"""
+    os.makedirs(current_app.config['UPLOAD_FOLDER'], exist_ok=True)
+    db.create_all()
+    # Таблицы из прошлых версий приложения create_all не меняет
+    changes = upgrade_schema()
+    # В WAL чтение и резервное копирование не мешают записи
+    enable_wal()
+    
+    # Создаем администратора если его нет
+    admin = User.query.filter_by(username='admin').first()
+    if not admin:
+        admin = User(
+            username='admin',
+            email='admin@photolab.com',
+            password_hash=generate_password_hash('admin123'),
+            role='admin',
+            full_name='Администратор системы'
+        )
+        db.session.add(admin)
+    
+    # Создаем тестового сотрудника
+    employee = User.query.filter_by(username='employee').first()
+    if not employee:
+        employee = User(
+            username='employee',
+            email='employee@photolab.com',
+            password_hash=generate_password_hash('emp123'),
+            role='employee',
+            full_name='Сотрудник лаборатории'
+        )
+        db.session.add(employee)
+    
+    # Создаем базовые услуги если их нет
+    if Service.query.count() == 0:
+        services = [
+            Service(name='Печать фото 10x15', description='Стандартная печать фотографий на глянцевой бумаге', price=15.0, processing_time=2, category='printing', print_width_mm=102, print_height_mm=152),
+            Service(name='Печать фото 15x20', description='Печать фотографий увеличенного размера', price=25.0, processing_time=3, category='printing', print_width_mm=152, print_height_mm=203),
+            Service(name='Печать фото 20x30', description='Большие фотографии высокого качества', price=45.0, processing_time=4, category='printing', print_width_mm=203, print_height_mm=305),
+            Service(name='Ретушь фото', description='Профессиональная ретушь изображений', price=200.0, processing_time=24, category='editing'),
+            Service(name='Реставрация старых фото', description='Восстановление поврежденных фотографий', price=500.0, processing_time=48, category='restoration'),
+            Service(name='Фотокнига', description='Создание персональной фотокниги', price=800.0, processing_time=72, category='products'),
+            Service(name='Печать на холсте', description='Печать фотографий на художественном холсте', price=150.0, processing_time=6, category='printing'),
+            Service(name='Цветокоррекция', description='Профессиональная цветокоррекция изображений', price=100.0, processing_time=12, category='editing'),
+        ]
+        
+        for service in services:
+            db.session.add(service)
+    
+    db.session.commit()
+    
+    # Базы, созданные до появления суточных итогов, заполняем по имеющимся заказам
+    if DailyOrderStats.query.first() is None and Order.query.first() is not None:
+        rebuild_daily_stats()
+    
+    # Для старых заказов восстанавливаем в журнале хотя бы создание и завершение
+    if OrderStatusEvent.query.first() is None and Order.query.first() is not None:
+        db.session.execute(db.insert(OrderStatusEvent).from_select(
+            ['order_id', 'status', 'ts'],
+            db.select(Order.id, db.literal('pending'), Order.created_at)
+        ))
+        db.session.execute(db.insert(OrderStatusEvent).from_select(
+            ['order_id', 'status', 'ts'],
+            db.select(Order.id, db.literal('completed'), Order.completed_at).where(Order.completed_at.isnot(None))
+        ))
+        db.session.commit()
+    return changes
+
+@click.command('init-db')
+@with_appcontext
+def init_db_command():
+    """Создает таблицы и начальные данные (однократно при установке и обновлении)"""
+    changes = init_db()
+    if changes:
+        click.echo(f"Схема обновлена: {', '.join(changes)}")
+    click.echo('База данных инициализирована!')
+    click.echo('Тестовые учетные данные:')
+    click.echo('Администратор: admin / admin123')
+    click.echo('Сотрудник: employee / emp123')
+
+@click.command('impose')
+@with_appcontext
+@click.option('--sheet', 'sheet_names', multiple=True, type=click.Choice(list(SHEET_SIZES)), help='Допустимые форматы листов (по умолчанию все)')
+@click.option('--service-id', type=int, help='Только заказы указанной услуги')
+@click.option('--dpi', type=int, help='Разрешение печатных листов')
+@click.option('--dry-run', is_flag=True, help='Только показать расход бумаги, без рендеринга')
+def impose_command(sheet_names, service_id, dpi, dry_run):
+    """Раскладывает файлы ожидающих заказов на печатные листы"""
+    sheets, skipped = plan_imposition(collect_print_items(pending_print_orders(service_id)), sheet_names)
+    usage = paper_usage(sheets)
+    
+    for name, size_usage in usage['by_size'].items():
+        click.echo(f"{name}: листов {size_usage['sheets']}, отпечатков {size_usage['prints']}, "
+                   f"заполнение {size_usage['utilization']:.1f}%")
+    click.echo(f"Итого бумаги: {usage['sheet_area_m2']:.3f} м², в обрезь: {usage['waste_area_m2']:.3f} м²")
+    if skipped:
+        click.echo(f'Не помещаются ни на один лист: {len(skipped)} отпечатков', err=True)
+    
+    if not dry_run:
+        for path in render_sheets(sheets, current_app.config['PRINT_SHEETS_FOLDER'], dpi):
+            click.echo(path)
+
+@click.command('rebuild-stats')
+@with_appcontext
+def rebuild_stats_command():
+    """Пересчитывает суточные итоги заказов с нуля"""
+    rebuild_daily_stats()
+    click.echo(f'Суточные итоги пересчитаны: {DailyOrderStats.query.count()} строк')
+
+@click.command('generate-data')
+@with_appcontext
+@click.option('--users', default=1000, show_default=True, help='Сколько клиентов создать')
+@click.option('--orders', default=10000, show_default=True, help='Сколько заказов создать')
+@click.option('--files', default=20000, show_default=True, help='Сколько файлов заказов создать')
+@click.option('--days', default=365, show_default=True, help='За сколько дней распределить даты заказов')
+@click.option('--batch-size', default=10000, show_default=True, help='Строк в одной пачке вставки')
+@click.option('--seed', type=int, help='Зерно генератора для воспроизводимых данных')
+def generate_data_command(users, orders, files, days, batch_size, seed):
+    """Заполняет базу синтетическими данными для нагрузочного тестирования"""
+    started = time.perf_counter()
+    generate_data(users, orders, files, days, batch_size, seed, echo=click.echo)
+    click.echo(f'Готово за {time.perf_counter() - started:.1f} с')
+
+@click.command('verify-storage')
+@with_appcontext
+@click.option('--workers', type=int, help='Процессов хеширования, по умолчанию STORAGE_VERIFY_WORKERS')
+@click.option('--rate', type=float, help='Предел чтения, МБ/с на все процессы; 0 - без ограничения')
+@click.option('--backfill', is_flag=True, help='Записать контрольные суммы файлам, загруженным до их появления')
+@click.option('--scrub', is_flag=True, help='Работать постоянно, перепроверяя файлы старше --max-age')
+@click.option('--max-age', type=int, help='scrub: дней между проверками файла, по умолчанию STORAGE_SCRUB_MAX_AGE_DAYS')
+@click.option('--batch', default=10000, show_default=True, help='scrub: файлов за один проход')
+@click.option('--interval', default=600, show_default=True, help='scrub: пауза между проходами, с')
+def verify_storage_command(workers, rate, backfill, scrub, max_age, batch, interval):
+    """Сверяет загруженные файлы с контрольными суммами"""
+    def report(counts):
+        click.echo(f"ok {counts['ok']}, изменены {counts['mismatch']}, отсутствуют {counts['missing']}, "
+                   f"не читаются {counts['unreadable']}, без суммы {counts['unrecorded']}; "
+                   f"{counts['bytes'] / 2**20:.0f} МБ за {counts['seconds']:.1f} с")
+        return counts['mismatch'] + counts['missing'] + counts['unreadable']
+    
+    if not scrub:
+        problems = report(verify_storage(workers=workers, rate_mb=rate, backfill=backfill, echo=click.echo))
+        if problems:
+            raise SystemExit(1)
+        return
+    
+    max_age = max_age or current_app.config['STORAGE_SCRUB_MAX_AGE_DAYS']
+    while True:
+        counts = verify_storage(stale_before=datetime.utcnow() - timedelta(days=max_age), limit=batch,
+                                workers=workers, rate_mb=rate, backfill=backfill, echo=click.echo)
+        report(counts)
+        time.sleep(interval)
+
+@click.command('hash-photos')
+@with_appcontext
+@click.option('--limit', type=int, help='Не больше стольких файлов за запуск')
+@click.option('--workers', type=int, help='Процессов, по умолчанию по числу ядер')
+def hash_photos_command(limit, workers):
+    """Считает перцептивные хеши файлам, загруженным до появления поиска повторов"""
+    hashed, failed = backfill_hashes(limit, workers, echo=click.echo)
+    click.echo(f'Посчитано хешей: {hashed}, не картинки или не читаются: {failed}')
+
+@click.command('archive-files')
+@with_appcontext
+@click.option('--days', type=int, help='Сколько дней назад завершен заказ, по умолчанию ARCHIVE_AFTER_DAYS')
+@click.option('--limit', type=int, help='Не больше стольких файлов за запуск')
+@click.option('--dry-run', is_flag=True, help='Только посчитать, ничего не переносить')
+def archive_files_command(days, limit, dry_run):
+    """Переносит файлы давно завершенных и отмененных заказов в холодное хранилище"""
+    moved, moved_bytes = archive_files(days, limit, dry_run, echo=click.echo)
+    click.echo(f"{'Будет перенесено' if dry_run else 'Итого перенесено'}: {moved} файлов, {moved_bytes / 2**20:.1f} МБ")
+
+@click.command('archive-orders')
+@with_appcontext
+@click.option('--days', type=int, help='Сколько дней назад завершен заказ, по умолчанию ORDER_ARCHIVE_AFTER_DAYS')
+@click.option('--limit', type=int, help='Не больше стольких заказов за запуск')
+@click.option('--batch-size', type=int, help='Заказов в одной транзакции, по умолчанию ORDER_ARCHIVE_BATCH_SIZE')
+@click.option('--dry-run', is_flag=True, help='Только посчитать, ничего не переносить')
+def archive_orders_command(days, limit, batch_size, dry_run):
+    """Переносит давно завершенные и отмененные заказы в архивные таблицы"""
+    moved, moved_files = archive_orders(days, limit, dry_run, batch_size, echo=click.echo)
+    click.echo(f"{'Будет перенесено' if dry_run else 'Итого перенесено'}: {moved} заказов"
+               + ('' if dry_run else f', {moved_files} файлов'))
+
+@click.command('export-prints')
+@with_appcontext
+@click.option('--order-id', 'order_ids', multiple=True, type=int, help='Только указанные заказы (по умолчанию все в работе)')
+@click.option('--dpi', type=int, help='Разрешение, по умолчанию EXPORT_DPI')
+@click.option('--profile', type=click.Path(exists=True, dir_okay=False), help='ICC-профиль принтера, по умолчанию EXPORT_ICC_PROFILE')
+@click.option('--workers', type=int, help='Процессов, по умолчанию по числу ядер')
+@click.option('--force', is_flag=True, help='Пересоздать уже выгруженные файлы')
+def export_prints_command(order_ids, dpi, profile, workers, force):
+    """Готовит файлы заказов в работе к печати: размер отпечатка и профиль принтера"""
+    orders = processing_print_orders(order_ids)
+    if not orders:
+        click.echo('Нет заказов в работе с заданным форматом отпечатка')
+        return
+    counts = export_prints(orders, dpi=dpi, icc_profile=profile, workers=workers, force=force, echo=click.echo)
+    if counts['failed']:
+        raise SystemExit(1)
+
+@click.command('color-correct')
+@with_appcontext
+@click.option('--order-id', 'order_ids', multiple=True, type=int, help='Только указанные заказы (по умолчанию заказы в очереди цветокоррекции)')
+@click.option('--redo', is_flag=True, help='Создать новые версии и для уже обработанных файлов')
+@click.option('--workers', type=int, help='Процессов, по умолчанию COLOR_CORRECT_WORKERS или по числу ядер')
+@click.option('--interval', type=int, help='Повторять каждые столько секунд, не завершаясь')
+def color_correct_command(order_ids, redo, workers, interval):
+    """Автоматическая цветокоррекция файлов заказов; результаты ждут одобрения сотрудником"""
+    while True:
+        created = failed = 0
+        for order in color_correction_orders(order_ids):
+            order_created, order_failed = color_correct_order(order, redo, workers, echo=click.echo)
+            created += order_created
+            failed += order_failed
+        if not interval:
+            break
+        if created or failed:
+            click.echo(f'Создано версий: {created}, ошибок: {failed}')
+        db.session.remove()
+        time.sleep(interval)
+    click.echo(f'Создано версий: {created}, ошибок: {failed}')
+    if failed:
+        raise SystemExit(1)
+
+@click.command('backup-db')
+@with_appcontext
+@click.option('--output', type=click.Path(dir_okay=False), help='Файл копии, по умолчанию BACKUP_FOLDER/photolab-<дата>.db')
+@click.option('--keep', type=int, help='Сколько последних копий хранить, по умолчанию BACKUP_KEEP')
+def backup_db_command(output, keep):
+    """Снимает копию базы, не останавливая приложение"""
+    backup_database(output, keep=keep, echo=click.echo)
+
+@click.command('maintain-db')
+@with_appcontext
+@click.option('--analyze', is_flag=True, help='Пересчитать статистику по всем таблицам, а не только устаревшую')
+@click.option('--vacuum-pages', type=int, help='Свободных страниц за запуск, по умолчанию MAINTENANCE_VACUUM_PAGES')
+@click.option('--enable-incremental-vacuum', 'enable_vacuum', is_flag=True, help='Однократно включить auto_vacuum=INCREMENTAL (полный VACUUM)')
+@click.option('--interval', type=int, help='Повторять каждые столько секунд, не завершаясь')
+def maintain_db_command(analyze, vacuum_pages, enable_vacuum, interval):
+    """Обновляет статистику планировщика и возвращает свободное место в файле базы"""
+    if enable_vacuum:
+        enable_incremental_vacuum(echo=click.echo)
+    while True:
+        optimize_database(analyze=analyze, vacuum_pages=vacuum_pages, echo=click.echo)
+        if not interval:
+            break
+        time.sleep(interval)
+
+@click.command('db-sizes')
+@with_appcontext
+@click.option('--top', default=20, show_default=True, help='Сколько самых больших таблиц и индексов показать')
+def db_sizes_command(top):
+    """Показывает размер файла базы, таблиц и индексов"""
+    objects, file_size = database_sizes()
+    click.echo(f'Файл базы: {file_size / 2**20:.1f} МБ')
+    if not objects:
+        click.echo('Размеры по таблицам недоступны: SQLite собран без dbstat')
+    for name, kind, size in objects[:top]:
+        click.echo(f'{size / 2**20:10.1f} МБ  {kind:<6} {name}')
+
+@click.command('build-assets')
+@with_appcontext
+@click.option('--output', type=click.Path(file_okay=False), help='Папка сборки, по умолчанию ASSETS_FOLDER')
+def build_assets_command(output):
+    """Собирает статические файлы с хешем в имени и сжатыми копиями"""
+    build_assets(output=output, echo=click.echo)
+
+def _serve_gunicorn(app, host, port, workers, threads, keepalive):
+    from gunicorn.app.base import BaseApplication
+    
+    def dispose_engine_after_fork(server, worker):
+        # Соединения SQLite нельзя делить между процессами: воркер начинает с пустым пулом
+        with app.app_context():
+            db.engine.dispose(close=False)
+    
+    class PhotoLabApplication(BaseApplication):
+        def load_config(self):
+            self.cfg.set('bind', f'{host}:{port}')
+            self.cfg.set('workers', workers)
+            self.cfg.set('threads', threads)
+            self.cfg.set('worker_class', 'gthread' if threads > 1 else 'sync')
+            self.cfg.set('keepalive', keepalive)
+            # Приложение импортируется один раз в мастере, воркеры получают его готовым через fork
+            self.cfg.set('preload_app', True)
+            self.cfg.set('post_fork', dispose_engine_after_fork)
+        
+        def load(self):
+            return app
+    
+    PhotoLabApplication().run()
+
+def _serve_waitress(app, host, port, threads, keepalive):
+    from waitress import serve
+    serve(app, host=host, port=port, threads=threads, channel_timeout=max(keepalive, 30))
+
+def _serve_uvicorn(host, port, workers, keepalive):
+    import uvicorn
+    # Каждый воркер uvicorn создает приложение сам через фабрику
+    uvicorn.run('photolab.ingest:create_asgi_app', factory=True, host=host, port=port,
+                workers=workers, timeout_keep_alive=keepalive)
+
+@click.command('serve')
+@with_appcontext
+@click.option('--host', default='0.0.0.0', show_default=True)
+@click.option('--port', default=1245, show_default=True, type=int)
+@click.option('--server', type=click.Choice(['auto', 'gunicorn', 'waitress', 'uvicorn']), default='auto', show_default=True,
+              help='auto: gunicorn, если доступен (Linux/macOS), иначе waitress; uvicorn - асинхронный прием загрузок')
+@click.option('--workers', type=int, help='Число процессов (gunicorn, uvicorn), по умолчанию SERVER_WORKERS')
+@click.option('--threads', type=int, help='Потоков на процесс (gunicorn, waitress), по умолчанию SERVER_THREADS')
+@click.option('--keepalive', type=int, help='Keep-alive соединений, с, по умолчанию SERVER_KEEPALIVE')
+def serve_command(host, port, server, workers, threads, keepalive):
+    """Запускает приложение на production WSGI-сервере"""
+    workers = workers or current_app.config['SERVER_WORKERS']
+    threads = threads or current_app.config['SERVER_THREADS']
+    keepalive = keepalive or current_app.config['SERVER_KEEPALIVE']
+    
+    if server == 'auto':
+        try:
+            import gunicorn  # noqa: F401
+            server = 'gunicorn' if os.name != 'nt' else 'waitress'
+        except ImportError:
+            server = 'waitress'
+    
+    # Сборка до запуска воркеров: каждый из них прочитает уже готовый манифест
+    build_assets(echo=click.echo)
+    app = current_app._get_current_object()
+    click.echo(f'{server}: http://{host}:{port}, процессов {1 if server == "waitress" else workers}, потоков {threads}')
+    # Сервер запускается в пустом контексте contextvars, без контекста приложения, открытого для команды:
+    # иначе его наследуют воркеры gunicorn (sync-воркер обслуживает запросы в главном потоке), и все
+    # запросы делят g (с ним - вошедшего пользователя Flask-Login) и сессию базы данных
+    run = contextvars.Context().run
+    try:
+        if server == 'gunicorn':
+            run(_serve_gunicorn, app, host, port, workers, threads, keepalive)
+        elif server == 'uvicorn':
+            run(_serve_uvicorn, host, port, workers, keepalive)
+        else:
+            run(_serve_waitress, app, host, port, threads, keepalive)
+    except ImportError:
+        package = 'uvicorn asgiref' if server == 'uvicorn' else server
+        raise click.ClickException(f'{server} не установлен: pip install {package}')
+
+def init_app(app):
+    for command in (init_db_command, impose_command, rebuild_stats_command, generate_data_command,
+                    verify_storage_command, hash_photos_command, archive_files_command, archive_orders_command,
+                    export_prints_command, color_correct_command, backup_db_command, maintain_db_command,
+                    db_sizes_command, build_assets_command, serve_command):
+        app.cli.add_command(command)
@@ -0,0 +1,218 @@
+"""Автоматическая цветокоррекция файлов заказа: уровни, баланс белого, контраст.
+
+Поправки считаются по уменьшенной копии снимка и сводятся в одну таблицу
+(LUT) на 256 значений для каждого канала. Затем таблица применяется к
+полноразмерному снимку полосами по COLOR_CORRECT_TILE_ROWS строк: NumPy
+переводит полосу индексированием по таблице и результат записывается на
+место той же полосы, поэтому в памяти нет ни второго кадра, ни массивов
+float размером со снимок. Файлы обрабатываются в пуле процессов.
+
+Результат сохраняется новой версией OrderFile со статусом 'pending';
+в печать и в ZIP она попадает только после одобрения сотрудником.
+Обрабатываются только заказы в очереди (color_correct_queued): в нее ставит
+кнопка на странице заказа, а заказы услуги цветокоррекции встают сами при
+загрузке файлов. Очередь разбирает команда color-correct, в фоне - с --interval.
+"""
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from collections import namedtuple
+from flask import current_app
+from datetime import datetime
+import os
+import time
+
+from .extensions import db
+from .models import Order, OrderFile
+from .printexport import rgb_profile
+from .storage import COPY_CHUNK_SIZE, UploadDigest, upload_path
+from .tiers import ensure_hot
+
+CorrectionJob = namedtuple('CorrectionJob', 'file_id source target')
+
+SAMPLE_SIZE = 512  # по такой копии считаются гистограммы
+# Баланс белого "серый мир" не должен перекрашивать снимки с преобладающим цветом (закат, лес)
+MAX_WHITE_BALANCE_GAIN = 1.25
+# Версия сохраняется в формате исходника; GIF, BMP и прочие - в PNG
+SAVE_FORMATS = {'.jpg': 'JPEG', '.jpeg': 'JPEG', '.png': 'PNG', '.tif': 'TIFF', '.tiff': 'TIFF'}
+EXIF_ORIENTATION = 0x0112
+PROGRESS_INTERVAL = 2  # секунд между строками прогресса
+
+def correction_lut(sample, clip=0.5, contrast=3.0):
+    """Таблица uint8 формы (3, 256) по RGB-массиву sample (уменьшенной копии снимка).
+
+    Уровни: clip процентов самых темных и самых светлых пикселей каждого
+    канала уходят в 0 и 255. Баланс белого: средние каналов после уровней
+    выравниваются к общему среднему. Контраст: S-кривая (сигмоида) с
+    крутизной contrast, 0 - без изменения контраста.
+    """
+    import numpy as np
+    
+    hist = np.stack([np.bincount(sample[..., c].ravel(), minlength=256) for c in range(3)]).astype(np.float64)
+    cdf = np.cumsum(hist, axis=1) / hist.sum(axis=1, keepdims=True)
+    low = np.argmax(cdf > clip / 100, axis=1)
+    high = np.maximum(np.argmax(cdf >= 1 - clip / 100, axis=1), low + 1)
+    x = np.arange(256, dtype=np.float64)
+    curve = np.clip((x - low[:, None]) / (high - low)[:, None], 0, 1)
+    
+    # Средние каналов после уровней берутся прямо из гистограммы, без прохода по пикселям
+    means = (hist * curve).sum(axis=1) / hist.sum(axis=1)
+    gains = np.clip(means.mean() / np.maximum(means, 1e-6), 1 / MAX_WHITE_BALANCE_GAIN, MAX_WHITE_BALANCE_GAIN)
+    curve = np.clip(curve * gains[:, None], 0, 1)
+    
+    if contrast > 0:
+        # Сигмоида, растянутая так, что 0 и 1 остаются на месте
+        def sigmoid(v):
+            return 1 / (1 + np.exp(-contrast * (v - 0.5)))
+        curve = (sigmoid(curve) - sigmoid(0)) / (sigmoid(1) - sigmoid(0))
+    return np.round(curve * 255).astype(np.uint8)
+
+def apply_lut(image, lut, tile_rows=512):
+    """Применяет таблицу к RGB-снимку на месте, полосами по tile_rows строк"""
+    import numpy as np
+    from PIL import Image
+    
+    width, height = image.size
+    for top in range(0, height, tile_rows):
+        box = (0, top, width, min(top + tile_rows, height))
+        tile = np.asarray(image.crop(box))
+        corrected = np.empty_like(tile)
+        for channel in range(3):
+            corrected[..., channel] = lut[channel][tile[..., channel]]
+        image.paste(Image.fromarray(corrected), box)
+    return image
+
+# Настройки процесса пула, передаются один раз при его запуске
+_worker = {}
+
+def _init_worker(clip, contrast, tile_rows, quality):
+    _worker.update(clip=clip, contrast=contrast, tile_rows=tile_rows, quality=quality)
+
+def _correct_file(job):
+    """Выполняется в процессе пула, возвращает (id файла, размер, sha256, crc32) или (id файла, None, ошибка)"""
+    import numpy as np
+    from PIL import Image, ImageOps
+    
+    tmp_path = os.path.join(os.path.dirname(job.target), f'.{os.path.basename(job.target)}.part')
+    # Pillow сообщает о битых файлах не только OSError (SyntaxError, ValueError и др.), а ошибка
+    # одного файла не должна обрывать задачу пула: она возвращается в результате
+    try:
+        with Image.open(job.source) as source:
+            exif = source.getexif()
+            icc_profile = source.info.get('icc_profile')
+            image = ImageOps.exif_transpose(source)
+            alpha = image.getchannel('A') if image.mode in ('RGBA', 'LA') else None
+            image = image.convert('RGB')
+        
+        sample = image.copy()
+        sample.thumbnail((SAMPLE_SIZE, SAMPLE_SIZE))
+        lut = correction_lut(np.asarray(sample), _worker['clip'], _worker['contrast'])
+        apply_lut(image, lut, _worker['tile_rows'])
+        file_format = SAVE_FORMATS[os.path.splitext(job.target)[1].lower()]
+        if alpha is not None and file_format != 'JPEG':
+            image.putalpha(alpha)
+        
+        options = {}
+        # Профиль CMYK- или серого исходника к RGB-результату не относится, такой результат остается без профиля
+        if rgb_profile(icc_profile) is not None:
+            options['icc_profile'] = icc_profile
+        if file_format == 'JPEG':
+            options['quality'] = _worker['quality']
+            # Поворот уже применен к пикселям, остальные метаданные съемки сохраняем
+            exif.pop(EXIF_ORIENTATION, None)
+            options['exif'] = exif.tobytes()
+        image.save(tmp_path, file_format, **options)
+        
+        digest = UploadDigest()
+        with open(tmp_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(COPY_CHUNK_SIZE), b''):
+                digest.update(chunk)
+        os.replace(tmp_path, job.target)
+    except Exception as e:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return job.file_id, None, f'{job.source}: {e}'
+    return job.file_id, os.path.getsize(job.target), digest.sha256.hexdigest(), digest.crc32
+
+def color_correction_orders(order_ids=None):
+    """Заказы с указанными id, иначе стоящие в очереди: поставленные со страницы заказа
+    и заказы услуг из COLOR_CORRECT_SERVICES (см. orders.add_order_files)"""
+    query = Order.query
+    if order_ids:
+        query = query.filter(Order.id.in_(order_ids))
+    else:
+        query = query.filter(Order.color_correct_queued.isnot(None))
+    return query.options(db.selectinload(Order.files)).order_by(Order.id).all()
+
+def _version_names(order_file, number):
+    """(имя на диске, имя для клиента) версии number"""
+    stem, ext = os.path.splitext(order_file.original_filename)
+    if ext.lower() not in SAVE_FORMATS:
+        ext = '.png'
+    filename = f"{order_file.order_id}_{order_file.id}_v{number}_{datetime.now().strftime('%Y%m%d_%H%M%S')}{ext}"
+    return filename, f'{stem}_color{number if number > 1 else ""}{ext}'
+
+def color_correct_order(order, redo=False, workers=None, echo=print):
+    """Создает исправленные версии файлов заказа, возвращает (создано, ошибок).
+
+    Исходники, у которых уже есть версии, пропускаются, если не задан redo (или
+    заказ не поставлен в очередь с повторной обработкой). Заказ снимается с очереди.
+    """
+    config = current_app.config
+    redo = redo or order.color_correct_queued == 'redo'
+    order.color_correct_queued = None
+    originals = [f for f in sorted(order.files, key=lambda f: f.id)
+                 if f.source_file_id is None and (redo or not f.versions)]
+    if not originals:
+        db.session.commit()
+        return 0, 0
+    
+    os.makedirs(config['UPLOAD_FOLDER'], exist_ok=True)
+    jobs, names = [], {}
+    for order_file in originals:
+        names[order_file.id] = _version_names(order_file, len(order_file.versions) + 1)
+        jobs.append(CorrectionJob(order_file.id, ensure_hot(order_file), upload_path(names[order_file.id][0])))
+    
+    created = failed = 0
+    reported = time.monotonic()
+    initargs = (config['COLOR_CORRECT_CLIP_PERCENT'], config['COLOR_CORRECT_CONTRAST'],
+                config['COLOR_CORRECT_TILE_ROWS'], config['COLOR_CORRECT_JPEG_QUALITY'])
+    with ProcessPoolExecutor(min(workers or config['COLOR_CORRECT_WORKERS'] or os.cpu_count(), len(jobs)),
+                             initializer=_init_worker, initargs=initargs) as pool:
+        futures = [pool.submit(_correct_file, job) for job in jobs]
+        for done, future in enumerate(as_completed(futures), 1):
+            file_id, size, *result = future.result()
+            if size is None:
+                failed += 1
+                echo(f'Ошибка, файл #{file_id}: {result[0]}')
+            else:
+                filename, original_filename = names[file_id]
+                checksum, crc32 = result
+                db.session.add(OrderFile(order_id=order.id, filename=filename, original_filename=original_filename,
+                                         file_size=size, checksum=checksum, crc32=crc32,
+                                         source_file_id=file_id, review_status='pending'))
+                created += 1
+            
+            now = time.monotonic()
+            if now - reported >= PROGRESS_INTERVAL or done == len(jobs):
+                reported = now
+                echo(f'Заказ {order.order_number}: обработано {done} из {len(jobs)}, ошибок {failed}')
+    if created:
+        # Версии файлов - часть страницы заказа: новая версия заказа сбрасывает ее ETag
+        order.updated_at = datetime.utcnow()
+    db.session.commit()
+    return created, failed
+
+def queue_color_correction(order, redo=False):
+    """Ставит заказ в очередь команды color-correct; сама обработка идет вне запроса"""
+    order.color_correct_queued = 'redo' if redo else 'new'
+    db.session.commit()
+
+def review_version(order_file, decision, user_id):
+    """Одобряет (decision='approved') или отклоняет версию файла; одобренной может быть только одна"""
+    now = datetime.utcnow()
+    if decision == 'approved':
+        for sibling in order_file.source_file.versions:
+            if sibling.id != order_file.id and sibling.review_status == 'approved':
+                sibling.review_status, sibling.reviewed_at, sibling.reviewed_by = 'rejected', now, user_id
+    order_file.review_status, order_file.reviewed_at, order_file.reviewed_by = decision, now, user_id
+    order_file.order.updated_at = now
+    db.session.commit()
@@ -0,0 +1,85 @@
+"""Сжатие ответов gzip или brotli по заголовку Accept-Encoding.
+
+Сжимаются только текстовые ответы (HTML, JSON, CSV) не меньше
+COMPRESS_MIN_SIZE: у маленьких выигрыш съедают заголовки формата.
+Потоковые ответы сжимаются по мере генерации, каждый кусок сразу
+уходит клиенту. Файлы (send_file, ZIP-архивы, фотографии) не трогаем:
+фотографии уже сжаты, а у файлов есть Content-Length и докачка по Range.
+"""
+from flask import current_app, request
+import zlib
+
+COMPRESSIBLE_MIMETYPES = ('text/html', 'text/plain', 'text/csv', 'text/css', 'application/json',
+                          'application/javascript')
+
+def _brotli():
+    try:
+        import brotli
+    except ImportError:
+        return None
+    return brotli
+
+def choose_encoding(accept_encodings):
+    """'br' или 'gzip' с наибольшим весом в Accept-Encoding; None - сжимать нельзя"""
+    candidates = ['br', 'gzip'] if _brotli() is not None else ['gzip']
+    best = max(candidates, key=lambda encoding: accept_encodings[encoding])
+    return best if accept_encodings[best] else None
+
+def _compressor(encoding):
+    """Объект с методами compress(chunk) и finish(), возвращающими сжатые байты"""
+    config = current_app.config
+    if encoding == 'br':
+        brotli = _brotli()
+        compressor = brotli.Compressor(quality=config['COMPRESS_BR_LEVEL'])
+        return lambda data: compressor.process(data) + compressor.flush(), compressor.finish
+    # wbits=31 - формат gzip с заголовком и контрольной суммой
+    compressor = zlib.compressobj(config['COMPRESS_LEVEL'], zlib.DEFLATED, 31)
+    # Z_SYNC_FLUSH: все, что сгенерировано, сразу доходит до клиента, а не ждет конца ответа
+    return lambda data: compressor.compress(data) + compressor.flush(zlib.Z_SYNC_FLUSH), compressor.flush
+
+def _compress_stream(chunks, compress, finish):
+    # Выполняется уже после выхода из обработчика, без контекста приложения
+    try:
+        for chunk in chunks:
+            if chunk:
+                yield compress(chunk.encode() if isinstance(chunk, str) else chunk)
+        yield finish()
+    finally:
+        close = getattr(chunks, 'close', None)
+        if close is not None:
+            close()
+
+def compress_response(response):
+    if (response.direct_passthrough or response.status_code < 200 or response.status_code in (204, 206, 304)
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES or 'Content-Encoding' in response.headers
+            or 'Content-Range' in response.headers or response.cache_control.no_transform):
+        return response
+    
+    # Ответ на этот URL зависит от Accept-Encoding, кеши должны хранить варианты отдельно
+    response.vary.add('Accept-Encoding')
+    encoding = choose_encoding(request.accept_encodings)
+    if encoding is None or request.method == 'HEAD':
+        return response
+    
+    if response.is_streamed:
+        response.response = _compress_stream(response.response, *_compressor(encoding))
+        response.headers.pop('Content-Length', None)
+    else:
+        data = response.get_data()
+        if len(data) < current_app.config['COMPRESS_MIN_SIZE']:
+            return response
+        compress, finish = _compressor(encoding)
+        compressed = compress(data) + finish()
+        if len(compressed) >= len(data):
+            return response
+        response.set_data(compressed)
+    
+    response.content_encoding = encoding
+    # Сжатые байты отличаются от исходных: строгий ETag становится слабым
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    return response
+
+def init_app(app):
+    app.after_request(compress_response)
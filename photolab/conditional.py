@@ -0,0 +1,69 @@
+"""Условные GET: ETag и Last-Modified по версиям строк.
+
+Обработчик сначала дешевым запросом получает версии данных, из которых
+строится ответ, и если у клиента та же версия, сразу отвечает 304 - без
+загрузки связей, рендеринга шаблона и сериализации JSON. Страница зависит
+еще и от того, кто ее смотрит (меню, кнопки сотрудника), и от версии
+шаблонов и статики, поэтому они тоже входят в ETag.
+"""
+from flask import current_app, make_response, request, session
+from flask_login import current_user
+import hashlib
+import importlib.util
+import json
+
+from .assets import load_manifest
+
+def _site_revision():
+    """Хеш шаблонов и сборки статики: после обновления приложения старые ETag не совпадут"""
+    revision = current_app.extensions.get('photolab_site_revision')
+    if revision is None:
+        digest = hashlib.sha1()
+        # Сам модуль шаблонов не импортируется, он загружается лениво при первом рендеринге
+        with open(importlib.util.find_spec('photolab.templates').origin, 'rb') as f:
+            digest.update(f.read())
+        digest.update(json.dumps(load_manifest(), sort_keys=True).encode())
+        revision = current_app.extensions['photolab_site_revision'] = digest.hexdigest()
+    return revision
+
+def cache_validators(version):
+    """(ETag, Last-Modified) для строки версий (order_version, orders_version); None - ответ не кешируется.
+
+    Страница с ожидающими flash-сообщениями показывается один раз, ее
+    нельзя ни подтверждать 304, ни помечать ETag.
+    """
+    if session.get('_flashes'):
+        return None
+    viewer = (current_user.get_id(), current_user.role) if current_user.is_authenticated else None
+    etag = hashlib.sha1(repr((tuple(version), viewer, _site_revision())).encode()).hexdigest()
+    last_modified = max(filter(None, (version.updated_at, version.service_updated_at)), default=None)
+    return etag, last_modified.replace(microsecond=0) if last_modified else None
+
+def not_modified(validators):
+    """Ответ 304, если версия у клиента совпадает с текущей, иначе None"""
+    if validators is None:
+        return None
+    etag, last_modified = validators
+    # If-None-Match важнее If-Modified-Since; слабое сравнение, потому что сжатые ответы несут W/"..."
+    if request.if_none_match:
+        matched = request.if_none_match.contains_weak(etag)
+    elif request.if_modified_since and last_modified:
+        matched = last_modified <= request.if_modified_since.replace(tzinfo=None)
+    else:
+        matched = False
+    if not matched:
+        return None
+    return with_validators(current_app.response_class(status=304), validators)
+
+def with_validators(rv, validators):
+    """Добавляет к ответу ETag и Last-Modified; браузер будет каждый раз сверять версию"""
+    response = make_response(rv)
+    if validators is not None:
+        etag, last_modified = validators
+        response.set_etag(etag)
+        if last_modified:
+            response.last_modified = last_modified
+    # Ответ зависит от пользователя: общим кешам хранить нельзя, браузеру - только с перепроверкой
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
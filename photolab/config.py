@@ -0,0 +1,78 @@
+import os
+
+class Config:
+    """Настройки по умолчанию; переопределяются переменными окружения PHOTOLAB_*"""
+    SECRET_KEY = 'your-secret-key-here-change-in-production'
+    SQLALCHEMY_DATABASE_URI = 'sqlite:///photolab.db'
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+    UPLOAD_FOLDER = 'static/uploads'
+    MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max file size
+    PRINT_SHEETS_FOLDER = 'static/print_sheets'
+    IMPOSITION_DPI = 300
+    IMPOSITION_MARGIN_MM = 5  # непечатаемое поле по краю листа
+    IMPOSITION_GAP_MM = 2  # зазор между отпечатками под резку
+    PRODUCTION_BATCH_SIZE = 50  # максимум заказов в одной партии
+    # Сколько заказов каждой категории лаборатория выполняет параллельно
+    PRODUCTION_LANES = {'printing': 4, 'editing': 2, 'restoration': 1, 'products': 1}
+    CAPACITY_RESYNC_SECONDS = 300  # как часто сверять модель загрузки с базой
+    PROFILING_ENABLED = os.environ.get('PHOTOLAB_PROFILING') == '1'
+    PROFILING_METRICS_TOKEN = None  # Bearer-токен сборщика метрик для /metrics; без него метрики видят только сотрудники
+    SERVER_WORKERS = (os.cpu_count() or 1) * 2 + 1
+    SERVER_THREADS = 4
+    SERVER_KEEPALIVE = 5  # секунд
+    STORAGE_VERIFY_WORKERS = max((os.cpu_count() or 2) // 2, 1)
+    STORAGE_VERIFY_RATE_MB = 50  # МБ/с на всю проверку хранилища, 0 - без ограничения
+    STORAGE_SCRUB_MAX_AGE_DAYS = 30  # фоновая проверка перечитывает файл не реже раза в этот срок
+    # Холодный уровень хранения: 'local' - сжатые файлы в COLD_STORAGE_FOLDER, 's3' - бакет S3 (нужен boto3)
+    COLD_STORAGE = 'local'
+    COLD_STORAGE_FOLDER = 'cold_storage'
+    COLD_STORAGE_S3_BUCKET = None
+    COLD_STORAGE_S3_PREFIX = 'uploads/'
+    COLD_STORAGE_S3_ENDPOINT_URL = None  # для MinIO и других S3-совместимых хранилищ
+    COLD_STORAGE_S3_STORAGE_CLASS = None  # например STANDARD_IA
+    ARCHIVE_AFTER_DAYS = 90  # через сколько дней после завершения заказа файлы уходят в архив
+    ORDER_ARCHIVE_AFTER_DAYS = 365  # через сколько дней завершенные заказы переносятся в архивные таблицы
+    ORDER_ARCHIVE_BATCH_SIZE = 500  # заказов за одну транзакцию archive-orders
+    ORDER_ARCHIVE_BATCH_SLEEP = 0.05  # секунд паузы между порциями
+    EXPORT_FOLDER = 'print_export'  # горячая папка принтера
+    EXPORT_DPI = 300
+    EXPORT_FORMAT = 'JPEG'  # JPEG или TIFF
+    EXPORT_JPEG_QUALITY = 95
+    EXPORT_ICC_PROFILE = None  # путь к ICC-профилю принтера; без него - простое преобразование в EXPORT_COLOR_MODE
+    EXPORT_COLOR_MODE = 'CMYK'
+    EXPORT_RENDERING_INTENT = 'perceptual'  # perceptual, relative, saturation, absolute
+    EXPORT_WORKERS = None  # по умолчанию по числу ядер
+    COLOR_CORRECT_CLIP_PERCENT = 0.5  # процент самых темных и самых светлых пикселей, уходящих в черный и белый
+    COLOR_CORRECT_CONTRAST = 3.0  # крутизна S-кривой контраста, 0 - не менять контраст
+    COLOR_CORRECT_TILE_ROWS = 512  # строк в полосе обработки; меньше - меньше памяти на большой снимок
+    COLOR_CORRECT_JPEG_QUALITY = 95
+    COLOR_CORRECT_WORKERS = None  # по умолчанию по числу ядер
+    COLOR_CORRECT_SERVICES = ('Цветокоррекция',)  # заказы этих услуг (по названию) встают в очередь цветокоррекции сами
+    ASSETS_FOLDER = 'static/assets'  # сюда build-assets складывает файлы с хешем в имени
+    ASSETS_URL_PATH = '/assets'
+    ASSETS_BASE_URL = None  # например https://cdn.example.com/assets, если собранная папка выложена на CDN
+    FRAGMENT_CACHE_MAX_BYTES = 16 * 1024 * 1024  # отрендеренные строки заказов и карточки услуг в памяти процесса, 0 - без кеша
+    COMPRESS_ENABLED = True  # можно выключить, если сжатием занимается nginx перед приложением
+    COMPRESS_MIN_SIZE = 1024  # байт; меньшие ответы отдаются как есть
+    COMPRESS_LEVEL = 6  # gzip, 1-9
+    COMPRESS_BR_LEVEL = 4  # brotli, 0-11; высокие уровни слишком медленные для сжатия на лету
+    CHANGES_PAGE_SIZE = 500  # заказов в одном ответе /api/orders/changes
+    CHANGES_MAX_WAIT = 30  # секунд, дольше long-poll запрос не держится
+    CHANGES_POLL_INTERVAL = 1  # секунд между проверками во время ожидания
+    BACKUP_FOLDER = 'backups'
+    BACKUP_KEEP = 7  # сколько последних копий хранить в BACKUP_FOLDER
+    MAINTENANCE_VACUUM_PAGES = 1000  # сколько свободных страниц возвращать за один запуск maintain-db
+    RATELIMIT_ENABLED = True
+    RATELIMIT_STORAGE_URL = None  # redis://host:6379/0 - общий лимит для всех воркеров, иначе в памяти процесса
+    # Эндпоинт -> (запросов, за секунд[, методы]) на одного пользователя (анонимов считаем по IP);
+    # у форм считаются только отправки, открытие формы (GET) лимит не расходует
+    RATELIMIT_RULES = {
+        'login': (10, 60, ('POST',)),
+        'register': (5, 300, ('POST',)),
+        'create_order': (20, 60, ('POST',)),
+        'api_orders': (30, 60),
+        'api_order_changes': (60, 60),
+        'search_orders': (30, 60),
+        'download_orders_zip': (20, 60),
+        'api_turnaround': (30, 60),
+    }
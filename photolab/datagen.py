@@ -0,0 +1,126 @@
+"""Синтетические данные для нагрузочного тестирования"""
+from werkzeug.security import generate_password_hash
+from datetime import datetime, timedelta
+import click
+import random
+
+from .extensions import db
+from .models import User, Service, Order, OrderFile, OrderStatusEvent, ChangeCounter
+from .orders import capacity, rebuild_daily_stats
+
+GENERATED_STATUS_WEIGHTS = {'pending': 5, 'processing': 5, 'ready': 5, 'completed': 80, 'cancelled': 5}
+GENERATED_STATUS_CHAINS = {
+    'pending': ['pending'],
+    'processing': ['pending', 'processing'],
+    'ready': ['pending', 'processing', 'ready'],
+    'completed': ['pending', 'processing', 'ready', 'completed'],
+    'cancelled': ['pending', 'cancelled'],
+}
+
+def _bulk_insert(model, rows):
+    if rows:
+        db.session.execute(db.insert(model), rows)
+        db.session.commit()
+        rows.clear()
+
+def generate_data(users, orders, files, days=365, batch_size=10000, seed=None, echo=print):
+    """Заполняет базу синтетическими клиентами, заказами, файлами и журналом статусов.
+
+    Вставка идет пачками по batch_size строк через executemany, каждая пачка
+    в своей транзакции. Файлы создаются только в базе, на диск не пишутся.
+    """
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    services = [(s.id, s.price, s.processing_time or 24) for s in Service.query.all()]
+    if not services:
+        raise click.ClickException('В базе нет услуг, сначала выполните flask init-db')
+    db.session.execute(db.text('PRAGMA synchronous = OFF'))
+    
+    # Хеш пароля считается один раз: настоящий хеш на каждого клиента занял бы часы
+    password_hash = generate_password_hash('user123')
+    first_user = (db.session.query(db.func.max(User.id)).scalar() or 0) + 1
+    rows = []
+    for user_id in range(first_user, first_user + users):
+        rows.append({
+            'id': user_id,
+            'username': f'gen_user_{user_id}',
+            'email': f'gen_user_{user_id}@example.com',
+            'password_hash': password_hash,
+            'role': 'client',
+            'full_name': f'Клиент {user_id}',
+            'created_at': now - timedelta(days=rng.uniform(0, days)),
+        })
+        if len(rows) >= batch_size:
+            _bulk_insert(User, rows)
+    _bulk_insert(User, rows)
+    echo(f'Клиентов: {users}')
+    
+    customer_ids = range(first_user, first_user + users) if users else [u.id for u in User.query.filter_by(role='client')]
+    if orders and not customer_ids:
+        raise click.ClickException('Нет клиентов для заказов')
+    
+    statuses = list(GENERATED_STATUS_WEIGHTS)
+    weights = list(GENERATED_STATUS_WEIGHTS.values())
+    first_order = (db.session.query(db.func.max(Order.id)).scalar() or 0) + 1
+    # Номера изменений проставляются сразу, иначе триггер делал бы на каждую строку лишний UPDATE;
+    # весь диапазон заранее забирается из счетчика
+    last_change_seq = db.session.execute(
+        db.update(ChangeCounter).where(ChangeCounter.id == 1).values(value=ChangeCounter.value + orders)
+        .returning(ChangeCounter.value)
+    ).scalar_one()
+    db.session.commit()
+    first_change_seq = last_change_seq - orders + 1 - first_order
+    events = []
+    for order_id in range(first_order, first_order + orders):
+        service_id, price, hours = rng.choice(services)
+        status = rng.choices(statuses, weights)[0]
+        quantity = rng.randint(1, 50)
+        created_at = now - timedelta(days=rng.uniform(0, days))
+        
+        ts = created_at
+        for step in GENERATED_STATUS_CHAINS[status]:
+            if step != 'pending':
+                ts += timedelta(hours=hours * rng.uniform(0.1, 1.0))
+            events.append({'order_id': order_id, 'status': step, 'ts': ts})
+        
+        rows.append({
+            'id': order_id,
+            'order_number': f'GEN{order_id:010d}',
+            'customer_id': rng.choice(customer_ids),
+            'service_id': service_id,
+            'status': status,
+            'quantity': quantity,
+            'total_price': price * quantity,
+            'notes': rng.choice(['', '', '', 'Срочно', 'Матовая бумага', 'Позвонить перед выдачей']),
+            'created_at': created_at,
+            'due_date': created_at + timedelta(hours=hours),
+            'completed_at': ts if status == 'completed' else None,
+            'updated_at': ts,
+            'change_seq': first_change_seq + order_id,
+        })
+        if len(rows) >= batch_size:
+            _bulk_insert(Order, rows)
+            _bulk_insert(OrderStatusEvent, events)
+    _bulk_insert(Order, rows)
+    _bulk_insert(OrderStatusEvent, events)
+    echo(f'Заказов: {orders}')
+    
+    order_ids = range(first_order, first_order + orders) if orders else [o.id for o in Order.query.with_entities(Order.id)]
+    if files and not order_ids:
+        raise click.ClickException('Нет заказов для файлов')
+    for number in range(files):
+        order_id = rng.choice(order_ids)
+        rows.append({
+            'order_id': order_id,
+            'filename': f'gen_{order_id}_{number}.jpg',
+            'original_filename': f'IMG_{number % 10000:04d}.jpg',
+            'file_size': rng.randint(200 * 1024, 8 * 1024 * 1024),
+            'uploaded_at': now,
+        })
+        if len(rows) >= batch_size:
+            _bulk_insert(OrderFile, rows)
+    _bulk_insert(OrderFile, rows)
+    echo(f'Файлов: {files}')
+    
+    rebuild_daily_stats()
+    capacity.reset()
@@ -0,0 +1,79 @@
+"""Выгрузка всех файлов заказов одним ZIP-архивом с поддержкой докачки"""
+from flask import Response, request
+from datetime import datetime
+import hashlib
+import os
+
+from .extensions import db
+from .storage import file_crc32
+from .tiers import ensure_hot
+from .zipstream import ZipEntry, ZipLayout
+
+def order_zip_entries(orders):
+    """Записи архива: папка на каждый заказ, файлы под исходными именами
+    (вместо исходника - одобренная исправленная версия, см. Order.print_files).
+
+    Архивные файлы возвращаются на диск, а файлам, загруженным до появления
+    CRC32, он считается и сохраняется - следующая выгрузка уже не читает их.
+    """
+    entries = []
+    for order in orders:
+        used_names = set()
+        for order_file in order.print_files:
+            path = ensure_hot(order_file)
+            if not os.path.isfile(path):
+                continue
+            if order_file.crc32 is None:
+                order_file.crc32 = file_crc32(path)
+
+            # Клиент мог загрузить несколько файлов с одинаковым именем
+            name, ext = os.path.splitext(order_file.original_filename)
+            arcname, copy = order_file.original_filename, 1
+            while arcname.lower() in used_names:
+                copy += 1
+                arcname = f'{name} ({copy}){ext}'
+            used_names.add(arcname.lower())
+
+            entries.append(ZipEntry(f'{order.order_number}/{arcname}', path, os.path.getsize(path),
+                                    order_file.crc32, order_file.uploaded_at or datetime.utcnow()))
+    db.session.commit()
+    return entries
+
+def zip_response(entries, download_name):
+    """Ответ с архивом; Range с одним диапазоном отдается как 206 Partial Content"""
+    layout = ZipLayout(entries)
+    etag = hashlib.sha1(repr([(e.arcname, e.size, e.crc32) for e in entries]).encode()).hexdigest()
+    last_modified = max((e.modified for e in entries), default=datetime.utcnow()).replace(microsecond=0)
+
+    response = Response(mimetype='application/zip')
+    response.set_etag(etag)
+    response.last_modified = last_modified
+    response.accept_ranges = 'bytes'
+    response.headers['Content-Disposition'] = f'attachment; filename="{download_name}"'
+
+    if request.if_none_match.contains(etag):
+        response.status_code = 304
+        return response
+
+    start, stop = 0, layout.size
+    if request.range and request.range.units == 'bytes':
+        # If-Range: докачиваем, только если архив не изменился с первой попытки
+        if_range = request.if_range
+        unchanged = ((if_range.etag is None or if_range.etag == etag) and
+                     (if_range.date is None or if_range.date.replace(tzinfo=None) >= last_modified))
+        if unchanged:
+            byte_range = request.range.range_for_length(layout.size)
+            if byte_range is None and len(request.range.ranges) == 1:
+                response.status_code = 416
+                response.headers['Content-Range'] = f'bytes */{layout.size}'
+                return response
+            if byte_range is not None:
+                # Несколько диапазонов не поддерживаем: по стандарту можно отдать архив целиком
+                start, stop = byte_range
+                response.status_code = 206
+                response.headers['Content-Range'] = f'bytes {start}-{stop - 1}/{layout.size}'
+
+    response.response = layout.iter_bytes(start, stop)
+    response.direct_passthrough = True
+    response.content_length = stop - start
+    return response
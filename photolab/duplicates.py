@@ -0,0 +1,183 @@
+"""Поиск повторно загруженных фотографий по перцептивному хешу.
+
+dHash: снимок уменьшается до 9x8 в оттенках серого, каждый из 64 бит -
+ярче ли пиксель своего соседа справа. Пересжатая, уменьшенная или слегка
+подправленная копия дает хеш, отличающийся на несколько бит.
+
+Для поиска похожих хешей среди миллионов файлов используется multi-index
+hashing: хеш делится на 4 куска по 16 бит, каждый хранится в отдельной
+индексированной колонке OrderFile. Если два хеша отличаются не больше чем
+на 3 бита, хотя бы один кусок у них совпадает целиком, поэтому кандидатов
+находит точный поиск по индексам, а расстояние Хэмминга проверяется только
+у них.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+import time
+
+from .extensions import db
+from .models import Order, OrderFile
+from .storage import upload_path
+
+HASH_SIZE = 8
+HASH_CHUNKS = 4
+CHUNK_BITS = 64 // HASH_CHUNKS
+# С 4 кусками точно находятся хеши на расстоянии до 3 бит включительно
+MAX_DISTANCE = HASH_CHUNKS - 1
+CHUNK_COLUMNS = tuple(f'dhash_{i}' for i in range(HASH_CHUNKS))
+PROGRESS_INTERVAL = 2  # секунд между строками прогресса
+
+def dhash(path):
+    """64-битный dHash изображения; None, если файл не читается как картинка"""
+    from PIL import Image, ImageOps
+    
+    try:
+        with Image.open(path) as source:
+            # JPEG сразу декодируется в уменьшенном масштабе, полный кадр не нужен
+            source.draft('L', (HASH_SIZE * 8, HASH_SIZE * 8))
+            image = ImageOps.exif_transpose(source).convert('L')
+    except (OSError, ValueError, Image.DecompressionBombError):
+        return None
+    pixels = list(image.resize((HASH_SIZE + 1, HASH_SIZE), Image.Resampling.LANCZOS).getdata())
+    value = 0
+    for row in range(HASH_SIZE):
+        for col in range(HASH_SIZE):
+            left = pixels[row * (HASH_SIZE + 1) + col]
+            value = value << 1 | (left > pixels[row * (HASH_SIZE + 1) + col + 1])
+    return value
+
+def hash_chunks(value):
+    """Значения колонок dhash_0..dhash_3 для хеша (или None для всех)"""
+    if value is None:
+        return dict.fromkeys(CHUNK_COLUMNS)
+    mask = (1 << CHUNK_BITS) - 1
+    return {column: value >> (CHUNK_BITS * (HASH_CHUNKS - 1 - i)) & mask for i, column in enumerate(CHUNK_COLUMNS)}
+
+def _file_hash(row):
+    chunks = [getattr(row, column) for column in CHUNK_COLUMNS]
+    if None in chunks:
+        return None
+    value = 0
+    for chunk in chunks:
+        value = value << CHUNK_BITS | chunk
+    return value
+
+def find_duplicates(order):
+    """Похожие фотографии для файлов заказа: {id файла: [строки более ранних файлов клиента]}.
+
+    Сравниваются только файлы, загруженные раньше, - в этом заказе и в
+    прошлых заказах того же клиента. Поэтому результат не меняется от
+    последующих загрузок и предупреждение получает именно повтор, а не
+    оригинал. У строк есть id, order_id, order_number, original_filename и
+    distance.
+    """
+    files = [(order_file, _file_hash(order_file)) for order_file in order.files]
+    files = [(order_file, value) for order_file, value in files if value is not None]
+    if not files:
+        return {}
+    
+    columns = [getattr(OrderFile, column) for column in CHUNK_COLUMNS]
+    # Каждое условие IN идет по своему индексу; кандидатов немного, даже если файлов миллионы
+    chunk_match = db.or_(*(column.in_({getattr(order_file, column.key) for order_file, _ in files})
+                           for column in columns))
+    candidates = db.session.execute(
+        db.select(OrderFile.id, OrderFile.order_id, OrderFile.original_filename, Order.order_number, *columns)
+        .join(Order, Order.id == OrderFile.order_id)
+        .where(chunk_match, Order.customer_id == order.customer_id,
+               OrderFile.id < max(order_file.id for order_file, _ in files))
+    ).all()
+    
+    # Корзины по (номер куска, значение): каждый файл смотрит только в свои 4 корзины
+    buckets = {}
+    for candidate in candidates:
+        for i, column in enumerate(CHUNK_COLUMNS):
+            buckets.setdefault((i, getattr(candidate, column)), []).append(candidate)
+    
+    duplicates = {}
+    for order_file, value in files:
+        seen = set()
+        for i, column in enumerate(CHUNK_COLUMNS):
+            for candidate in buckets.get((i, getattr(order_file, column)), ()):
+                if candidate.id >= order_file.id or candidate.id in seen:
+                    continue
+                seen.add(candidate.id)
+                distance = (value ^ _file_hash(candidate)).bit_count()
+                if distance <= MAX_DISTANCE:
+                    duplicates.setdefault(order_file.id, []).append(dict(candidate._mapping, distance=distance))
+    for matches in duplicates.values():
+        matches.sort(key=lambda match: (match['distance'], match['id']))
+    return duplicates
+
+def _hash_file(job):
+    """Выполняется в процессе пула: (id, путь) -> (id, хеш или None)"""
+    file_id, path = job
+    return file_id, dhash(path)
+
+def _orders_with_new_matches(files):
+    """Заказы, для которых find_duplicates изменится после записи хешей files.
+
+    files - [(id файла, id клиента, хеш)]. Кроме заказов самих файлов это
+    заказы, где есть более поздние похожие файлы того же клиента: у них
+    появляется предупреждение о повторе.
+    """
+    order_ids = set()
+    columns = [getattr(OrderFile, column) for column in CHUNK_COLUMNS]
+    buckets = {}
+    for file_id, customer_id, value in files:
+        for i, chunk in enumerate(hash_chunks(value).values()):
+            buckets.setdefault((i, chunk), []).append((file_id, customer_id, value))
+    chunk_match = db.or_(*(column.in_({chunk for j, chunk in buckets if j == i}) for i, column in enumerate(columns)))
+    candidates = db.session.execute(
+        db.select(OrderFile.id, OrderFile.order_id, Order.customer_id, *columns)
+        .join(Order, Order.id == OrderFile.order_id)
+        .where(chunk_match, Order.customer_id.in_({customer_id for _, customer_id, _ in files}),
+               OrderFile.id > min(file_id for file_id, _, _ in files))
+    ).all()
+    for candidate in candidates:
+        value = _file_hash(candidate)
+        for i, column in enumerate(CHUNK_COLUMNS):
+            if any(candidate.customer_id == customer_id and candidate.id > file_id
+                   and (value ^ file_value).bit_count() <= MAX_DISTANCE
+                   for file_id, customer_id, file_value in buckets.get((i, getattr(candidate, column)), ())):
+                order_ids.add(candidate.order_id)
+                break
+    return order_ids
+
+def backfill_hashes(limit=None, workers=None, page_size=1000, echo=print):
+    """Считает хеши файлам, загруженным до их появления; возвращает (посчитано, не удалось)"""
+    query = (db.select(OrderFile.id, OrderFile.filename, OrderFile.order_id, Order.customer_id)
+             .join(Order, Order.id == OrderFile.order_id)
+             # Исправленные версии - производные от исходника, повтором они не считаются
+             .where(OrderFile.dhash_0.is_(None), OrderFile.source_file_id.is_(None), OrderFile.storage_tier == 'hot')
+             .order_by(OrderFile.id))
+    hashed = failed = 0
+    last_id = 0
+    started = reported = time.monotonic()
+    with ProcessPoolExecutor(workers) as pool:
+        while limit is None or hashed + failed < limit:
+            size = page_size if limit is None else min(page_size, limit - hashed - failed)
+            rows = db.session.execute(query.where(OrderFile.id > last_id).limit(size)).all()
+            if not rows:
+                break
+            last_id = rows[-1].id
+            
+            results = pool.map(_hash_file, [(row.id, upload_path(row.filename)) for row in rows],
+                               chunksize=max(len(rows) // 16, 1))
+            customers = {row.id: row.customer_id for row in rows}
+            files = [(file_id, customers[file_id], value) for file_id, value in results if value is not None]
+            failed += len(rows) - len(files)
+            hashed += len(files)
+            if files:
+                db.session.execute(db.update(OrderFile), [{'id': file_id, **hash_chunks(value)}
+                                                          for file_id, _, value in files])
+                # Предупреждения о повторах - часть страницы заказа: новая версия сбрасывает ее ETag
+                # и у заказов с файлами, которые теперь оказались повторами посчитанных
+                hashed_ids = {file_id for file_id, _, _ in files}
+                order_ids = {row.order_id for row in rows if row.id in hashed_ids} | _orders_with_new_matches(files)
+                db.session.execute(db.update(Order).where(Order.id.in_(order_ids)).values(updated_at=datetime.utcnow()))
+            db.session.commit()
+            
+            if time.monotonic() - reported >= PROGRESS_INTERVAL:
+                reported = time.monotonic()
+                echo(f'Посчитано хешей: {hashed}, не удалось: {failed}, {hashed / (reported - started):.0f} файлов/с')
+    return hashed, failed
@@ -0,0 +1,90 @@
+"""Кеш отрендеренных фрагментов страниц: строки и карточки заказов, карточки услуг.
+
+Списки заказов на каждый запрос заново рендерят одинаковую разметку
+каждого заказа, вместе с выпадающим списком статусов. Фрагмент зависит
+только от данных одного заказа (или услуги) и от роли смотрящего, поэтому
+готовый HTML хранится в памяти процесса по ключу (фрагмент, роль, версия
+данных) и используется всеми пользователями с той же ролью. Изменившийся
+заказ получает новую версию и новый ключ, старая запись просто перестает
+запрашиваться и со временем вытесняется.
+
+Объем кеша ограничен FRAGMENT_CACHE_MAX_BYTES, при превышении вытесняются
+давно не использованные фрагменты (LRU).
+"""
+from collections import OrderedDict
+from flask import current_app, render_template
+from flask_login import current_user
+from markupsafe import Markup
+import sys
+import threading
+
+# Примерный расход памяти на запись помимо самого HTML: ключ со строкой OrderRow и узел OrderedDict
+ENTRY_OVERHEAD = 1024
+
+class FragmentCache:
+    """LRU-кеш строк с ограничением суммарного размера в байтах"""
+    
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = self.misses = 0
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+    
+    def __len__(self):
+        return len(self._entries)
+    
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+    
+    def set(self, key, value):
+        size = sys.getsizeof(value) + ENTRY_OVERHEAD
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.size -= sys.getsizeof(previous) + ENTRY_OVERHEAD
+            self._entries[key] = value
+            self.size += size
+            while self.size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= sys.getsizeof(evicted) + ENTRY_OVERHEAD
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+def fragment(name, key, **context):
+    """HTML фрагмента fragments/<name>.html; key должен меняться вместе с любыми данными фрагмента.
+
+    Для заказов ключ - сама строка OrderRow: в ней id и версия заказа, а
+    также имена клиента и услуги, которые меняются без новой версии заказа.
+    Для услуг - (id, version). Кроме данных фрагмент может зависеть только
+    от роли пользователя.
+    """
+    cache = current_app.extensions.get('photolab_fragments')
+    if cache is None:
+        return Markup(render_template(f'fragments/{name}.html', **context))
+    
+    role = current_user.role if current_user.is_authenticated else None
+    cache_key = (name, role, key)
+    html = cache.get(cache_key)
+    if html is None:
+        html = render_template(f'fragments/{name}.html', **context)
+        cache.set(cache_key, html)
+    return Markup(html)
+
+def init_app(app):
+    max_bytes = app.config['FRAGMENT_CACHE_MAX_BYTES']
+    if max_bytes:
+        app.extensions['photolab_fragments'] = FragmentCache(max_bytes)
+    app.jinja_env.globals['fragment'] = fragment
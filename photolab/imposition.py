@@ -0,0 +1,208 @@
+"""Раскладка фото на печатные листы (n-up) и рендеринг листов"""
+from flask import current_app
+from datetime import datetime
+from collections import namedtuple
+import os
+
+from .extensions import db
+from .models import Order, Service
+from .tiers import ensure_hot
+
+SHEET_SIZES = {
+    'A4': (210, 297),
+    'A3': (297, 420),
+    'SRA3': (320, 450),
+}
+
+PrintItem = namedtuple('PrintItem', 'file_id order_number path width_mm height_mm')
+
+def pending_print_orders(service_id=None):
+    """Ожидающие заказы печатных услуг, у которых задан формат отпечатка"""
+    query = Order.query.join(Service).filter(
+        Order.status == 'pending',
+        Service.print_width_mm.isnot(None),
+        Service.print_height_mm.isnot(None)
+    )
+    if service_id:
+        query = query.filter(Order.service_id == service_id)
+    return query.options(db.selectinload(Order.files)).order_by(Order.due_date).all()
+
+def collect_print_items(orders):
+    """Разворачивает файлы заказов в отдельные отпечатки.
+
+    Количество в заказе - это число отпечатков, оно распределяется по файлам
+    поровну (каждый файл печатается хотя бы один раз).
+    """
+    items = []
+    for order in orders:
+        # Одобренная исправленная версия печатается вместо исходника
+        files = order.print_files
+        if not files:
+            continue
+        copies, extra = divmod(max(order.quantity or 1, len(files)), len(files))
+        for index, order_file in enumerate(files):
+            path = ensure_hot(order_file)
+            item = PrintItem(order_file.id, order.order_number, path,
+                             order.service.print_width_mm, order.service.print_height_mm)
+            items.extend([item] * (copies + (1 if index < extra else 0)))
+    return items
+
+def _place_on_sheet(sheet, orientations, usable_w, usable_h, gap):
+    # Сначала пробуем уже открытые полки: выбираем ту, где по высоте остается меньше всего пустоты
+    best = None
+    for shelf in sheet['shelves']:
+        for w, h in orientations:
+            if h <= shelf['height'] and shelf['x'] + w <= usable_w:
+                waste = shelf['height'] - h
+                if best is None or waste < best[0]:
+                    best = (waste, shelf, w, h)
+    if best:
+        _, shelf, w, h = best
+        x, y = shelf['x'], shelf['y']
+        shelf['x'] += w + gap
+        return x, y, w, h
+    
+    # Иначе открываем новую полку под предыдущими
+    y = sheet['next_y']
+    for w, h in orientations:
+        if y + h <= usable_h:
+            sheet['shelves'].append({'y': y, 'height': h, 'x': w + gap})
+            sheet['next_y'] = y + h + gap
+            return 0, y, w, h
+    return None
+
+def _pack(items, size_name, margin, gap, prefer_wide):
+    """Полочная укладка First Fit Decreasing с поворотом отпечатков"""
+    sheet_w, sheet_h = SHEET_SIZES[size_name]
+    usable_w, usable_h = sheet_w - 2 * margin, sheet_h - 2 * margin
+    sheets = []
+    skipped = []
+    
+    for item in sorted(items, key=lambda i: (max(i.width_mm, i.height_mm), min(i.width_mm, i.height_mm)), reverse=True):
+        orientations = sorted({(item.width_mm, item.height_mm), (item.height_mm, item.width_mm)},
+                              key=lambda o: (o[0] < o[1]) if prefer_wide else (o[0] > o[1]))
+        orientations = [(w, h) for w, h in orientations if w <= usable_w and h <= usable_h]
+        if not orientations:
+            skipped.append(item)
+            continue
+        
+        for sheet in sheets:
+            position = _place_on_sheet(sheet, orientations, usable_w, usable_h, gap)
+            if position:
+                break
+        else:
+            sheet = {'size': size_name, 'width_mm': sheet_w, 'height_mm': sheet_h,
+                     'shelves': [], 'next_y': 0, 'placements': []}
+            sheets.append(sheet)
+            position = _place_on_sheet(sheet, orientations, usable_w, usable_h, gap)
+        
+        x, y, w, h = position
+        sheet['placements'].append({
+            'item': item,
+            'x_mm': margin + x,
+            'y_mm': margin + y,
+            'width_mm': w,
+            'height_mm': h,
+        })
+    
+    for sheet in sheets:
+        del sheet['shelves'], sheet['next_y']
+    return sheets, skipped
+
+def _sheets_area(sheets):
+    return sum(sheet['width_mm'] * sheet['height_mm'] for sheet in sheets)
+
+def plan_imposition(items, sheet_names=None, margin=None, gap=None):
+    """Подбирает формат листа и раскладку с минимальным расходом бумаги.
+
+    Возвращает список листов и отпечатки, которые не помещаются ни на один лист.
+    """
+    sheet_names = [name for name in (sheet_names or SHEET_SIZES) if name in SHEET_SIZES]
+    margin = current_app.config['IMPOSITION_MARGIN_MM'] if margin is None else margin
+    gap = current_app.config['IMPOSITION_GAP_MM'] if gap is None else gap
+    if not items or not sheet_names:
+        return [], list(items)
+    
+    best = None
+    for name in sheet_names:
+        for prefer_wide in (True, False):
+            sheets, skipped = _pack(items, name, margin, gap, prefer_wide)
+            key = (len(skipped), _sheets_area(sheets))
+            if best is None or key < best[0]:
+                best = (key, sheets, skipped)
+    _, sheets, skipped = best
+    
+    # Хвост партии часто занимает лист лишь частично - пробуем уложить его на лист меньшего формата
+    if sheets:
+        tail_items = [placement['item'] for placement in sheets[-1]['placements']]
+        tail_area = sheets[-1]['width_mm'] * sheets[-1]['height_mm']
+        for name in sorted(sheet_names, key=lambda n: SHEET_SIZES[n][0] * SHEET_SIZES[n][1]):
+            if SHEET_SIZES[name][0] * SHEET_SIZES[name][1] >= tail_area:
+                break
+            tail, tail_skipped = _pack(tail_items, name, margin, gap, True)
+            if len(tail) == 1 and not tail_skipped:
+                sheets[-1] = tail[0]
+                break
+    
+    return sheets, skipped
+
+def paper_usage(sheets):
+    """Отчет о расходе бумаги по форматам листов"""
+    by_size = {}
+    for sheet in sheets:
+        usage = by_size.setdefault(sheet['size'], {'sheets': 0, 'prints': 0, 'sheet_area': 0, 'used_area': 0})
+        usage['sheets'] += 1
+        usage['prints'] += len(sheet['placements'])
+        usage['sheet_area'] += sheet['width_mm'] * sheet['height_mm']
+        usage['used_area'] += sum(p['width_mm'] * p['height_mm'] for p in sheet['placements'])
+    
+    for usage in by_size.values():
+        usage['utilization'] = usage['used_area'] / usage['sheet_area'] * 100
+    
+    sheet_area = sum(u['sheet_area'] for u in by_size.values())
+    used_area = sum(u['used_area'] for u in by_size.values())
+    return {
+        'by_size': by_size,
+        'sheets': len(sheets),
+        'prints': sum(u['prints'] for u in by_size.values()),
+        'sheet_area_m2': sheet_area / 1e6,
+        'waste_area_m2': (sheet_area - used_area) / 1e6,
+        'utilization': used_area / sheet_area * 100 if sheet_area else 0,
+    }
+
+def _mm_to_px(mm, dpi):
+    return round(mm * dpi / 25.4)
+
+def render_sheets(sheets, output_folder, dpi=None):
+    """Рендерит листы по одному и по мере готовности отдает пути к файлам.
+
+    В памяти одновременно находится только текущий лист и один исходный
+    снимок, причем JPEG декодируется сразу в уменьшенном масштабе (draft).
+    """
+    from PIL import Image, ImageOps
+    
+    dpi = dpi or current_app.config['IMPOSITION_DPI']
+    os.makedirs(output_folder, exist_ok=True)
+    batch = datetime.now().strftime('%Y%m%d_%H%M%S')
+    
+    for number, sheet in enumerate(sheets, 1):
+        canvas = Image.new('RGB', (_mm_to_px(sheet['width_mm'], dpi), _mm_to_px(sheet['height_mm'], dpi)), 'white')
+        for placement in sheet['placements']:
+            size = (_mm_to_px(placement['width_mm'], dpi), _mm_to_px(placement['height_mm'], dpi))
+            try:
+                with Image.open(placement['item'].path) as source:
+                    source.draft('RGB', (max(size), max(size)))
+                    image = ImageOps.exif_transpose(source).convert('RGB')
+            except OSError:
+                current_app.logger.warning('Файл %s не найден или поврежден, место на листе оставлено пустым', placement['item'].path)
+                continue
+            if image.width != image.height and (image.width > image.height) != (size[0] > size[1]):
+                image = image.transpose(Image.Transpose.ROTATE_90)
+            image = ImageOps.fit(image, size, Image.Resampling.LANCZOS)
+            canvas.paste(image, (_mm_to_px(placement['x_mm'], dpi), _mm_to_px(placement['y_mm'], dpi)))
+            image.close()
+        
+        path = os.path.join(output_folder, f"sheet_{batch}_{number:03d}_{sheet['size']}.jpg")
+        canvas.save(path, 'JPEG', quality=95, dpi=(dpi, dpi))
+        canvas.close()
+        yield path
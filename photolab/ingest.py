@@ -0,0 +1,251 @@
+"""Асинхронный прием загрузок для ASGI-сервера (uvicorn).
+
+POST /create_order с файлами читается потоком: multipart разбирается по мере
+поступления данных, файлы пишутся на диск в пуле потоков, поэтому медленный
+клиент занимает не поток воркера, а только сопрограмму, и один процесс
+держит сотни одновременных загрузок. Когда тело получено целиком, заказ
+сохраняется тем же кодом, что и в синхронном create_order.
+
+Остальные запросы передаются Flask-приложению через asgiref.WsgiToAsgi.
+"""
+import asyncio
+import io
+import os
+import sys
+import uuid
+
+from flask import flash, redirect, url_for
+from flask_login import current_user
+from werkzeug.exceptions import BadRequest, HTTPException, RequestEntityTooLarge
+from werkzeug.http import parse_options_header
+from werkzeug.sansio.multipart import MultipartDecoder, Field, File, Data, Epilogue, NeedData
+
+from .extensions import db
+from .models import Service
+from .orders import place_order, add_order_files
+from .storage import UploadDigest, allowed_file, adopt_upload
+
+INGEST_PATH = '/create_order'
+WRITE_BUFFER_SIZE = 256 * 1024  # копим данные файла до одной записи на диск
+MAX_FIELD_SIZE = 64 * 1024  # обычные поля формы короткие, держим их в памяти
+MAX_PARTS = 1000  # как max_form_parts у Flask
+
+class UploadIngestApp:
+    """ASGI-приложение: прием загрузок заказов, остальное - во Flask"""
+    
+    def __init__(self, app, fallback):
+        self.app = app
+        self.fallback = fallback
+    
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'http' and scope['method'] == 'POST' and scope['path'] == INGEST_PATH:
+            headers = dict(scope['headers'])
+            content_type, options = parse_options_header(headers.get(b'content-type', b'').decode('latin-1'))
+            if content_type == 'multipart/form-data' and options.get('boundary'):
+                await self._ingest(scope, receive, send, options['boundary'].encode('latin-1'))
+                return
+        await self.fallback(scope, receive, send)
+    
+    async def _ingest(self, scope, receive, send, boundary):
+        # Один контекст на весь запрос: before_request (лимит частоты, профилирование) выполняется
+        # один раз, а данные, которые он кладет в g, доживают до after_request
+        ctx = (self.app.app_context(), self.app.request_context(_environ(scope)))
+        # Пользователь проверяется до чтения тела, чтобы не принимать мегабайты от анонимов
+        response = await asyncio.to_thread(self._dispatch, ctx, self._check_upload, scope, preprocess=True)
+        if response is not None:
+            await self._send_response(send, response)
+            return
+        
+        spool = []
+        try:
+            fields = await self._receive_form(receive, boundary, spool)
+        except HTTPException as e:
+            await asyncio.to_thread(_discard, spool)
+            await self._send_response(send, await asyncio.to_thread(self._dispatch, ctx, _abort, e))
+            return
+        if fields is None:
+            # Клиент оборвал соединение
+            await asyncio.to_thread(_discard, spool)
+            return
+        
+        response = await asyncio.to_thread(self._dispatch, ctx, self._create_order, fields, spool)
+        # Перенесенные в заказ файлы уже переименованы, удаляются только остатки после ошибки
+        await asyncio.to_thread(_discard, spool)
+        await self._send_response(send, response)
+    
+    async def _receive_form(self, receive, boundary, spool):
+        """Читает тело запроса; поля возвращает словарем, файлы (путь, имя, UploadDigest) дописывает в spool"""
+        limit = self.app.config['MAX_CONTENT_LENGTH']
+        folder = self.app.config['UPLOAD_FOLDER']
+        await asyncio.to_thread(os.makedirs, folder, exist_ok=True)
+        
+        decoder = MultipartDecoder(boundary, max_parts=MAX_PARTS)
+        fields = {}
+        field_name = field_value = None
+        upload = buffer = digest = None
+        received = 0
+        event = None
+        try:
+            while not isinstance(event, Epilogue):
+                message = await receive()
+                if message['type'] == 'http.disconnect':
+                    return None
+                chunk = message.get('body', b'')
+                more_body = message.get('more_body', False)
+                received += len(chunk)
+                if limit is not None and received > limit:
+                    raise RequestEntityTooLarge()
+                decoder.receive_data(chunk)
+                if not more_body:
+                    decoder.receive_data(None)
+                
+                event = decoder.next_event()
+                while not isinstance(event, (NeedData, Epilogue)):
+                    if isinstance(event, File):
+                        # Файлы с неподходящим расширением и пустые поля выбора файла пропускаются
+                        if event.name == 'files' and allowed_file(event.filename or ''):
+                            path = os.path.join(folder, f'.{uuid.uuid4().hex}.part')
+                            upload = await asyncio.to_thread(open, path, 'wb')
+                            digest = UploadDigest()
+                            spool.append((path, event.filename, digest))
+                            buffer = bytearray()
+                        field_name = None
+                    elif isinstance(event, Field):
+                        field_name, field_value = event.name, bytearray()
+                    elif isinstance(event, Data):
+                        if upload is not None:
+                            buffer += event.data
+                            if len(buffer) >= WRITE_BUFFER_SIZE or not event.more_data:
+                                await asyncio.to_thread(_write, upload, digest, bytes(buffer))
+                                buffer.clear()
+                            if not event.more_data:
+                                await asyncio.to_thread(upload.close)
+                                upload = None
+                        elif field_name is not None:
+                            field_value += event.data
+                            if len(field_value) > MAX_FIELD_SIZE:
+                                raise RequestEntityTooLarge()
+                            if not event.more_data:
+                                fields[field_name] = field_value.decode('utf-8', 'replace')
+                                field_name = None
+                    event = decoder.next_event()
+                
+                if not more_body and not isinstance(event, Epilogue):
+                    raise BadRequest('Тело запроса оборвано')
+        except ValueError:
+            # Декодер не смог разобрать multipart
+            raise BadRequest()
+        finally:
+            if upload is not None:
+                await asyncio.to_thread(upload.close)
+        return fields
+    
+    def _dispatch(self, ctx, view, *args, preprocess=False):
+        """Выполняет синхронную часть в контексте запроса Flask, как обычный view.
+
+        Запрос обрабатывается в несколько заходов из разных потоков, поэтому
+        контексты ctx (приложения и запроса) создаются один раз и входят заново
+        в каждом заходе. before_request выполняется только в заходе с
+        preprocess, after_request - в том, который вернул ответ.
+        """
+        app = self.app
+        app_ctx, request_ctx = ctx
+        with app_ctx, request_ctx:
+            try:
+                try:
+                    rv = app.preprocess_request() if preprocess else None
+                    if rv is None:
+                        rv = view(*args)
+                        if rv is None:
+                            return None
+                except Exception as e:
+                    rv = app.handle_user_exception(e)
+                return app.finalize_request(rv)
+            except Exception as e:
+                return app.handle_exception(e)
+    
+    def _check_upload(self, scope):
+        if not current_user.is_authenticated:
+            return self.app.login_manager.unauthorized()
+        length = dict(scope['headers']).get(b'content-length')
+        limit = self.app.config['MAX_CONTENT_LENGTH']
+        if length and limit is not None and int(length) > limit:
+            raise RequestEntityTooLarge()
+        return None
+    
+    def _create_order(self, fields, spool):
+        try:
+            service = db.session.get(Service, int(fields['service_id']))
+            quantity = int(fields['quantity'])
+        except (KeyError, ValueError):
+            service = None
+        if not service:
+            flash('Услуга не найдена', 'danger')
+            return redirect(url_for('client_dashboard'))
+        
+        order = place_order(current_user.id, service, quantity, fields.get('notes', ''), fields.get('paper_type'))
+        add_order_files(order, [adopt_upload(path, filename, order.id, digest) for path, filename, digest in spool])
+        
+        flash(f'Заказ {order.order_number} успешно создан!', 'success')
+        return redirect(url_for('client_dashboard'))
+    
+    @staticmethod
+    async def _send_response(send, response):
+        headers = [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in response.headers.items()]
+        await send({'type': 'http.response.start', 'status': response.status_code, 'headers': headers})
+        await send({'type': 'http.response.body', 'body': response.get_data()})
+
+def _abort(error):
+    raise error
+
+def _write(upload, digest, data):
+    # sha256 и crc32 отпускают GIL на больших блоках, поэтому считаются в том же потоке, что и запись
+    digest.update(data)
+    upload.write(data)
+
+def _discard(spool):
+    for path, *_ in spool:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+def _environ(scope):
+    """WSGI-окружение без тела: его уже прочитал асинхронный код"""
+    server = scope.get('server') or ('localhost', 80)
+    client = scope.get('client') or ('', 0)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', ''),
+        'PATH_INFO': scope['path'],
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1]),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'REMOTE_ADDR': client[0],
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+    for name, value in scope['headers']:
+        key = name.decode('latin-1').upper().replace('-', '_')
+        if key in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+            environ[key] = value.decode('latin-1')
+        else:
+            key = f'HTTP_{key}'
+            value = value.decode('latin-1')
+            environ[key] = f'{environ[key]},{value}' if key in environ else value
+    return environ
+
+def create_asgi_app(app=None):
+    """ASGI-точка входа: uvicorn --factory photolab.ingest:create_asgi_app"""
+    from asgiref.wsgi import WsgiToAsgi
+    
+    if app is None:
+        from . import create_app
+        app = create_app()
+    return UploadIngestApp(app, WsgiToAsgi(app))
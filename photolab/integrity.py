@@ -0,0 +1,161 @@
+"""Проверка целостности загруженных файлов по sha256, записанному при загрузке.
+
+Файлы читаются через mmap: хеш считается прямо по страницам кеша ОС, без
+копирования в буферы Python. Хеширование идет в пуле процессов, а скорость
+чтения каждого процесса ограничена, чтобы проверка не отнимала диск у
+веб-воркеров.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+import hashlib
+import mmap
+import os
+import time
+
+from flask import current_app
+
+from .extensions import db
+from .models import OrderFile
+from .storage import upload_path
+
+HASH_CHUNK_SIZE = 4 * 1024 * 1024
+PROGRESS_INTERVAL = 2  # секунд между строками прогресса
+
+class TokenBucket:
+    """Ограничение скорости чтения, байт в секунду"""
+    
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.capacity = burst or rate
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+    
+    def consume(self, amount):
+        """Списывает amount байт; если их нет, ждет, пока корзина наполнится"""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= amount
+        if self.tokens < 0:
+            time.sleep(-self.tokens / self.rate)
+
+def sha256_file(path, bucket=None):
+    """sha256 и размер файла; данные читаются из mmap блоками по HASH_CHUNK_SIZE"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            # Пустой файл отобразить в память нельзя
+            return digest.hexdigest(), 0
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            if hasattr(mmap, 'MADV_SEQUENTIAL'):
+                mapped.madvise(mmap.MADV_SEQUENTIAL)
+            with memoryview(mapped) as view:
+                for offset in range(0, size, HASH_CHUNK_SIZE):
+                    # Срез memoryview не копирует данные, hashlib читает страницы напрямую
+                    with view[offset:offset + HASH_CHUNK_SIZE] as chunk:
+                        if bucket is not None:
+                            bucket.consume(len(chunk))
+                        digest.update(chunk)
+    return digest.hexdigest(), size
+
+_bucket = None
+
+def _init_worker(rate):
+    global _bucket
+    _bucket = TokenBucket(rate) if rate else None
+
+def _check_file(job):
+    """Выполняется в процессе пула: (id, путь, ожидаемая сумма) -> (id, статус, сумма, размер)"""
+    file_id, path, expected = job
+    try:
+        actual, size = sha256_file(path, _bucket)
+    except FileNotFoundError:
+        return file_id, 'missing', None, 0
+    except OSError:
+        return file_id, 'unreadable', None, 0
+    if expected is None:
+        return file_id, 'unrecorded', actual, size
+    return file_id, 'ok' if actual == expected else 'mismatch', actual, size
+
+def _pages(stale_before, limit, page_size):
+    """Файлы горячего уровня страницами по id; при stale_before - только давно не проверенные.
+
+    Архивные копии сверяются с checksum при возврате из архива.
+    """
+    query = (db.select(OrderFile.id, OrderFile.filename, OrderFile.checksum)
+             .where(OrderFile.storage_tier == 'hot')
+             .order_by(OrderFile.id))
+    if stale_before is not None:
+        query = query.where(db.or_(OrderFile.verified_at.is_(None), OrderFile.verified_at < stale_before))
+    last_id, remaining = 0, limit
+    while remaining is None or remaining > 0:
+        size = page_size if remaining is None else min(page_size, remaining)
+        rows = db.session.execute(query.where(OrderFile.id > last_id).limit(size)).all()
+        if not rows:
+            return
+        yield [(file_id, upload_path(filename), checksum) for file_id, filename, checksum in rows]
+        last_id = rows[-1].id
+        if remaining is not None:
+            remaining -= len(rows)
+
+def verify_storage(stale_before=None, limit=None, workers=None, rate_mb=None, backfill=False,
+                   page_size=1000, echo=print):
+    """Сверяет файлы заказов с контрольными суммами, возвращает счетчики по статусам.
+    
+    ok - совпало, mismatch - содержимое изменилось, missing/unreadable - файла
+    нет или он не читается, unrecorded - сумма не была записана (с backfill
+    она записывается).
+    """
+    workers = workers or current_app.config['STORAGE_VERIFY_WORKERS']
+    rate_mb = current_app.config['STORAGE_VERIFY_RATE_MB'] if rate_mb is None else rate_mb
+    rate = rate_mb * 1024 * 1024 / workers if rate_mb else None
+    
+    total_query = db.select(db.func.count(OrderFile.id)).where(OrderFile.storage_tier == 'hot')
+    if stale_before is not None:
+        total_query = total_query.where(db.or_(OrderFile.verified_at.is_(None), OrderFile.verified_at < stale_before))
+    total = db.session.execute(total_query).scalar()
+    if limit is not None:
+        total = min(total, limit)
+    
+    counts = dict.fromkeys(('ok', 'mismatch', 'missing', 'unreadable', 'unrecorded'), 0)
+    progress = {'files': 0, 'bytes': 0, 'started': time.monotonic(), 'reported': time.monotonic()}
+    
+    def handle(page, results):
+        now = datetime.utcnow()
+        updates = []
+        for (file_id, path, _), (_, status, actual, size) in zip(page, results):
+            counts[status] += 1
+            progress['files'] += 1
+            progress['bytes'] += size
+            if status == 'ok':
+                updates.append({'id': file_id, 'verified_at': now})
+            elif status == 'unrecorded' and backfill:
+                updates.append({'id': file_id, 'checksum': actual, 'verified_at': now})
+            elif status != 'unrecorded':
+                echo(f'{status}: {path} (файл #{file_id})')
+        if updates:
+            db.session.execute(db.update(OrderFile), updates)
+        db.session.commit()
+        
+        if time.monotonic() - progress['reported'] >= PROGRESS_INTERVAL:
+            progress['reported'] = time.monotonic()
+            elapsed = progress['reported'] - progress['started']
+            echo(f"Проверено {progress['files']} из {total}, {progress['bytes'] / 2**20:.0f} МБ, "
+                 f"{progress['bytes'] / 2**20 / elapsed:.1f} МБ/с, проблем "
+                 f"{counts['mismatch'] + counts['missing'] + counts['unreadable']}")
+    
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(rate,)) as pool:
+        # Пока обрабатываются результаты одной страницы, пул уже хеширует следующую
+        pending = None
+        for page in _pages(stale_before, limit, page_size):
+            results = pool.map(_check_file, page, chunksize=max(len(page) // (workers * 4), 1))
+            if pending is not None:
+                handle(*pending)
+            pending = page, results
+        if pending is not None:
+            handle(*pending)
+    
+    counts['bytes'] = progress['bytes']
+    counts['seconds'] = time.monotonic() - progress['started']
+    return counts
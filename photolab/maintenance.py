@@ -0,0 +1,148 @@
+"""Обслуживание базы SQLite без остановки приложения: резервные копии, статистика, сжатие.
+
+База работает в режиме WAL: читатели не блокируют писателей и наоборот.
+Копия снимается командой VACUUM INTO - одной транзакцией чтения, поэтому
+она согласована на момент начала копирования, а запись в базу во время
+копирования не прерывает и не перезапускает ее. Веб-воркеры все это время
+продолжают писать; изменения, сделанные после начала, в копию не попадают.
+"""
+from flask import current_app
+from datetime import datetime
+import glob
+import os
+import sqlite3
+import time
+
+from .extensions import db
+
+BACKUP_PREFIX = 'photolab-'
+BACKUP_SUFFIX = '.db'
+
+def _database_path():
+    url = db.engine.url
+    if url.get_backend_name() != 'sqlite' or url.database in (None, '', ':memory:'):
+        raise RuntimeError('Обслуживание поддерживается только для файловой базы SQLite')
+    return url.database
+
+def _raw_connection():
+    """sqlite3-соединение из пула приложения (с его настройками и путем к базе)"""
+    return db.engine.raw_connection()
+
+def enable_wal():
+    """Переводит файловую базу SQLite в режим WAL (он сохраняется в файле), возвращает итоговый режим"""
+    try:
+        _database_path()
+    except RuntimeError:
+        return None
+    connection = _raw_connection()
+    try:
+        # Если базу сейчас держат другие соединения, режим не сменится - PRAGMA вернет текущий
+        return connection.execute('PRAGMA journal_mode = WAL').fetchone()[0]
+    finally:
+        connection.close()
+
+def backup_database(target=None, keep=None, echo=print):
+    """Снимает копию базы в файл target (по умолчанию - в BACKUP_FOLDER с датой в имени).
+    
+    Возвращает путь к копии. Копия пишется во временный файл, проверяется
+    PRAGMA quick_check и только потом получает свое имя. Заодно она
+    сжимается: VACUUM INTO не переносит свободные страницы.
+    """
+    config = current_app.config
+    keep = config['BACKUP_KEEP'] if keep is None else keep
+    if target is None:
+        os.makedirs(config['BACKUP_FOLDER'], exist_ok=True)
+        target = os.path.join(config['BACKUP_FOLDER'],
+                              f"{BACKUP_PREFIX}{datetime.utcnow().strftime('%Y%m%d-%H%M%S')}{BACKUP_SUFFIX}")
+    tmp_path = f'{target}.part'
+    if os.path.exists(tmp_path):
+        # Остаток прерванной копии: VACUUM INTO пишет только в новый файл
+        os.remove(tmp_path)
+    
+    if enable_wal() != 'wal':
+        echo('База не в режиме WAL: на время копирования запись в нее будет ждать')
+    started = time.monotonic()
+    source = _raw_connection()
+    try:
+        source.execute('VACUUM INTO ?', (tmp_path,))
+    finally:
+        source.close()
+    with sqlite3.connect(tmp_path) as destination:
+        check = destination.execute('PRAGMA quick_check').fetchone()[0]
+    destination.close()
+    if check != 'ok':
+        os.remove(tmp_path)
+        raise RuntimeError(f'Копия базы повреждена: {check}')
+    os.replace(tmp_path, target)
+    echo(f'Копия {target}: {os.path.getsize(target) / 2**20:.1f} МБ за {time.monotonic() - started:.1f} с')
+    
+    if keep and os.path.dirname(os.path.abspath(target)) == os.path.abspath(config['BACKUP_FOLDER']):
+        # Имена с датой сортируются по времени, оставляем keep последних
+        backups = sorted(glob.glob(os.path.join(config['BACKUP_FOLDER'], f'{BACKUP_PREFIX}*{BACKUP_SUFFIX}')))
+        for old in backups[:-keep]:
+            os.remove(old)
+            echo(f'Удалена старая копия {old}')
+    return target
+
+def optimize_database(analyze=False, vacuum_pages=None, echo=print):
+    """Обновляет статистику планировщика и возвращает свободные страницы файлу.
+
+    PRAGMA optimize пересчитывает статистику только там, где она устарела,
+    и работает быстро; analyze=True пересчитывает ее по всем таблицам.
+    incremental_vacuum освобождает не больше vacuum_pages страниц за раз и
+    не блокирует базу надолго, но работает только в режиме
+    auto_vacuum=INCREMENTAL (см. enable_incremental_vacuum).
+    """
+    vacuum_pages = current_app.config['MAINTENANCE_VACUUM_PAGES'] if vacuum_pages is None else vacuum_pages
+    connection = _raw_connection()
+    try:
+        started = time.monotonic()
+        if analyze:
+            connection.execute('ANALYZE')
+            echo(f'ANALYZE: {time.monotonic() - started:.1f} с')
+        connection.execute('PRAGMA optimize')
+        
+        freelist = connection.execute('PRAGMA freelist_count').fetchone()[0]
+        auto_vacuum = connection.execute('PRAGMA auto_vacuum').fetchone()[0]
+        if auto_vacuum == 2:
+            # Курсор нужно дочитать: страницы освобождаются по мере выполнения
+            connection.execute(f'PRAGMA incremental_vacuum({int(vacuum_pages)})').fetchall()
+            freed = freelist - connection.execute('PRAGMA freelist_count').fetchone()[0]
+            echo(f'Освобождено страниц: {freed} из {freelist} свободных')
+        elif freelist:
+            echo(f'Свободных страниц: {freelist}; incremental_vacuum недоступен, '
+                 f'включите его командой maintain-db --enable-incremental-vacuum')
+        connection.commit()
+    finally:
+        connection.close()
+    echo(f'Обслуживание заняло {time.monotonic() - started:.1f} с')
+
+def enable_incremental_vacuum(echo=print):
+    """Переводит базу в auto_vacuum=INCREMENTAL; требует полного VACUUM, база блокируется на время его выполнения"""
+    connection = _raw_connection()
+    try:
+        connection.execute('PRAGMA auto_vacuum = INCREMENTAL')
+        started = time.monotonic()
+        connection.execute('VACUUM')
+        echo(f'VACUUM: {time.monotonic() - started:.1f} с, auto_vacuum = '
+             f"{connection.execute('PRAGMA auto_vacuum').fetchone()[0]}")
+    finally:
+        connection.close()
+
+def database_sizes():
+    """Размер таблиц и индексов: [(имя, тип, байт)] по убыванию размера, и размер файла"""
+    path = _database_path()
+    connection = _raw_connection()
+    try:
+        try:
+            rows = connection.execute(
+                'SELECT s.name, m.type, SUM(s.pgsize) FROM dbstat AS s '
+                'LEFT JOIN sqlite_master AS m ON m.name = s.name '
+                'GROUP BY s.name ORDER BY 3 DESC'
+            ).fetchall()
+        except sqlite3.OperationalError:
+            # SQLite собран без SQLITE_ENABLE_DBSTAT_VTAB - известен только размер файла
+            rows = []
+    finally:
+        connection.close()
+    return [(name, kind or 'table', size) for name, kind, size in rows], os.path.getsize(path)
@@ -0,0 +1,193 @@
+from flask_login import UserMixin
+from sqlalchemy import DDL, event
+from datetime import datetime
+
+from .extensions import db, login_manager
+
+# Модели базы данных
+class User(UserMixin, db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    username = db.Column(db.String(80), unique=True, nullable=False)
+    email = db.Column(db.String(120), unique=True, nullable=False)
+    password_hash = db.Column(db.String(128))
+    role = db.Column(db.String(20), default='client')  # client, admin, employee
+    phone = db.Column(db.String(20))
+    full_name = db.Column(db.String(100))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    orders = db.relationship('Order', backref='customer', lazy=True)
+
+class Service(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), nullable=False)
+    description = db.Column(db.Text)
+    price = db.Column(db.Float, nullable=False)
+    processing_time = db.Column(db.Integer)  # в часах
+    is_active = db.Column(db.Boolean, default=True)
+    category = db.Column(db.String(50), default='printing')
+    print_width_mm = db.Column(db.Integer)  # формат отпечатка, мм (для печатных услуг)
+    print_height_mm = db.Column(db.Integer)
+    # Меняются при каждом UPDATE строки, по ним строятся ETag и Last-Modified
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    version = db.Column(db.Integer, nullable=False, default=1, server_default='1',
+                        onupdate=db.literal_column('version') + 1)
+
+class Order(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    order_number = db.Column(db.String(20), unique=True, nullable=False)
+    customer_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, index=True)
+    service_id = db.Column(db.Integer, db.ForeignKey('service.id'), nullable=False)
+    status = db.Column(db.String(20), default='pending')  # pending, processing, ready, completed, cancelled
+    quantity = db.Column(db.Integer, default=1)
+    total_price = db.Column(db.Float, nullable=False)
+    notes = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    due_date = db.Column(db.DateTime)
+    completed_at = db.Column(db.DateTime)
+    paper_type = db.Column(db.String(20))  # glossy, matte - только для печатных услуг
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    version = db.Column(db.Integer, nullable=False, default=1, server_default='1',
+                        onupdate=db.literal_column('version') + 1)
+    change_seq = db.Column(db.Integer, index=True)  # сквозной номер последнего изменения, ставят триггеры ниже
+    color_correct_queued = db.Column(db.String(10), index=True)  # new, redo - ждет команды color-correct
+    
+    service = db.relationship('Service', backref='orders')
+    files = db.relationship('OrderFile', backref='order', lazy=True, cascade='all, delete-orphan')
+    status_events = db.relationship('OrderStatusEvent', backref='order', lazy=True, order_by='OrderStatusEvent.ts')
+    
+    is_archived = False
+    
+    @property
+    def print_files(self):
+        """Файлы для печати и выдачи: вместо исходника - его одобренная исправленная версия"""
+        approved = {f.source_file_id: f for f in self.files if f.review_status == 'approved'}
+        return [approved.get(f.id, f) for f in sorted(self.files, key=lambda f: f.id) if f.source_file_id is None]
+
+class ChangeCounter(db.Model):
+    """Последний выданный номер изменения заказа (change_seq), одна строка с id = 1.
+
+    Номер берется из счетчика, а не из MAX(change_seq): заказ с наибольшим
+    номером может уйти в архив, и тот же номер достался бы следующему изменению.
+    """
+    __tablename__ = 'change_counter'
+    id = db.Column(db.Integer, primary_key=True)
+    value = db.Column(db.Integer, nullable=False, default=0)
+
+event.listen(ChangeCounter.__table__, 'after_create', DDL('INSERT INTO change_counter (id, value) VALUES (1, 0)'))
+
+def _next_change_seq(table):
+    # Номер изменения выдают триггеры SQLite: они срабатывают на каждую строку под блокировкой записи,
+    # поэтому номера строго растут в порядке фиксации, в том числе для массовых UPDATE и вставок
+    return ('UPDATE change_counter SET value = value + 1 WHERE id = 1; '
+            f'UPDATE {table} SET change_seq = (SELECT value FROM change_counter WHERE id = 1) WHERE id = NEW.id;')
+
+class OrderFile(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    order_id = db.Column(db.Integer, db.ForeignKey('order.id'), nullable=False)
+    filename = db.Column(db.String(255), nullable=False, index=True)
+    original_filename = db.Column(db.String(255), nullable=False)
+    file_size = db.Column(db.Integer)
+    uploaded_at = db.Column(db.DateTime, default=datetime.utcnow)
+    checksum = db.Column(db.String(64))  # sha256 содержимого, считается при загрузке
+    crc32 = db.Column(db.Integer)  # для ZIP-архивов заказа; у старых файлов считается при первой выгрузке
+    verified_at = db.Column(db.DateTime)  # последняя успешная сверка с checksum
+    storage_tier = db.Column(db.String(10), nullable=False, default='hot', server_default='hot')  # hot, cold
+    tier_changed_at = db.Column(db.DateTime)
+    # Перцептивный хеш (dHash) по 16 бит в колонке, для поиска повторных загрузок (см. duplicates.py)
+    dhash_0 = db.Column(db.Integer, index=True)
+    dhash_1 = db.Column(db.Integer, index=True)
+    dhash_2 = db.Column(db.Integer, index=True)
+    dhash_3 = db.Column(db.Integer, index=True)
+    # Версии файла (например, после автоматической цветокоррекции) ссылаются на исходник и ждут проверки
+    source_file_id = db.Column(db.Integer, db.ForeignKey('order_file.id'), index=True)
+    review_status = db.Column(db.String(10))  # pending, approved, rejected; у загруженных клиентом - NULL
+    reviewed_at = db.Column(db.DateTime)
+    reviewed_by = db.Column(db.Integer, db.ForeignKey('user.id'))
+    
+    versions = db.relationship('OrderFile', backref=db.backref('source_file', remote_side=[id]), order_by='OrderFile.id')
+
+def _archive_table(table, name, *extra):
+    """Таблица архива с теми же колонками, что у table, но без ограничений и значений по умолчанию"""
+    columns = [db.Column(column.name, column.type, primary_key=column.primary_key) for column in table.columns]
+    return db.Table(name, db.metadata, *columns, *extra)
+
+class ArchivedOrder(db.Model):
+    """Старые завершенные и отмененные заказы, перенесенные командой archive-orders.
+
+    Строки только читаются: страница заказа и поиск обращаются к архиву,
+    когда об этом просят явно, поэтому основная таблица остается маленькой.
+    """
+    __table__ = _archive_table(
+        Order.__table__, 'archived_order',
+        db.Column('archived_at', db.DateTime),
+        db.Index('ix_archived_order_customer_id', 'customer_id'),
+        db.Index('ix_archived_order_order_number', 'order_number'),
+        db.Index('ix_archived_order_change_seq', 'change_seq'),
+    )
+    
+    # В архиве нет внешних ключей, связи задаются условием соединения
+    service = db.relationship('Service', primaryjoin='foreign(ArchivedOrder.service_id) == Service.id', viewonly=True)
+    customer = db.relationship('User', primaryjoin='foreign(ArchivedOrder.customer_id) == User.id', viewonly=True)
+    files = db.relationship('ArchivedOrderFile', primaryjoin='foreign(ArchivedOrderFile.order_id) == ArchivedOrder.id',
+                            order_by='ArchivedOrderFile.id', viewonly=True)
+    # Журнал статусов не переносится: по нему строятся отчеты о сроках выполнения
+    status_events = db.relationship('OrderStatusEvent', primaryjoin='foreign(OrderStatusEvent.order_id) == ArchivedOrder.id',
+                                    order_by='OrderStatusEvent.ts', viewonly=True)
+    
+    is_archived = True
+
+class ArchivedOrderFile(db.Model):
+    __table__ = _archive_table(
+        OrderFile.__table__, 'archived_order_file',
+        db.Index('ix_archived_order_file_order_id', 'order_id'),
+        db.Index('ix_archived_order_file_filename', 'filename'),
+    )
+
+# Имя триггера -> (таблица, определение после "CREATE TRIGGER <имя>"). В новой базе триггеры создаются
+# вместе с таблицей, в существующей их ставит и обновляет при изменении определения init-db (schema.py)
+_ORDER_CHANGE_SEQ = _next_change_seq('"order"')
+TRIGGERS = {
+    'order_change_seq_insert': (Order.__table__, 'AFTER INSERT ON "order" WHEN NEW.change_seq IS NULL '
+                                                 f'BEGIN {_ORDER_CHANGE_SEQ} END'),
+    'order_change_seq_update': (Order.__table__, 'AFTER UPDATE ON "order" WHEN NEW.change_seq IS OLD.change_seq '
+                                                 f'BEGIN {_ORDER_CHANGE_SEQ} END'),
+    # Удаление номера не выдает, но сдвигает счетчик: по нему строится ETag списка заказов
+    'order_change_counter_delete': (Order.__table__, 'AFTER DELETE ON "order" '
+                                                     'BEGIN UPDATE change_counter SET value = value + 1 WHERE id = 1; END'),
+    # Перенос в архив - тоже изменение: архивная строка получает новый номер и в ленте изменений
+    # сообщает клиентам, что заказ ушел из рабочих списков
+    'archived_order_change_seq_insert': (ArchivedOrder.__table__, 'AFTER INSERT ON archived_order '
+                                                                  f'BEGIN {_next_change_seq("archived_order")} END'),
+}
+for _name, (_table, _definition) in TRIGGERS.items():
+    event.listen(_table, 'after_create', DDL(f'CREATE TRIGGER IF NOT EXISTS {_name} {_definition}'))
+
+class OrderStatusEvent(db.Model):
+    """Журнал смены статусов заказа, записи только добавляются"""
+    __tablename__ = 'order_status_event'
+    id = db.Column(db.Integer, primary_key=True)
+    order_id = db.Column(db.Integer, db.ForeignKey('order.id'), nullable=False)
+    status = db.Column(db.String(20), nullable=False)
+    ts = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'))
+    
+    __table_args__ = (
+        db.Index('ix_order_status_event_order_ts', 'order_id', 'ts'),
+        db.Index('ix_order_status_event_status_ts', 'status', 'ts'),
+    )
+
+class DailyOrderStats(db.Model):
+    """Суточные итоги по заказам: день создания x услуга x текущий статус"""
+    __tablename__ = 'daily_order_stats'
+    day = db.Column(db.Date, primary_key=True)
+    service_id = db.Column(db.Integer, db.ForeignKey('service.id'), primary_key=True)
+    status = db.Column(db.String(20), primary_key=True)
+    order_count = db.Column(db.Integer, nullable=False, default=0)
+    quantity = db.Column(db.Integer, nullable=False, default=0)
+    revenue = db.Column(db.Float, nullable=False, default=0)
+    
+    service = db.relationship('Service')
+
+@login_manager.user_loader
+def load_user(user_id):
+    return User.query.get(int(user_id))
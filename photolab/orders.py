@@ -0,0 +1,283 @@
+from flask import current_app
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from datetime import datetime, timedelta
+from collections import namedtuple
+import threading
+import time
+import uuid
+
+from .duplicates import dhash, hash_chunks
+from .extensions import db
+from .models import User, Order, OrderFile, Service, OrderStatusEvent, DailyOrderStats, ArchivedOrder, ChangeCounter
+from .storage import upload_path
+
+ORDER_STATUSES = ['pending', 'processing', 'ready', 'completed', 'cancelled']
+STATUS_LABELS = {
+    'pending': 'Ожидает обработки',
+    'processing': 'В работе',
+    'ready': 'Готов к выдаче',
+    'completed': 'Завершен',
+    'cancelled': 'Отменен',
+}
+PAPER_TYPES = {'glossy': 'Глянцевая', 'matte': 'Матовая'}
+
+# Строка списка заказов (панели, поиск, API): только то, что показывается, без ORM-объекта.
+# namedtuple хранит поля в кортеже, без __dict__ и состояния сессии, и не попадает в identity map
+OrderRow = namedtuple('OrderRow', 'id order_number customer_name service_name status quantity total_price '
+                                  'created_at due_date change_seq version is_archived')
+
+class CapacityEstimator:
+    """Модель незавершенной работы по категориям услуг для расчета сроков.
+    
+    Очередь (часы работы в статусах pending/processing) загружается из базы
+    одним агрегирующим запросом и дальше поддерживается инкрементально при
+    создании заказов и смене статусов, поэтому оценка срока стоит O(1).
+    Раз в CAPACITY_RESYNC_SECONDS модель пересчитывается заново, чтобы
+    учесть изменения, сделанные другими процессами.
+    """
+    ACTIVE_STATUSES = ('pending', 'processing')
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._backlog = None
+        self._loaded_at = 0
+    
+    @staticmethod
+    def _hours(service):
+        return service.processing_time or 24
+    
+    def _ensure_loaded(self):
+        if self._backlog is not None and time.monotonic() - self._loaded_at < current_app.config['CAPACITY_RESYNC_SECONDS']:
+            return
+        rows = (db.session.query(Service.category, db.func.sum(db.func.coalesce(Service.processing_time, 24)))
+                .join(Order, Order.service_id == Service.id)
+                .filter(Order.status.in_(self.ACTIVE_STATUSES))
+                .group_by(Service.category)
+                .all())
+        self._backlog = {category: float(hours or 0) for category, hours in rows}
+        self._loaded_at = time.monotonic()
+    
+    def reset(self):
+        with self._lock:
+            self._backlog = None
+    
+    def backlog_hours(self, category):
+        with self._lock:
+            self._ensure_loaded()
+            return self._backlog.get(category, 0.0)
+    
+    def estimate_due_date(self, service, now=None):
+        """Срок готовности с учетом очереди в категории услуги"""
+        now = now or datetime.utcnow()
+        lanes = current_app.config['PRODUCTION_LANES'].get(service.category, 1)
+        wait_hours = self.backlog_hours(service.category) / max(lanes, 1)
+        return now + timedelta(hours=wait_hours + self._hours(service))
+    
+    def order_added(self, service):
+        self._adjust(service, self._hours(service))
+    
+    def status_changed(self, service, old_status, new_status):
+        was_active = old_status in self.ACTIVE_STATUSES
+        is_active = new_status in self.ACTIVE_STATUSES
+        if was_active != is_active:
+            self._adjust(service, self._hours(service) if is_active else -self._hours(service))
+    
+    def _adjust(self, service, hours):
+        with self._lock:
+            if self._backlog is not None:
+                self._backlog[service.category] = max(self._backlog.get(service.category, 0.0) + hours, 0.0)
+
+capacity = CapacityEstimator()
+
+def update_daily_stats(order, status, sign=1):
+    """Добавляет (sign=1) или вычитает (sign=-1) заказ из суточных итогов.
+    
+    Выполняется в той же транзакции, что и изменение заказа.
+    """
+    values = {
+        'day': order.created_at.date(),
+        'service_id': order.service_id,
+        'status': status,
+        'order_count': sign,
+        'quantity': sign * (order.quantity or 0),
+        'revenue': sign * (order.total_price or 0),
+    }
+    stmt = sqlite_insert(DailyOrderStats).values(**values)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['day', 'service_id', 'status'],
+        set_={
+            'order_count': DailyOrderStats.order_count + stmt.excluded.order_count,
+            'quantity': DailyOrderStats.quantity + stmt.excluded.quantity,
+            'revenue': DailyOrderStats.revenue + stmt.excluded.revenue,
+        }
+    )
+    db.session.execute(stmt)
+
+def rebuild_daily_stats():
+    """Пересчитывает суточные итоги по всем заказам, включая архивные"""
+    db.session.query(DailyOrderStats).delete()
+    orders = db.union_all(*(
+        db.select(model.id, model.created_at, model.service_id, model.status, model.quantity, model.total_price)
+        for model in (Order, ArchivedOrder)
+    )).subquery()
+    totals = db.select(
+        db.func.date(orders.c.created_at),
+        orders.c.service_id,
+        orders.c.status,
+        db.func.count(orders.c.id),
+        db.func.coalesce(db.func.sum(orders.c.quantity), 0),
+        db.func.coalesce(db.func.sum(orders.c.total_price), 0),
+    ).group_by(db.func.date(orders.c.created_at), orders.c.service_id, orders.c.status)
+    db.session.execute(db.insert(DailyOrderStats).from_select(
+        ['day', 'service_id', 'status', 'order_count', 'quantity', 'revenue'], totals
+    ))
+    db.session.commit()
+
+def set_order_status(order, new_status, user_id=None):
+    """Меняет статус заказа, возвращает True, если он изменился; коммит остается за вызывающим кодом.
+
+    Переход - условный UPDATE ... WHERE status = <прочитанный статус>. Если заказ
+    тем временем изменил другой запрос, строка не обновляется, и переход вместе
+    с суточными итогами и записью журнала не учитывается второй раз.
+    """
+    old_status = order.status
+    if old_status == new_status:
+        return False
+    now = datetime.utcnow()
+    values = {'status': new_status}
+    if new_status == 'completed':
+        values['completed_at'] = now
+    updated = db.session.execute(
+        db.update(Order).where(Order.id == order.id, Order.status == old_status).values(**values)
+    ).rowcount
+    if updated != 1:
+        db.session.refresh(order)
+        return False
+    
+    update_daily_stats(order, old_status, -1)
+    update_daily_stats(order, new_status)
+    db.session.add(OrderStatusEvent(order_id=order.id, status=new_status, ts=now, user_id=user_id))
+    capacity.status_changed(order.service, old_status, new_status)
+    return True
+
+def place_order(customer_id, service, quantity, notes='', paper_type=None):
+    """Создает заказ со сроком по текущей загрузке и фиксирует его в базе"""
+    if service.category != 'printing' or paper_type not in PAPER_TYPES:
+        paper_type = None
+    
+    order = Order(
+        # Временный уникальный номер: настоящий строится из id после вставки
+        order_number=uuid.uuid4().hex[:20],
+        customer_id=customer_id,
+        service_id=service.id,
+        status='pending',
+        quantity=quantity,
+        total_price=service.price * quantity,
+        notes=notes,
+        created_at=datetime.utcnow(),
+        # Рассчитываем срок выполнения с учетом текущей загрузки лаборатории
+        due_date=capacity.estimate_due_date(service),
+        paper_type=paper_type
+    )
+    
+    db.session.add(order)
+    db.session.flush()
+    # Номер по id, а не по COUNT(*): одновременные заказы не получат одинаковый номер
+    order.order_number = f"PL{datetime.now().strftime('%Y%m%d')}{order.id:04d}"
+    update_daily_stats(order, order.status)
+    db.session.add(OrderStatusEvent(order_id=order.id, status=order.status, ts=order.created_at, user_id=customer_id))
+    db.session.commit()
+    capacity.order_added(service)
+    return order
+
+def add_order_files(order, saved_files):
+    """Записывает в базу файлы заказа, уже сохраненные на диск (список SavedUpload)"""
+    for saved in saved_files:
+        # Хеш считается по уменьшенной при декодировании копии, это миллисекунды на файл
+        photo_hash = hash_chunks(dhash(upload_path(saved.filename)))
+        db.session.add(OrderFile(order_id=order.id, **saved._asdict(), **photo_hash))
+    if saved_files:
+        # Список файлов - часть страницы заказа: новая версия заказа сбрасывает ее ETag
+        order.updated_at = datetime.utcnow()
+        # Очередь ставится вместе с файлами, чтобы color-correct не снял с нее заказ, пока они не записаны
+        if order.service.name in current_app.config['COLOR_CORRECT_SERVICES']:
+            order.color_correct_queued = 'new'
+    db.session.commit()
+
+def order_version(order_id):
+    """Версии заказа и его услуги одним запросом по первичному ключу, без загрузки связей.
+    
+    Возвращает строку с customer_id, version, updated_at, service_version и
+    service_updated_at или None, если заказа нет.
+    """
+    return db.session.execute(
+        db.select(Order.customer_id, Order.version, Order.updated_at,
+                  Service.version.label('service_version'), Service.updated_at.label('service_updated_at'))
+        .join(Service, Service.id == Order.service_id)
+        .where(Order.id == order_id)
+    ).first()
+
+def orders_version(customer_id=None):
+    """Сводная версия списка заказов (всех или одного клиента) и справочника услуг.
+    
+    Для всего списка это значение счетчика change_counter: он растет при
+    каждом добавлении, изменении, удалении и переносе заказа в архив и
+    читается одной строкой. Для клиента - число его заказов, последний
+    номер изменения и последнее изменение, по индексу customer_id. У всего
+    списка нет Last-Modified: его пришлось бы искать по всей таблице, и
+    ответ сверяется только по ETag.
+    """
+    service_version = db.select(db.func.coalesce(db.func.sum(Service.version), 0)).scalar_subquery()
+    if customer_id is None:
+        query = db.select(
+            ChangeCounter.value.label('version'),
+            db.null().label('updated_at'),
+            service_version.label('service_version'),
+            db.null().label('service_updated_at'),
+        ).where(ChangeCounter.id == 1)
+    else:
+        query = db.select(
+            db.func.count(Order.id).label('order_count'),
+            db.func.max(Order.change_seq).label('version'),
+            db.func.max(Order.updated_at).label('updated_at'),
+            service_version.label('service_version'),
+            db.select(db.func.max(Service.updated_at)).scalar_subquery().label('service_updated_at'),
+        ).where(Order.customer_id == customer_id)
+    return db.session.execute(query).one()
+
+def _changes_filter(query, model, customer_id):
+    return query.where(model.customer_id == customer_id) if customer_id is not None else query
+
+def latest_change_seq(customer_id=None):
+    """Номер последнего изменения среди заказов и архива (всех или одного клиента), 0 - изменений нет"""
+    queries = [_changes_filter(db.select(db.func.max(model.change_seq)), model, customer_id) for model in (Order, ArchivedOrder)]
+    return max(db.session.execute(query).scalar() or 0 for query in queries)
+
+def order_changes(since, customer_id=None, limit=500):
+    """Заказы (OrderRow), созданные или измененные после номера изменения since, по возрастанию номера.
+    
+    Заказ, перенесенный в архив, приходит строкой с is_archived: перенос
+    выдает ему новый номер, и клиент узнает, что заказ пора убрать из списка.
+    """
+    # Каждая таблица отдает не больше limit строк по своему индексу change_seq, затем они сливаются
+    parts = [_changes_filter(order_rows_query(model).where(model.change_seq > since), model, customer_id)
+             .order_by(model.change_seq).limit(limit).subquery()
+             for model in (Order, ArchivedOrder)]
+    changes = db.union_all(*(db.select(part) for part in parts)).subquery()
+    return fetch_order_rows(db.select(changes).order_by(changes.c.change_seq).limit(limit))
+
+def order_rows_query(model=Order):
+    """select() полей OrderRow из таблицы заказов или архива; имена клиента и услуги - через JOIN.
+
+    Условия, сортировка и limit добавляются к результату как к обычному select().
+    """
+    return (db.select(model.id, model.order_number, User.username, Service.name, model.status, model.quantity,
+                      model.total_price, model.created_at, model.due_date, model.change_seq, model.version,
+                      db.literal(model.is_archived, db.Boolean))
+            .join(User, User.id == model.customer_id)
+            .join(Service, Service.id == model.service_id))
+
+def fetch_order_rows(query):
+    """Выполняет запрос order_rows_query и возвращает список OrderRow"""
+    return list(map(OrderRow._make, db.session.execute(query).tuples()))
+
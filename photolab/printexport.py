@@ -0,0 +1,191 @@
+"""Подготовка файлов заказов к печати: размер отпечатка, цветовой профиль принтера.
+
+Каждый файл обрабатывается в отдельном процессе пула, поэтому скорость
+растет с числом ядер. Результат пишется во временный файл и атомарно
+переименовывается, так что в горячей папке принтера не бывает недописанных
+файлов, а повторный запуск пропускает уже готовые и продолжает с места
+остановки.
+"""
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from collections import namedtuple
+from flask import current_app
+from werkzeug.utils import secure_filename
+import hashlib
+import io
+import os
+import time
+
+from .extensions import db
+from .models import Order, Service
+from .tiers import ensure_hot
+
+ExportJob = namedtuple('ExportJob', 'file_id source target width_mm height_mm')
+
+EXPORT_FORMATS = {'JPEG': 'jpg', 'TIFF': 'tif'}
+RENDERING_INTENTS = {'perceptual': 0, 'relative': 1, 'saturation': 2, 'absolute': 3}
+PROGRESS_INTERVAL = 2  # секунд между строками прогресса
+EXIF_ORIENTATION = 0x0112
+
+def processing_print_orders(order_ids=None):
+    """Заказы в работе, у услуги которых задан формат отпечатка"""
+    query = Order.query.join(Service).filter(
+        Order.status == 'processing',
+        Service.print_width_mm.isnot(None),
+        Service.print_height_mm.isnot(None)
+    )
+    if order_ids:
+        query = query.filter(Order.id.in_(order_ids))
+    return query.options(db.selectinload(Order.files)).order_by(Order.due_date).all()
+
+def color_tag(icc_profile, color_mode, intent):
+    """Часть имени результата, зависящая от цветового преобразования.
+
+    Без профиля - режим (cmyk, rgb), с профилем - его имя и хеш содержимого
+    вместе с rendering intent: выгрузка под другой профиль не принимает
+    старые файлы за готовые.
+    """
+    if not icc_profile:
+        return color_mode.lower()
+    digest = hashlib.sha256(intent.encode())
+    with open(icc_profile, 'rb') as f:
+        digest.update(f.read())
+    stem = secure_filename(os.path.splitext(os.path.basename(icc_profile))[0]) or 'icc'
+    return f'{stem}-{digest.hexdigest()[:8]}'
+
+def export_jobs(orders, folder, dpi, file_format, tag):
+    """По заданию на каждый файл; имя результата зависит от формата отпечатка, dpi и цветового тега (color_tag)"""
+    jobs = []
+    for order in orders:
+        service = order.service
+        for order_file in order.print_files:
+            stem = os.path.splitext(order_file.original_filename)[0]
+            name = (f'{order_file.id}_{stem}_{service.print_width_mm}x{service.print_height_mm}mm_{dpi}dpi_{tag}.'
+                    f'{EXPORT_FORMATS[file_format]}')
+            jobs.append(ExportJob(order_file.id, ensure_hot(order_file), os.path.join(folder, order.order_number, name),
+                                  service.print_width_mm, service.print_height_mm))
+    return jobs
+
+# Состояние процесса пула: профиль принтера и построенные для него преобразования
+_worker = {}
+
+def _init_worker(dpi, file_format, quality, icc_profile, intent, color_mode):
+    _worker.update(dpi=dpi, format=file_format, quality=quality, intent=intent, color_mode=color_mode,
+                   profile=None, transforms={})
+    if icc_profile:
+        from PIL import ImageCms
+        _worker['profile'] = ImageCms.getOpenProfile(icc_profile)
+
+def rgb_profile(embedded):
+    """Встроенный ICC-профиль снимка, если он читается и описывает RGB, иначе None"""
+    from PIL import ImageCms
+    
+    if not embedded:
+        return None
+    try:
+        profile = ImageCms.ImageCmsProfile(io.BytesIO(embedded))
+    except (OSError, ImageCms.PyCMSError):
+        return None
+    # Профиль CMYK- или серого снимка описывает исходные пиксели, а не полученные convert('RGB')
+    return profile if profile.profile.xcolor_space.strip() == 'RGB' else None
+
+def _to_printer_colors(image, embedded):
+    """Переводит снимок (RGB) в цветовое пространство принтера"""
+    from PIL import ImageCms
+    
+    profile = _worker['profile']
+    if profile is None:
+        # Без профиля принтера - простое преобразование Pillow
+        return image.convert(_worker['color_mode'])
+    
+    # Встроенный в снимок профиль (Adobe RGB и т.п.) учитывается, иначе считаем снимок sRGB
+    transform = _worker['transforms'].get(embedded)
+    if transform is None:
+        source = rgb_profile(embedded) or ImageCms.createProfile('sRGB')
+        output_mode = 'CMYK' if profile.profile.xcolor_space.strip() == 'CMYK' else 'RGB'
+        # Построение преобразования дорогое, поэтому оно кешируется на весь процесс
+        transform = ImageCms.buildTransform(source, profile, 'RGB', output_mode,
+                                            renderingIntent=_worker['intent'])
+        _worker['transforms'][embedded] = transform
+    return ImageCms.applyTransform(image, transform)
+
+def _mm_to_px(mm, dpi):
+    return round(mm * dpi / 25.4)
+
+def _export_file(job):
+    """Выполняется в процессе пула, возвращает (id файла, статус, сообщение)"""
+    from PIL import Image, ImageOps
+    
+    if os.path.exists(job.target):
+        return job.file_id, 'skipped', job.target
+    
+    dpi = _worker['dpi']
+    tmp_path = os.path.join(os.path.dirname(job.target), f'.{os.path.basename(job.target)}.part')
+    # Битый снимок, ошибка цветового преобразования или записи (нет места, нет прав) - ошибка одного
+    # файла: она возвращается в результате, а не обрывает выгрузку всего пакета
+    try:
+        with Image.open(job.source) as source:
+            embedded_profile = source.info.get('icc_profile')
+            source_w, source_h = source.size
+            if source.getexif().get(EXIF_ORIENTATION, 1) in (5, 6, 7, 8):
+                source_w, source_h = source_h, source_w
+            width, height = _mm_to_px(job.width_mm, dpi), _mm_to_px(job.height_mm, dpi)
+            # Альбомный снимок печатается на альбомном отпечатке того же формата
+            if (source_w > source_h) != (width > height):
+                width, height = height, width
+            # JPEG сразу декодируется в уменьшенном масштабе, если исходник сильно больше отпечатка
+            source.draft('RGB', (max(width, height), max(width, height)))
+            image = ImageOps.fit(ImageOps.exif_transpose(source).convert('RGB'), (width, height), Image.Resampling.LANCZOS)
+        
+        image = _to_printer_colors(image, embedded_profile)
+        os.makedirs(os.path.dirname(job.target), exist_ok=True)
+        options = {'dpi': (dpi, dpi)}
+        if _worker['profile'] is not None:
+            options['icc_profile'] = _worker['profile'].tobytes()
+        if _worker['format'] == 'JPEG':
+            options['quality'] = _worker['quality']
+        else:
+            options['compression'] = 'tiff_lzw'
+        image.save(tmp_path, _worker['format'], **options)
+        os.replace(tmp_path, job.target)
+    except Exception as e:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return job.file_id, 'failed', f'{job.source}: {e}'
+    return job.file_id, 'exported', job.target
+
+def export_prints(orders, folder=None, dpi=None, icc_profile=None, workers=None, force=False, echo=print):
+    """Готовит файлы заказов к печати в пуле процессов, возвращает счетчики по статусам"""
+    config = current_app.config
+    folder = folder or config['EXPORT_FOLDER']
+    dpi = dpi or config['EXPORT_DPI']
+    icc_profile = icc_profile or config['EXPORT_ICC_PROFILE']
+    file_format = config['EXPORT_FORMAT']
+    
+    intent = config['EXPORT_RENDERING_INTENT']
+    jobs = export_jobs(orders, folder, dpi, file_format, color_tag(icc_profile, config['EXPORT_COLOR_MODE'], intent))
+    if force:
+        for job in jobs:
+            if os.path.exists(job.target):
+                os.remove(job.target)
+    
+    counts = {'exported': 0, 'skipped': 0, 'failed': 0}
+    started = reported = time.monotonic()
+    initargs = (dpi, file_format, config['EXPORT_JPEG_QUALITY'], icc_profile,
+                RENDERING_INTENTS[intent], config['EXPORT_COLOR_MODE'])
+    with ProcessPoolExecutor(workers or config['EXPORT_WORKERS'] or os.cpu_count(),
+                             initializer=_init_worker, initargs=initargs) as pool:
+        futures = [pool.submit(_export_file, job) for job in jobs]
+        for done, future in enumerate(as_completed(futures), 1):
+            file_id, status, message = future.result()
+            counts[status] += 1
+            if status == 'failed':
+                echo(f'Ошибка, файл #{file_id}: {message}')
+            
+            now = time.monotonic()
+            if now - reported >= PROGRESS_INTERVAL or done == len(jobs):
+                reported = now
+                rate = done / (now - started) if now > started else 0
+                eta = (len(jobs) - done) / rate if rate else 0
+                echo(f"Готово {done} из {len(jobs)} (выгружено {counts['exported']}, пропущено {counts['skipped']}, "
+                     f"ошибок {counts['failed']}), {rate:.1f} файлов/с, осталось ~{eta:.0f} с")
+    return counts
@@ -0,0 +1,169 @@
+"""Профилирование запросов, подключается при PROFILING_ENABLED (PHOTOLAB_PROFILING=1).
+
+Время SQL считается по событиям SQLAlchemy, время шаблонов - в render_page.
+Метрики отдаются в формате Prometheus на /metrics: сотрудникам или сборщику
+с заголовком Authorization: Bearer <PROFILING_METRICS_TOKEN>.
+
+Метрики накапливаются в памяти процесса, и /metrics отдает данные того
+воркера, который принял запрос. При нескольких воркерах каждый опрос видит
+только их часть, поэтому для точных значений профилируйте с одним воркером
+(serve --workers 1), а общую картину по всем воркерам дает журнал
+photolab.profiling: в него пишется каждый запрос.
+"""
+from flask import current_app, g, request, has_request_context
+from flask_login import current_user
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+import hmac
+import json
+import logging
+import threading
+import time
+
+profiling_log = logging.getLogger('photolab.profiling')
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+SIZE_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+class Histogram:
+    """Гистограмма с фиксированными границами корзин, как в Prometheus"""
+    
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+    
+    def observe(self, value):
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[index] += 1
+                break
+        self.count += 1
+        self.sum += value
+
+class RequestMetrics:
+    """Метрики запросов по эндпоинтам, накапливаются в памяти процесса (у каждого воркера свои)"""
+    
+    HISTOGRAMS = {
+        'photolab_request_duration_seconds': ('Время обработки запроса', DURATION_BUCKETS),
+        'photolab_request_sql_queries': ('Число SQL-запросов на запрос', COUNT_BUCKETS),
+        'photolab_request_sql_duration_seconds': ('Время выполнения SQL на запрос', DURATION_BUCKETS),
+        'photolab_request_template_seconds': ('Время рендеринга шаблонов на запрос', DURATION_BUCKETS),
+        'photolab_response_size_bytes': ('Размер ответа', SIZE_BUCKETS),
+    }
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._requests = {}
+    
+    def record(self, endpoint, method, status, values):
+        with self._lock:
+            key = (endpoint, method, status)
+            self._requests[key] = self._requests.get(key, 0) + 1
+            for name, value in values.items():
+                histogram = self._histograms.get((name, endpoint))
+                if histogram is None:
+                    histogram = self._histograms[(name, endpoint)] = Histogram(self.HISTOGRAMS[name][1])
+                histogram.observe(value)
+    
+    def render(self):
+        """Текстовый формат экспозиции Prometheus"""
+        lines = [
+            '# HELP photolab_requests_total Число обработанных запросов',
+            '# TYPE photolab_requests_total counter',
+        ]
+        with self._lock:
+            for (endpoint, method, status), value in sorted(self._requests.items()):
+                lines.append(f'photolab_requests_total{{endpoint="{endpoint}",method="{method}",status="{status}"}} {value}')
+            
+            for name, (help_text, _) in self.HISTOGRAMS.items():
+                lines.append(f'# HELP {name} {help_text}')
+                lines.append(f'# TYPE {name} histogram')
+                for (metric, endpoint), histogram in sorted(self._histograms.items()):
+                    if metric != name:
+                        continue
+                    cumulative = 0
+                    for bound, count in zip(histogram.buckets, histogram.counts):
+                        cumulative += count
+                        lines.append(f'{name}_bucket{{endpoint="{endpoint}",le="{bound}"}} {cumulative}')
+                    lines.append(f'{name}_bucket{{endpoint="{endpoint}",le="+Inf"}} {histogram.count}')
+                    lines.append(f'{name}_sum{{endpoint="{endpoint}"}} {histogram.sum}')
+                    lines.append(f'{name}_count{{endpoint="{endpoint}"}} {histogram.count}')
+        return '\n'.join(lines) + '\n'
+
+request_metrics = RequestMetrics()
+
+def _current_profile():
+    if has_request_context():
+        return g.get('profile')
+    return None
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _profile_before_query(conn, cursor, statement, parameters, context, executemany):
+    if _current_profile() is not None:
+        conn.info.setdefault('query_started', []).append(time.perf_counter())
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _profile_after_query(conn, cursor, statement, parameters, context, executemany):
+    profile = _current_profile()
+    if profile is not None and conn.info.get('query_started'):
+        profile['sql_queries'] += 1
+        profile['sql_time'] += time.perf_counter() - conn.info['query_started'].pop()
+
+def start_request_profile():
+    g.profile = {'started': time.perf_counter(), 'sql_queries': 0, 'sql_time': 0.0, 'template_time': 0.0}
+
+def finish_request_profile(response):
+    profile = g.pop('profile', None)
+    if profile is None:
+        return response
+    
+    duration = time.perf_counter() - profile['started']
+    size = response.calculate_content_length() if not response.is_streamed else None
+    endpoint = request.endpoint or 'unknown'
+    values = {
+        'photolab_request_duration_seconds': duration,
+        'photolab_request_sql_queries': profile['sql_queries'],
+        'photolab_request_sql_duration_seconds': profile['sql_time'],
+        'photolab_request_template_seconds': profile['template_time'],
+    }
+    if size is not None:
+        values['photolab_response_size_bytes'] = size
+    request_metrics.record(endpoint, request.method, response.status_code, values)
+    
+    profiling_log.info(json.dumps({
+        'endpoint': endpoint,
+        'method': request.method,
+        'path': request.path,
+        'status': response.status_code,
+        'duration_ms': round(duration * 1000, 2),
+        'sql_queries': profile['sql_queries'],
+        'sql_ms': round(profile['sql_time'] * 1000, 2),
+        'template_ms': round(profile['template_time'] * 1000, 2),
+        'response_bytes': size,
+    }, ensure_ascii=False))
+    return response
+
+def _metrics_allowed():
+    token = current_app.config['PROFILING_METRICS_TOKEN']
+    authorization = request.authorization
+    if token and authorization is not None and authorization.type == 'bearer':
+        return hmac.compare_digest((authorization.token or '').encode(), token.encode())
+    return current_user.is_authenticated and current_user.role in ['admin', 'employee']
+
+def metrics():
+    if not _metrics_allowed():
+        return 'Доступ запрещен', 403, {'Content-Type': 'text/plain; charset=utf-8'}
+    return request_metrics.render(), 200, {'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'}
+
+def init_app(app):
+    app.before_request(start_request_profile)
+    app.after_request(finish_request_profile)
+    app.add_url_rule('/metrics', 'metrics', metrics)
+    
+    if not profiling_log.handlers:
+        profiling_log.addHandler(logging.StreamHandler())
+        profiling_log.setLevel(logging.INFO)
@@ -0,0 +1,120 @@
+"""Ограничение частоты запросов: token bucket на пару (пользователь, эндпоинт).
+
+Правила задаются в RATELIMIT_RULES: эндпоинт -> (запросов, за секунд) или
+(запросов, за секунд, методы) - тогда считаются только запросы этих методов.
+Корзина вмещает столько запросов, сколько разрешено за период, и плавно
+пополняется, поэтому короткий всплеск проходит, а постоянный опрос
+упирается в среднюю скорость. Состояние хранится в памяти процесса или,
+если задан RATELIMIT_STORAGE_URL, в Redis - тогда лимит общий для всех
+воркеров.
+"""
+from flask import current_app, g, jsonify, request
+from flask_login import current_user
+import math
+import threading
+import time
+
+class MemoryStore:
+    """Корзины в памяти процесса; у каждого воркера свой счет"""
+    MAX_KEYS = 100000  # при превышении забываем уже наполнившиеся корзины
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._buckets = {}
+    
+    def consume(self, key, capacity, rate):
+        """Забирает один токен; возвращает (разрешено, токенов осталось, через сколько секунд повторить)"""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated, _ = self._buckets.get(key, (capacity, now, now))
+            tokens = min(capacity, tokens + (now - updated) * rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            # Третье поле - момент, когда корзина снова станет полной
+            self._buckets[key] = (tokens, now, now + (capacity - tokens) / rate)
+            if len(self._buckets) > self.MAX_KEYS:
+                self._prune(now)
+        return allowed, int(tokens), 0 if allowed else (1 - tokens) / rate
+    
+    def _prune(self, now):
+        # Полная корзина ничем не отличается от отсутствующей
+        for key, (_, _, full_at) in list(self._buckets.items()):
+            if full_at <= now:
+                del self._buckets[key]
+
+# Скрипт выполняется в Redis атомарно: чтение, пополнение и списание без гонок между воркерами
+_REDIS_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local time = redis.call('TIME')
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(bucket[1]) or capacity
+local updated = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + (now - updated) * rate)
+local allowed = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate * 1000))
+return {allowed, tostring(tokens)}
+"""
+
+class RedisStore:
+    """Корзины в Redis, общие для всех процессов и серверов"""
+    
+    def __init__(self, url, prefix='photolab:ratelimit:'):
+        import redis
+        self.client = redis.Redis.from_url(url)
+        self.script = self.client.register_script(_REDIS_SCRIPT)
+        self.prefix = prefix
+    
+    def consume(self, key, capacity, rate):
+        allowed, tokens = self.script(keys=[self.prefix + key], args=[capacity, rate])
+        tokens = float(tokens)
+        return bool(allowed), int(tokens), 0 if allowed else (1 - tokens) / rate
+
+def _client_key():
+    if current_user.is_authenticated:
+        return f'user:{current_user.id}'
+    return f'ip:{request.remote_addr}'
+
+def check_rate_limit():
+    rule = current_app.config['RATELIMIT_RULES'].get(request.endpoint)
+    if rule is None:
+        return None
+    requests_allowed, period, *methods = rule
+    if methods and request.method not in methods[0]:
+        return None
+    store = current_app.extensions['photolab_ratelimit']
+    allowed, remaining, retry_after = store.consume(f'{request.endpoint}:{_client_key()}',
+                                                    requests_allowed, requests_allowed / period)
+    g.rate_limit = (requests_allowed, remaining)
+    if allowed:
+        return None
+    
+    retry_after = max(math.ceil(retry_after), 1)
+    message = f'Слишком много запросов, повторите через {retry_after} с'
+    if request.path.startswith('/api/'):
+        response = jsonify({'error': message})
+    else:
+        response = current_app.response_class(message, mimetype='text/plain')
+    response.status_code = 429
+    response.headers['Retry-After'] = str(retry_after)
+    return response
+
+def add_rate_limit_headers(response):
+    limit = g.pop('rate_limit', None)
+    if limit is not None:
+        response.headers['X-RateLimit-Limit'] = str(limit[0])
+        response.headers['X-RateLimit-Remaining'] = str(limit[1])
+    return response
+
+def init_app(app):
+    url = app.config['RATELIMIT_STORAGE_URL']
+    app.extensions['photolab_ratelimit'] = RedisStore(url) if url else MemoryStore()
+    app.before_request(check_rate_limit)
+    app.after_request(add_rate_limit_headers)
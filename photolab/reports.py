@@ -0,0 +1,57 @@
+from datetime import datetime, timedelta
+
+from .extensions import db
+
+TURNAROUND_SQL = """
+WITH orders AS (
+    -- Заказы, перенесенные archive-orders, тоже участвуют в статистике
+    SELECT id, service_id, created_at FROM "order"
+    UNION ALL
+    SELECT id, service_id, created_at FROM archived_order
+),
+completions AS (
+    SELECT order_id, MIN(ts) AS completed_ts
+    FROM order_status_event
+    WHERE status = 'completed' AND ts >= :since
+    GROUP BY order_id
+),
+stages AS (
+    SELECT e.order_id, e.status,
+           (julianday(LEAD(e.ts) OVER (PARTITION BY e.order_id ORDER BY e.ts, e.id)) - julianday(e.ts)) * 24 AS hours
+    FROM order_status_event e
+    WHERE e.ts >= :since
+),
+measures AS (
+    SELECT o.service_id, 'total' AS stage, (julianday(c.completed_ts) - julianday(o.created_at)) * 24 AS hours
+    FROM completions c JOIN orders o ON o.id = c.order_id
+    UNION ALL
+    SELECT o.service_id, st.status, st.hours
+    FROM stages st JOIN orders o ON o.id = st.order_id
+    WHERE st.hours IS NOT NULL AND st.status NOT IN ('completed', 'cancelled')
+),
+ranked AS (
+    SELECT service_id, stage, hours,
+           ROW_NUMBER() OVER (PARTITION BY service_id, stage ORDER BY hours) AS rn,
+           COUNT(*) OVER (PARTITION BY service_id, stage) AS cnt
+    FROM measures
+)
+SELECT s.id AS service_id, s.name AS service, r.stage, MAX(r.cnt) AS orders,
+       AVG(r.hours) AS avg_hours,
+       MIN(CASE WHEN r.rn >= 0.5 * r.cnt THEN r.hours END) AS p50,
+       MIN(CASE WHEN r.rn >= 0.9 * r.cnt THEN r.hours END) AS p90,
+       MIN(CASE WHEN r.rn >= 0.95 * r.cnt THEN r.hours END) AS p95
+FROM ranked r JOIN service s ON s.id = r.service_id
+GROUP BY r.service_id, r.stage
+ORDER BY s.name, r.stage
+"""
+
+def turnaround_percentiles(days=90):
+    """Перцентили времени выполнения заказов и этапов по услугам, в часах.
+
+    Считается целиком в SQL оконными функциями: LEAD дает длительность
+    каждого этапа, ROW_NUMBER/COUNT - ранг для перцентиля по ближайшему рангу.
+    Этап 'total' - от создания заказа до первого перевода в 'completed'.
+    """
+    since = datetime.utcnow() - timedelta(days=days)
+    rows = db.session.execute(db.text(TURNAROUND_SQL), {'since': since}).mappings().all()
+    return [dict(row) for row in rows]
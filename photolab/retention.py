@@ -0,0 +1,69 @@
+"""Перенос старых заказов из рабочих таблиц в архивные.
+
+Завершенные и отмененные заказы старше ORDER_ARCHIVE_AFTER_DAYS вместе с
+записями о файлах переезжают в archived_order и archived_order_file той же
+базы. Перенос идет небольшими порциями: каждая порция - одна короткая
+транзакция (копирование и удаление вместе), между порциями база свободна
+для веб-воркеров. Журнал статусов остается на месте, по нему строятся
+отчеты, а суточные итоги не меняются - архивные заказы в них уже учтены.
+"""
+from flask import current_app
+from datetime import datetime, timedelta
+import time
+
+from .extensions import db
+from .models import ArchivedOrder, ArchivedOrderFile, Order, OrderFile
+from .tiers import ARCHIVED_STATUSES
+
+def archive_candidates(days):
+    """id заказов, завершенных или отмененных больше days дней назад"""
+    cutoff = datetime.utcnow() - timedelta(days=days)
+    # SQLite выдает новой строке max(id) + 1: если удалить строку с наибольшим id,
+    # номер достанется следующему заказу и совпадет с архивным. Поэтому самый
+    # новый заказ и заказ с самым новым файлом остаются в рабочих таблицах
+    newest_order = db.select(db.func.max(Order.id)).scalar_subquery()
+    newest_file_order = db.select(OrderFile.order_id).order_by(OrderFile.id.desc()).limit(1)
+    return (db.select(Order.id)
+            .where(Order.status.in_(ARCHIVED_STATUSES),
+                   # У отмененных заказов нет completed_at, для них считаем от создания
+                   db.func.coalesce(Order.completed_at, Order.created_at) < cutoff,
+                   Order.id < newest_order,
+                   Order.id.not_in(newest_file_order))
+            .order_by(Order.id))
+
+def _copy_rows(archive, model, where, *extra):
+    """INSERT ... SELECT всех колонок model в таблицу archive; возвращает число строк"""
+    columns = [column.name for column in model.__table__.columns]
+    rows = db.select(*model.__table__.columns, *extra).where(where)
+    result = db.session.execute(db.insert(archive).from_select(columns + [c.name for c in extra], rows))
+    return result.rowcount
+
+def archive_orders(days=None, limit=None, dry_run=False, batch_size=None, echo=print):
+    """Переносит старые заказы в архивные таблицы, возвращает (заказов, файлов)"""
+    config = current_app.config
+    days = config['ORDER_ARCHIVE_AFTER_DAYS'] if days is None else days
+    batch_size = batch_size or config['ORDER_ARCHIVE_BATCH_SIZE']
+    moved = moved_files = 0
+    last_id = 0
+    while limit is None or moved < limit:
+        size = batch_size if limit is None else min(batch_size, limit - moved)
+        ids = db.session.execute(archive_candidates(days).where(Order.id > last_id).limit(size)).scalars().all()
+        if not ids:
+            break
+        last_id = ids[-1]
+        moved += len(ids)
+        if dry_run:
+            continue
+        
+        archived_at = db.literal(datetime.utcnow(), db.DateTime).label('archived_at')
+        _copy_rows(ArchivedOrder, Order, Order.id.in_(ids), archived_at)
+        moved_files += _copy_rows(ArchivedOrderFile, OrderFile, OrderFile.order_id.in_(ids))
+        db.session.execute(db.delete(OrderFile).where(OrderFile.order_id.in_(ids)),
+                           execution_options={'synchronize_session': False})
+        db.session.execute(db.delete(Order).where(Order.id.in_(ids)),
+                           execution_options={'synchronize_session': False})
+        db.session.commit()
+        echo(f'Перенесено в архив: {moved} заказов, {moved_files} файлов')
+        # Пауза дает ожидающим записям пройти между порциями
+        time.sleep(config['ORDER_ARCHIVE_BATCH_SLEEP'])
+    return moved, moved_files
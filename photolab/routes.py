@@ -0,0 +1,574 @@
+from flask import request, redirect, url_for, flash, jsonify, send_from_directory, current_app, abort
+from flask_login import login_user, logout_user, login_required, current_user
+from werkzeug.security import generate_password_hash, check_password_hash
+from datetime import datetime, timedelta
+import os
+import time
+
+from .colorcorrect import queue_color_correction, review_version
+from .conditional import cache_validators, not_modified, with_validators
+from .downloads import order_zip_entries, zip_response
+from .duplicates import find_duplicates
+from .extensions import db
+from .models import User, Service, Order, OrderFile, DailyOrderStats, ArchivedOrder, ArchivedOrderFile
+from .imposition import SHEET_SIZES, pending_print_orders, collect_print_items, plan_imposition, paper_usage, render_sheets
+from .orders import (ORDER_STATUSES, STATUS_LABELS, PAPER_TYPES, capacity, set_order_status,
+                     place_order, add_order_files, order_version, orders_version, latest_change_seq,
+                     order_changes, order_rows_query, fetch_order_rows)
+from .reports import turnaround_percentiles
+from .scheduling import build_production_queue
+from .storage import allowed_file, save_upload, upload_path
+from .templating import render_page
+from .tiers import ensure_hot
+
+_routes = []
+
+def route(rule, **options):
+    """Как app.route, но маршрут регистрируется позже, в init_app фабрики.
+    
+    Имя эндпоинта остается именем функции, поэтому url_for('admin_dashboard')
+    в шаблонах работает без префикса блюпринта.
+    """
+    def decorator(view):
+        _routes.append((rule, view, options))
+        return view
+    return decorator
+
+def init_app(app):
+    for rule, view, options in _routes:
+        app.add_url_rule(rule, view.__name__, view, **options)
+
+@route('/')
+def index():
+    if current_user.is_authenticated:
+        if current_user.role in ['admin', 'employee']:
+            return redirect(url_for('admin_dashboard'))
+        else:
+            return redirect(url_for('client_dashboard'))
+    
+    services = Service.query.filter_by(is_active=True).limit(6).all()
+    return render_page('index.html', services=services)
+
+@route('/register', methods=['GET', 'POST'])
+def register():
+    if request.method == 'POST':
+        username = request.form['username']
+        email = request.form['email']
+        password = request.form['password']
+        phone = request.form.get('phone', '')
+        full_name = request.form.get('full_name', '')
+        
+        # Проверяем существование пользователя
+        if User.query.filter_by(username=username).first():
+            flash('Пользователь с таким именем уже существует', 'danger')
+            return render_page('register.html')
+        
+        if User.query.filter_by(email=email).first():
+            flash('Пользователь с таким email уже существует', 'danger')
+            return render_page('register.html')
+        
+        # Создаем нового пользователя
+        user = User(
+            username=username,
+            email=email,
+            password_hash=generate_password_hash(password),
+            phone=phone,
+            full_name=full_name
+        )
+        db.session.add(user)
+        db.session.commit()
+        
+        flash('Регистрация успешна! Войдите в систему.', 'success')
+        return redirect(url_for('login'))
+    
+    return render_page('register.html')
+
+@route('/login', methods=['GET', 'POST'])
+def login():
+    if request.method == 'POST':
+        username = request.form['username']
+        password = request.form['password']
+        
+        user = User.query.filter_by(username=username).first()
+        
+        if user and check_password_hash(user.password_hash, password):
+            login_user(user)
+            flash(f'Добро пожаловать, {user.username}!', 'success')
+            return redirect(url_for('index'))
+        else:
+            flash('Неверные учетные данные', 'danger')
+    
+    return render_page('login.html')
+
+@route('/logout')
+@login_required
+def logout():
+    logout_user()
+    flash('Вы вышли из системы', 'info')
+    return redirect(url_for('index'))
+
+@route('/client_dashboard')
+@login_required
+def client_dashboard():
+    if current_user.role not in ['client']:
+        return redirect(url_for('admin_dashboard'))
+    
+    orders = fetch_order_rows(order_rows_query()
+                              .where(Order.customer_id == current_user.id)
+                              .order_by(Order.created_at.desc()))
+    services = Service.query.filter_by(is_active=True).all()
+    
+    # Статистика для клиента
+    total_orders = len(orders)
+    pending_orders = len([o for o in orders if o.status == 'pending'])
+    ready_orders = len([o for o in orders if o.status == 'ready'])
+    
+    stats = {
+        'total_orders': total_orders,
+        'pending_orders': pending_orders,
+        'ready_orders': ready_orders
+    }
+    
+    return render_page('client_dashboard.html', orders=orders, services=services, stats=stats)
+
+@route('/admin_dashboard')
+@login_required
+def admin_dashboard():
+    if current_user.role not in ['admin', 'employee']:
+        flash('Доступ запрещен', 'danger')
+        return redirect(url_for('client_dashboard'))
+    
+    orders = fetch_order_rows(order_rows_query().order_by(Order.created_at.desc()).limit(50))
+    services = Service.query.all()
+    users = User.query.all()
+    
+    # Статистика берется из суточных итогов, а не из таблицы заказов
+    by_status = dict(
+        db.session.query(DailyOrderStats.status, db.func.sum(DailyOrderStats.order_count))
+        .group_by(DailyOrderStats.status)
+        .all()
+    )
+    total_revenue = db.session.query(db.func.sum(DailyOrderStats.revenue)).filter_by(status='completed').scalar() or 0
+    
+    stats = {
+        'total_orders': sum(by_status.values()),
+        'pending_orders': by_status.get('pending', 0),
+        'processing_orders': by_status.get('processing', 0),
+        'ready_orders': by_status.get('ready', 0),
+        'total_revenue': total_revenue
+    }
+    
+    return render_page('admin_dashboard.html', orders=orders, services=services, users=users, stats=stats)
+
+@route('/create_order', methods=['GET', 'POST'])
+@login_required
+def create_order():
+    if request.method == 'POST':
+        service_id = request.form['service_id']
+        quantity = int(request.form['quantity'])
+        notes = request.form.get('notes', '')
+        paper_type = request.form.get('paper_type')
+        
+        service = Service.query.get(service_id)
+        if not service:
+            flash('Услуга не найдена', 'danger')
+            return redirect(url_for('client_dashboard'))
+        
+        order = place_order(current_user.id, service, quantity, notes, paper_type)
+        
+        # Обработка загруженных файлов
+        if 'files' in request.files:
+            files = request.files.getlist('files')
+            add_order_files(order, [save_upload(file, order.id) for file in files
+                                    if file and file.filename and allowed_file(file.filename)])
+        
+        flash(f'Заказ {order.order_number} успешно создан!', 'success')
+        return redirect(url_for('client_dashboard'))
+    
+    services = Service.query.filter_by(is_active=True).all()
+    return render_page('create_order.html', services=services, paper_types=PAPER_TYPES)
+
+@route('/order/<int:order_id>')
+@login_required
+def order_details(order_id):
+    version = order_version(order_id)
+    if version is None:
+        return archived_order_details(order_id)
+    
+    # Проверяем права доступа
+    if current_user.role == 'client' and version.customer_id != current_user.id:
+        flash('Доступ запрещен', 'danger')
+        return redirect(url_for('client_dashboard'))
+    
+    # Заказ и услуга не менялись с прошлого просмотра - страница у клиента актуальна
+    validators = cache_validators(version)
+    response = not_modified(validators)
+    if response is not None:
+        return response
+    
+    order = Order.query.get_or_404(order_id)
+    return with_validators(render_page('order_details.html', order=order, paper_types=PAPER_TYPES,
+                                       status_labels=STATUS_LABELS, duplicates=find_duplicates(order)), validators)
+
+def archived_order_details(order_id):
+    # Архивные таблицы читаются, только когда об этом просят явно (?archive=1, ссылки из поиска по архиву)
+    if not request.args.get('archive'):
+        abort(404)
+    order = db.get_or_404(ArchivedOrder, order_id)
+    if current_user.role == 'client' and order.customer_id != current_user.id:
+        flash('Доступ запрещен', 'danger')
+        return redirect(url_for('client_dashboard'))
+    return render_page('order_details.html', order=order, paper_types=PAPER_TYPES, status_labels=STATUS_LABELS,
+                       duplicates={})
+
+@route('/update_order_status/<int:order_id>', methods=['POST'])
+@login_required
+def update_order_status(order_id):
+    if current_user.role not in ['admin', 'employee']:
+        return jsonify({'error': 'Доступ запрещен'}), 403
+    
+    order = Order.query.get_or_404(order_id)
+    new_status = request.json.get('status')
+    
+    if new_status in ORDER_STATUSES:
+        set_order_status(order, new_status, current_user.id)
+        db.session.commit()
+        return jsonify({'success': True, 'message': 'Статус обновлен'})
+    
+    return jsonify({'error': 'Неверный статус'}), 400
+
+@route('/order/<int:order_id>/color_correct', methods=['POST'])
+@login_required
+def color_correct(order_id):
+    if current_user.role not in ['admin', 'employee']:
+        flash('Доступ запрещен', 'danger')
+        return redirect(url_for('client_dashboard'))
+    
+    order = Order.query.get_or_404(order_id)
+    queue_color_correction(order, redo=bool(request.form.get('redo')))
+    flash('Заказ поставлен в очередь цветокоррекции, новые версии файлов появятся после обработки', 'info')
+    return redirect(url_for('order_details', order_id=order.id))
+
+@route('/review_order_file/<int:file_id>', methods=['POST'])
+@login_required
+def review_order_file(file_id):
+    if current_user.role not in ['admin', 'employee']:
+        return jsonify({'error': 'Доступ запрещен'}), 403
+    
+    order_file = OrderFile.query.get_or_404(file_id)
+    decision = request.json.get('decision')
+    if order_file.source_file_id is None or decision not in ('approved', 'rejected'):
+        return jsonify({'error': 'Неверное решение'}), 400
+    
+    review_version(order_file, decision, current_user.id)
+    return jsonify({'success': True, 'message': 'Версия одобрена' if decision == 'approved' else 'Версия отклонена'})
+
+@route('/services')
+@login_required
+def services():
+    if current_user.role not in ['admin', 'employee']:
+        flash('Доступ запрещен', 'danger')
+        return redirect(url_for('client_dashboard'))
+    
+    services = Service.query.all()
+    return render_page('services.html', services=services)
+
+@route('/create_service', methods=['GET', 'POST'])
+@login_required
+def create_service():
+    if current_user.role != 'admin':
+        flash('Доступ запрещен', 'danger')
+        return redirect(url_for('client_dashboard'))
+    
+    if request.method == 'POST':
+        name = request.form['name']
+        description = request.form['description']
+        price = float(request.form['price'])
+        processing_time = int(request.form['processing_time'])
+        category = request.form.get('category', 'printing')
+        print_width_mm = request.form.get('print_width_mm', type=int)
+        print_height_mm = request.form.get('print_height_mm', type=int)
+        
+        service = Service(
+            name=name,
+            description=description,
+            price=price,
+            processing_time=processing_time,
+            category=category,
+            print_width_mm=print_width_mm,
+            print_height_mm=print_height_mm
+        )
+        
+        db.session.add(service)
+        db.session.commit()
+        
+        flash('Услуга успешно создана!', 'success')
+        return redirect(url_for('services'))
+    
+    return render_page('create_service.html')
+
+@route('/edit_service/<int:service_id>', methods=['GET', 'POST'])
+@login_required
+def edit_service(service_id):
+    if current_user.role != 'admin':
+        flash('Доступ запрещен', 'danger')
+        return redirect(url_for('client_dashboard'))
+    
+    service = Service.query.get_or_404(service_id)
+    
+    if request.method == 'POST':
+        service.name = request.form['name']
+        service.description = request.form['description']
+        service.price = float(request.form['price'])
+        service.processing_time = int(request.form['processing_time'])
+        service.category = request.form.get('category', 'printing')
+        service.print_width_mm = request.form.get('print_width_mm', type=int)
+        service.print_height_mm = request.form.get('print_height_mm', type=int)
+        service.is_active = 'is_active' in request.form
+        
+        db.session.commit()
+        # Время выполнения могло измениться - очередь пересчитается при следующей оценке
+        capacity.reset()
+        flash('Услуга обновлена!', 'success')
+        return redirect(url_for('services'))
+    
+    return render_page('edit_service.html', service=service)
+
+@route('/uploads/<filename>')
+def uploaded_file(filename):
+    # Файла нет на быстром диске - возможно, он в архиве: возвращаем его обратно. Возврат - дорогая
+    # операция (чтение из S3), поэтому его запускает только владелец заказа или сотрудник
+    if not os.path.isfile(upload_path(filename)):
+        if not current_user.is_authenticated:
+            abort(404)
+        order_file = OrderFile.query.filter_by(filename=filename).first()
+        if order_file is not None:
+            customer_id = order_file.order.customer_id
+        else:
+            order_file = ArchivedOrderFile.query.filter_by(filename=filename).first()
+            customer_id = order_file and db.session.scalar(
+                db.select(ArchivedOrder.customer_id).where(ArchivedOrder.id == order_file.order_id))
+        if order_file is None or (current_user.role not in ['admin', 'employee'] and customer_id != current_user.id):
+            abort(404)
+        if order_file.storage_tier == 'cold':
+            ensure_hot(order_file)
+    # Пути в настройках считаются от рабочего каталога, как и при записи, а не от папки пакета
+    return send_from_directory(os.path.abspath(current_app.config['UPLOAD_FOLDER']), filename)
+
+@route('/orders/files.zip')
+@login_required
+def download_orders_zip():
+    """Все файлы одного или нескольких заказов (?order_id=1&order_id=2) одним ZIP"""
+    order_ids = request.args.getlist('order_id', type=int)
+    orders = (Order.query.filter(Order.id.in_(order_ids))
+              .options(db.selectinload(Order.files))
+              .order_by(Order.id).all())
+    if not orders:
+        abort(404)
+    
+    if current_user.role not in ['admin', 'employee'] and any(o.customer_id != current_user.id for o in orders):
+        flash('Доступ запрещен', 'danger')
+        return redirect(url_for('client_dashboard'))
+    
+    download_name = f'{orders[0].order_number}.zip' if len(orders) == 1 else f'orders_{len(orders)}.zip'
+    return zip_response(order_zip_entries(orders), download_name)
+
+@route('/api/orders')
+@login_required
+def api_orders():
+    customer_id = current_user.id if current_user.role == 'client' else None
+    validators = cache_validators(orders_version(customer_id))
+    response = not_modified(validators)
+    if response is not None:
+        return response
+    
+    query = order_rows_query()
+    if customer_id is not None:
+        query = query.where(Order.customer_id == customer_id)
+    orders = fetch_order_rows(query)
+    
+    orders_data = [_order_json(order) for order in orders]
+    return with_validators(jsonify(orders_data), validators)
+
+def _order_json(order):
+    """JSON заказа по OrderRow"""
+    return {
+        'id': order.id,
+        'order_number': order.order_number,
+        'customer': order.customer_name,
+        'service': order.service_name,
+        'status': order.status,
+        'quantity': order.quantity,
+        'total_price': order.total_price,
+        'created_at': order.created_at.strftime('%Y-%m-%d %H:%M'),
+        'due_date': order.due_date.strftime('%Y-%m-%d %H:%M') if order.due_date else None
+    }
+
+@route('/api/orders/changes')
+@login_required
+def api_order_changes():
+    """Заказы, измененные после курсора: ?since=<cursor>&wait=<секунд>.
+    
+    В ответе cursor - его клиент передает в следующем запросе, и has_more,
+    если изменений больше, чем влезло в одну страницу. С wait запрос ждет
+    первого изменения (long-poll), но не дольше CHANGES_MAX_WAIT секунд.
+    Заказ с archived=true перенесен в архив и из списка удаляется.
+    """
+    since = max(request.args.get('since', 0, type=int), 0)
+    wait = min(max(request.args.get('wait', 0, type=float), 0), current_app.config['CHANGES_MAX_WAIT'])
+    limit = current_app.config['CHANGES_PAGE_SIZE']
+    customer_id = current_user.id if current_user.role == 'client' else None
+    
+    deadline = time.monotonic() + wait
+    while latest_change_seq(customer_id) <= since and time.monotonic() < deadline:
+        # Завершаем транзакцию перед паузой: она не держит блокировку SQLite,
+        # а следующая проверка видит свежие данные
+        db.session.commit()
+        time.sleep(min(current_app.config['CHANGES_POLL_INTERVAL'], max(deadline - time.monotonic(), 0)))
+    
+    orders = order_changes(since, customer_id, limit)
+    return jsonify({
+        'cursor': orders[-1].change_seq if orders else since,
+        'has_more': len(orders) == limit,
+        'orders': [dict(_order_json(order), change_seq=order.change_seq, archived=order.is_archived) for order in orders],
+    })
+
+@route('/search_orders')
+@login_required
+def search_orders():
+    query = request.args.get('q', '')
+    status_filter = request.args.get('status', '')
+    include_archive = bool(request.args.get('archive'))
+    
+    orders = []
+    # Архив просматривается только по запросу: обычный поиск идет по маленьким рабочим таблицам
+    for model in (Order, ArchivedOrder) if include_archive else (Order,):
+        orders_query = order_rows_query(model)
+        
+        if current_user.role == 'client':
+            orders_query = orders_query.where(model.customer_id == current_user.id)
+        
+        if query:
+            orders_query = orders_query.where(
+                db.or_(
+                    model.order_number.contains(query),
+                    model.notes.contains(query)
+                )
+            )
+        
+        if status_filter:
+            orders_query = orders_query.where(model.status == status_filter)
+        
+        orders.extend(fetch_order_rows(orders_query.order_by(model.created_at.desc())))
+    
+    if include_archive:
+        orders.sort(key=lambda order: order.created_at, reverse=True)
+    
+    return render_page('search_results.html', orders=orders, query=query, status_filter=status_filter,
+                       include_archive=include_archive)
+
+@route('/imposition', methods=['GET', 'POST'])
+@login_required
+def imposition():
+    if current_user.role not in ['admin', 'employee']:
+        flash('Доступ запрещен', 'danger')
+        return redirect(url_for('client_dashboard'))
+    
+    sheet_names = request.values.getlist('sheets') or list(SHEET_SIZES)
+    service_id = request.values.get('service_id', type=int)
+    
+    orders = pending_print_orders(service_id)
+    sheets, skipped = plan_imposition(collect_print_items(orders), sheet_names)
+    usage = paper_usage(sheets)
+    
+    rendered = []
+    if request.method == 'POST' and sheets:
+        rendered = [os.path.basename(path) for path in render_sheets(sheets, current_app.config['PRINT_SHEETS_FOLDER'])]
+        flash(f'Сформировано листов: {len(rendered)}', 'success')
+    
+    services = Service.query.filter(Service.print_width_mm.isnot(None)).all()
+    return render_page('imposition.html', orders=orders, sheets=sheets, skipped=skipped,
+                                  usage=usage, rendered=rendered, services=services,
+                                  sheet_sizes=SHEET_SIZES, selected_sheets=sheet_names, service_id=service_id)
+
+@route('/print_sheets/<filename>')
+@login_required
+def print_sheet_file(filename):
+    if current_user.role not in ['admin', 'employee']:
+        return redirect(url_for('client_dashboard'))
+    return send_from_directory(os.path.abspath(current_app.config['PRINT_SHEETS_FOLDER']), filename)
+
+@route('/production_queue')
+@login_required
+def production_queue():
+    if current_user.role not in ['admin', 'employee']:
+        flash('Доступ запрещен', 'danger')
+        return redirect(url_for('client_dashboard'))
+    
+    batches = build_production_queue()
+    processing_orders = Order.query.filter_by(status='processing').count()
+    return render_page('production_queue.html', batches=batches, paper_types=PAPER_TYPES,
+                                  processing_orders=processing_orders)
+
+@route('/production_queue/start', methods=['POST'])
+@login_required
+def start_production_batch():
+    if current_user.role not in ['admin', 'employee']:
+        flash('Доступ запрещен', 'danger')
+        return redirect(url_for('client_dashboard'))
+    
+    order_ids = request.form.getlist('order_ids', type=int)
+    # Запускаем только те заказы партии, которые за это время никто не перевел в другой статус
+    orders = Order.query.filter(Order.id.in_(order_ids), Order.status == 'pending').all() if order_ids else []
+    orders = [order for order in orders if set_order_status(order, 'processing', current_user.id)]
+    db.session.commit()
+    
+    if orders:
+        flash(f'Партия запущена в работу: {len(orders)} заказов', 'success')
+    else:
+        flash('В партии не осталось ожидающих заказов', 'warning')
+    return redirect(url_for('production_queue'))
+
+@route('/reports')
+@login_required
+def reports():
+    if current_user.role not in ['admin', 'employee']:
+        flash('Доступ запрещен', 'danger')
+        return redirect(url_for('client_dashboard'))
+    
+    days = min(max(request.args.get('days', 30, type=int), 1), 366)
+    since = datetime.utcnow().date() - timedelta(days=days - 1)
+    completed_revenue = db.func.sum(db.case((DailyOrderStats.status == 'completed', DailyOrderStats.revenue), else_=0))
+    orders_count = db.func.sum(DailyOrderStats.order_count)
+    
+    by_day = (db.session.query(DailyOrderStats.day, orders_count, completed_revenue)
+              .filter(DailyOrderStats.day >= since)
+              .group_by(DailyOrderStats.day)
+              .order_by(DailyOrderStats.day)
+              .all())
+    by_service = (db.session.query(Service.name, orders_count, completed_revenue)
+                  .join(Service, Service.id == DailyOrderStats.service_id)
+                  .filter(DailyOrderStats.day >= since)
+                  .group_by(Service.id)
+                  .order_by(completed_revenue.desc())
+                  .all())
+    by_category = (db.session.query(Service.category, orders_count, completed_revenue)
+                   .join(Service, Service.id == DailyOrderStats.service_id)
+                   .filter(DailyOrderStats.day >= since)
+                   .group_by(Service.category)
+                   .order_by(completed_revenue.desc())
+                   .all())
+    
+    max_day_orders = max((row[1] for row in by_day), default=0)
+    turnaround = [row for row in turnaround_percentiles(days) if row['stage'] == 'total']
+    return render_page('reports.html', days=days, by_day=by_day, by_service=by_service,
+                                  by_category=by_category, max_day_orders=max_day_orders, turnaround=turnaround)
+
+@route('/api/reports/turnaround')
+@login_required
+def api_turnaround():
+    if current_user.role not in ['admin', 'employee']:
+        return jsonify({'error': 'Доступ запрещен'}), 403
+    
+    days = min(max(request.args.get('days', 90, type=int), 1), 3660)
+    return jsonify({'days': days, 'services': turnaround_percentiles(days)})
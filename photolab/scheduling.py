@@ -0,0 +1,58 @@
+"""Планирование производственных партий"""
+from flask import current_app
+from datetime import datetime, timedelta
+import heapq
+
+from .extensions import db
+from .models import Order
+
+def build_production_queue(now=None):
+    """Группирует ожидающие заказы в партии по услуге и типу бумаги.
+
+    Партии упорядочены по ближайшему сроку готовности (EDF), каждая партия
+    запускается целиком на первой освободившейся линии своей категории
+    (их число - PRODUCTION_LANES) и занимает processing_time своей услуги.
+    Возвращает партии с номером линии, расчетным временем начала и окончания.
+    """
+    now = now or datetime.utcnow()
+    batch_size = current_app.config['PRODUCTION_BATCH_SIZE']
+    lane_counts = current_app.config['PRODUCTION_LANES']
+    
+    orders = (Order.query.filter_by(status='pending')
+              .options(db.joinedload(Order.service), db.joinedload(Order.customer))
+              .order_by(Order.due_date, Order.created_at)
+              .all())
+    
+    groups = {}
+    for order in orders:
+        groups.setdefault((order.service_id, order.paper_type or ''), []).append(order)
+    
+    batches = []
+    for (service_id, paper_type), group in groups.items():
+        for start in range(0, len(group), batch_size):
+            batch_orders = group[start:start + batch_size]
+            service = batch_orders[0].service
+            batches.append({
+                'service': service,
+                'paper_type': paper_type,
+                'orders': batch_orders,
+                'prints': sum(o.quantity or 0 for o in batch_orders),
+                'due_date': min((o.due_date for o in batch_orders if o.due_date), default=None),
+                'duration': timedelta(hours=service.processing_time or 24),
+            })
+    
+    batches.sort(key=lambda b: (b['due_date'] or datetime.max, b['service'].id))
+    
+    # Категория -> куча (время освобождения, номер линии); категории работают независимо
+    lanes = {}
+    for batch in batches:
+        category = batch['service'].category
+        if category not in lanes:
+            lanes[category] = [(now, lane) for lane in range(1, max(lane_counts.get(category, 1), 1) + 1)]
+        free_at, batch['lane'] = heapq.heappop(lanes[category])
+        batch['estimated_start'] = free_at
+        batch['estimated_finish'] = free_at + batch['duration']
+        heapq.heappush(lanes[category], (batch['estimated_finish'], batch['lane']))
+        batch['late'] = batch['due_date'] is not None and batch['estimated_finish'] > batch['due_date']
+    
+    return batches
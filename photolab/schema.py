@@ -0,0 +1,83 @@
+"""Обновление схемы существующей базы до текущих моделей.
+
+db.create_all() создает только недостающие таблицы и не трогает те, что
+уже есть. Колонки и индексы, добавленные в модели позже, досоздает
+upgrade_schema: ALTER TABLE ... ADD COLUMN и CREATE INDEX для всего, чего
+в базе еще нет. Триггеры из models.TRIGGERS создаются, если их нет, и
+пересоздаются, если их определение изменилось. Шаги идемпотентны, init-db
+выполняет их при каждом запуске.
+"""
+from sqlalchemy import inspect
+from sqlalchemy.schema import CreateColumn
+
+from .extensions import db
+from .models import TRIGGERS
+
+def _add_column(connection, table, column):
+    # SQLite добавляет колонку без внешнего ключа, если он не указан в самом описании колонки;
+    # связь в модели от этого не меняется
+    definition = CreateColumn(column).compile(dialect=connection.dialect)
+    table_name = connection.dialect.identifier_preparer.format_table(table)
+    connection.execute(db.text(f'ALTER TABLE {table_name} ADD COLUMN {definition}'))
+
+def _sync_change_counter(connection):
+    """Счетчик номеров изменений не меньше уже выданных номеров (в базах до его появления - равен им)"""
+    connection.execute(db.text('INSERT OR IGNORE INTO change_counter (id, value) VALUES (1, 0)'))
+    connection.execute(db.text(
+        'UPDATE change_counter SET value = MAX(value,'
+        ' (SELECT COALESCE(MAX(change_seq), 0) FROM "order"),'
+        ' (SELECT COALESCE(MAX(change_seq), 0) FROM archived_order)) WHERE id = 1'
+    ))
+
+def _backfill_change_seq(connection):
+    """Номера изменений заказам, созданным до появления триггеров: по порядку id после уже выданных"""
+    _sync_change_counter(connection)
+    backfilled = connection.execute(db.text(
+        'UPDATE "order" SET change_seq = numbered.base + numbered.n FROM ('
+        '  SELECT id, ROW_NUMBER() OVER (ORDER BY id) AS n,'
+        '         (SELECT value FROM change_counter WHERE id = 1) AS base'
+        '  FROM "order" WHERE change_seq IS NULL'
+        ') AS numbered WHERE "order".id = numbered.id'
+    )).rowcount
+    _sync_change_counter(connection)
+    return backfilled
+
+def _install_triggers(connection):
+    installed = dict(connection.execute(db.text("SELECT name, sql FROM sqlite_master WHERE type = 'trigger'")).all())
+    changed = []
+    for name, (_, definition) in TRIGGERS.items():
+        # SQLite хранит текст CREATE TRIGGER как есть, без IF NOT EXISTS
+        if installed.get(name) == f'CREATE TRIGGER {name} {definition}':
+            continue
+        connection.execute(db.text(f'DROP TRIGGER IF EXISTS {name}'))
+        connection.execute(db.text(f'CREATE TRIGGER {name} {definition}'))
+        changed.append(name)
+    return changed
+
+def upgrade_schema():
+    """Добавляет в существующие таблицы недостающие колонки и индексы, возвращает список изменений"""
+    changes = []
+    with db.engine.begin() as connection:
+        inspector = inspect(connection)
+        tables = set(inspector.get_table_names())
+        for table in db.metadata.sorted_tables:
+            if table.name not in tables:
+                continue
+            columns = {column['name'] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in columns:
+                    _add_column(connection, table, column)
+                    changes.append(f'{table.name}.{column.name}')
+            
+            indexes = {index['name'] for index in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name not in indexes:
+                    index.create(connection)
+                    changes.append(index.name)
+        
+        # Сначала номера старым заказам, потом триггеры: массовый UPDATE не должен их вызывать
+        backfilled = _backfill_change_seq(connection)
+        if backfilled:
+            changes.append(f'order.change_seq ({backfilled})')
+        changes.extend(_install_triggers(connection))
+    return changes
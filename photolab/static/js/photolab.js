@@ -0,0 +1,78 @@
+// Функция для обновления статуса заказа
+function updateOrderStatus(orderId, newStatus) {
+    fetch(`/update_order_status/${orderId}`, {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json',
+        },
+        body: JSON.stringify({status: newStatus})
+    })
+    .then(response => response.json())
+    .then(data => {
+        if (data.success) {
+            location.reload();
+        } else {
+            alert('Ошибка при обновлении статуса: ' + (data.error || 'Неизвестная ошибка'));
+        }
+    })
+    .catch(error => {
+        alert('Ошибка сети: ' + error);
+    });
+}
+
+// Одобрение или отклонение исправленной версии файла
+function reviewOrderFile(fileId, decision) {
+    fetch(`/review_order_file/${fileId}`, {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json',
+        },
+        body: JSON.stringify({decision: decision})
+    })
+    .then(response => response.json())
+    .then(data => {
+        if (data.success) {
+            location.reload();
+        } else {
+            alert('Ошибка: ' + (data.error || 'Неизвестная ошибка'));
+        }
+    })
+    .catch(error => {
+        alert('Ошибка сети: ' + error);
+    });
+}
+
+// Функция для получения класса бейджа по статусу
+function getStatusBadgeClass(status) {
+    const statusClasses = {
+        'pending': 'bg-warning text-dark',
+        'processing': 'bg-info',
+        'ready': 'bg-success',
+        'completed': 'bg-secondary',
+        'cancelled': 'bg-danger'
+    };
+    return statusClasses[status] || 'bg-secondary';
+}
+
+// Функция для получения русского названия статуса
+function getStatusText(status) {
+    const statusTexts = {
+        'pending': 'Ожидает обработки',
+        'processing': 'В работе',
+        'ready': 'Готов к выдаче',
+        'completed': 'Завершен',
+        'cancelled': 'Отменен'
+    };
+    return statusTexts[status] || status;
+}
+
+// Обновление времени
+function updateTime() {
+    const now = new Date();
+    const timeString = now.toLocaleString('ru-RU');
+    const timeElements = document.querySelectorAll('.current-time');
+    timeElements.forEach(el => el.textContent = timeString);
+}
+
+setInterval(updateTime, 1000);
+updateTime();
@@ -0,0 +1,65 @@
+from flask import current_app
+from werkzeug.utils import secure_filename
+from datetime import datetime
+from collections import namedtuple
+import hashlib
+import os
+import zlib
+
+ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'bmp', 'tiff'}
+COPY_CHUNK_SIZE = 256 * 1024
+
+# Файл, сохраненный в папку загрузок: то, что записывается в OrderFile
+SavedUpload = namedtuple('SavedUpload', 'filename original_filename file_size checksum crc32')
+
+class UploadDigest:
+    """sha256 (для проверки целостности) и CRC32 (для ZIP) за один проход по данным"""
+    
+    def __init__(self):
+        self.sha256 = hashlib.sha256()
+        self.crc32 = 0
+    
+    def update(self, data):
+        self.sha256.update(data)
+        self.crc32 = zlib.crc32(data, self.crc32)
+
+def allowed_file(filename):
+    return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+
+def upload_path(filename):
+    return os.path.join(current_app.config['UPLOAD_FOLDER'], filename)
+
+def _unique_name(filename, order_id):
+    return f"{order_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{filename}"
+
+def save_upload(file, order_id):
+    """Сохраняет загруженный файл заказа, возвращает SavedUpload"""
+    # Папка создается при первой загрузке, а не при импорте приложения
+    os.makedirs(current_app.config['UPLOAD_FOLDER'], exist_ok=True)
+    filename = secure_filename(file.filename)
+    unique_filename = _unique_name(filename, order_id)
+    file_path = upload_path(unique_filename)
+    # Контрольные суммы считаются в том же проходе, что и запись, без повторного чтения файла
+    digest = UploadDigest()
+    with open(file_path, 'wb') as out:
+        for chunk in iter(lambda: file.stream.read(COPY_CHUNK_SIZE), b''):
+            digest.update(chunk)
+            out.write(chunk)
+    return SavedUpload(unique_filename, filename, os.path.getsize(file_path), digest.sha256.hexdigest(), digest.crc32)
+
+def adopt_upload(spooled_path, original_filename, order_id, digest):
+    """Переименовывает файл, уже записанный в папку загрузок, по правилам save_upload"""
+    filename = secure_filename(original_filename)
+    unique_filename = _unique_name(filename, order_id)
+    file_path = upload_path(unique_filename)
+    # Временный файл лежит в той же папке, поэтому переименование атомарно и без копирования
+    os.replace(spooled_path, file_path)
+    return SavedUpload(unique_filename, filename, os.path.getsize(file_path), digest.sha256.hexdigest(), digest.crc32)
+
+def file_crc32(path):
+    """CRC32 файла, для файлов, загруженных до того, как он стал записываться"""
+    crc = 0
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(COPY_CHUNK_SIZE), b''):
+            crc = zlib.crc32(chunk, crc)
+    return crc
@@ -0,0 +1,1600 @@
+"""HTML-шаблоны страниц.
+
+Модуль импортируется лениво, при первом рендеринге (см. templating.py).
+"""
+
+# HTML шаблоны
+BASE_TEMPLATE = '''
+<!DOCTYPE html>
+<html lang="ru">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>{% block title %}Фотолаборатория{% endblock %}</title>
+    <link href="{{ asset_url('vendor/bootstrap/bootstrap.min.css') }}" rel="stylesheet">
+    <link href="{{ asset_url('vendor/bootstrap-icons/bootstrap-icons.min.css') }}" rel="stylesheet">
+    <link href="{{ asset_url('css/photolab.css') }}" rel="stylesheet">
+</head>
+<body class="bg-light">
+    <nav class="navbar navbar-expand-lg navbar-dark bg-primary shadow">
+        <div class="container">
+            <a class="navbar-brand" href="{{ url_for('index') }}">
+                <i class="bi bi-camera-fill"></i> ФотоЛаб
+            </a>
+            
+            <button class="navbar-toggler" type="button" data-bs-toggle="collapse" data-bs-target="#navbarNav">
+                <span class="navbar-toggler-icon"></span>
+            </button>
+            
+            <div class="collapse navbar-collapse" id="navbarNav">
+                <ul class="navbar-nav me-auto">
+                    {% if current_user.is_authenticated %}
+                        {% if current_user.role in ['admin', 'employee'] %}
+                            <li class="nav-item">
+                                <a class="nav-link" href="{{ url_for('admin_dashboard') }}">
+                                    <i class="bi bi-speedometer2"></i> Панель управления
+                                </a>
+                            </li>
+                            <li class="nav-item">
+                                <a class="nav-link" href="{{ url_for('services') }}">
+                                    <i class="bi bi-gear-fill"></i> Услуги
+                                </a>
+                            </li>
+                            <li class="nav-item">
+                                <a class="nav-link" href="{{ url_for('reports') }}">
+                                    <i class="bi bi-graph-up"></i> Отчеты
+                                </a>
+                            </li>
+                            <li class="nav-item">
+                                <a class="nav-link" href="{{ url_for('production_queue') }}">
+                                    <i class="bi bi-stack"></i> Очередь печати
+                                </a>
+                            </li>
+                            <li class="nav-item">
+                                <a class="nav-link" href="{{ url_for('imposition') }}">
+                                    <i class="bi bi-grid-3x3-gap-fill"></i> Печатные листы
+                                </a>
+                            </li>
+                        {% else %}
+                            <li class="nav-item">
+                                <a class="nav-link" href="{{ url_for('client_dashboard') }}">
+                                    <i class="bi bi-house-fill"></i> Мои заказы
+                                </a>
+                            </li>
+                            <li class="nav-item">
+                                <a class="nav-link" href="{{ url_for('create_order') }}">
+                                    <i class="bi bi-plus-circle-fill"></i> Новый заказ
+                                </a>
+                            </li>
+                        {% endif %}
+                    {% endif %}
+                </ul>
+                
+                <ul class="navbar-nav">
+                    {% if current_user.is_authenticated %}
+                        <li class="nav-item dropdown">
+                            <a class="nav-link dropdown-toggle" href="#" role="button" data-bs-toggle="dropdown">
+                                <i class="bi bi-person-circle"></i> {{ current_user.username }}
+                            </a>
+                            <ul class="dropdown-menu">
+                                <li><span class="dropdown-item-text">
+                                    <strong>{{ current_user.full_name or current_user.username }}</strong><br>
+                                    <small class="text-muted">{{ current_user.role }}</small>
+                                </span></li>
+                                <li><hr class="dropdown-divider"></li>
+                                <li><a class="dropdown-item" href="{{ url_for('logout') }}">
+                                    <i class="bi bi-box-arrow-right"></i> Выйти
+                                </a></li>
+                            </ul>
+                        </li>
+                    {% else %}
+                        <li class="nav-item">
+                            <a class="nav-link" href="{{ url_for('login') }}">
+                                <i class="bi bi-box-arrow-in-right"></i> Войти
+                            </a>
+                        </li>
+                        <li class="nav-item">
+                            <a class="nav-link" href="{{ url_for('register') }}">
+                                <i class="bi bi-person-plus"></i> Регистрация
+                            </a>
+                        </li>
+                    {% endif %}
+                </ul>
+            </div>
+        </div>
+    </nav>
+
+    <main>
+        {% with messages = get_flashed_messages(with_categories=true) %}
+            {% if messages %}
+                <div class="container mt-3">
+                    {% for category, message in messages %}
+                        <div class="alert alert-{{ 'danger' if category == 'error' else category }} alert-dismissible fade show" role="alert">
+                            {{ message }}
+                            <button type="button" class="btn-close" data-bs-dismiss="alert"></button>
+                        </div>
+                    {% endfor %}
+                </div>
+            {% endif %}
+        {% endwith %}
+
+        {% block content %}{% endblock %}
+    </main>
+
+    <footer class="bg-dark text-light mt-5 py-4">
+        <div class="container">
+            <div class="row">
+                <div class="col-md-6">
+                    <h5><i class="bi bi-camera-fill"></i> ФотоЛаб</h5>
+                    <p class="mb-0">Профессиональная фотолаборатория с высоким качеством обслуживания</p>
+                </div>
+                <div class="col-md-6">
+                    <h6>Контакты</h6>
+                    <p class="mb-0">
+                        <i class="bi bi-telephone-fill"></i> +7 (123) 456-78-90<br>
+                        <i class="bi bi-envelope-fill"></i> info@photolab.com
+                    </p>
+                </div>
+            </div>
+        </div>
+    </footer>
+
+    <script src="{{ asset_url('vendor/bootstrap/popper.min.js') }}"></script>
+    <script src="{{ asset_url('vendor/bootstrap/bootstrap.min.js') }}"></script>
+    <script src="{{ asset_url('js/photolab.js') }}"></script>
+    {% block scripts %}{% endblock %}
+</body>
+</html>
+'''
+
+INDEX_TEMPLATE = '''
+{% extends "base.html" %}
+{% block content %}
+<div class="hero-section">
+    <div class="container">
+        <div class="row align-items-center">
+            <div class="col-lg-6">
+                <h1 class="display-4 fw-bold mb-3">Добро пожаловать в ФотоЛаб</h1>
+                <p class="lead mb-4">Профессиональная фотолаборатория с современными технологиями и высоким качеством обслуживания</p>
+                <div class="d-flex gap-3">
+                    <a href="{{ url_for('register') }}" class="btn btn-light btn-lg">
+                        <i class="bi bi-person-plus"></i> Регистрация
+                    </a>
+                    <a href="{{ url_for('login') }}" class="btn btn-outline-light btn-lg">
+                        <i class="bi bi-box-arrow-in-right"></i> Вход
+                    </a>
+                </div>
+            </div>
+            <div class="col-lg-6 text-center">
+                <i class="bi bi-camera-fill" style="font-size: 8rem; opacity: 0.3;"></i>
+            </div>
+        </div>
+    </div>
+</div>
+
+<div class="container my-5">
+    <div class="row text-center mb-5">
+        <div class="col-12">
+            <h2 class="mb-3">Наши услуги</h2>
+            <p class="text-muted">Широкий спектр услуг для всех ваших потребностей в фотографии</p>
+        </div>
+    </div>
+    
+    <div class="row">
+        {% for service in services %}
+        {{ fragment('index_service_card', (service.id, service.version), service=service) }}
+        {% endfor %}
+    </div>
+    
+    <div class="text-center mt-4">
+        <a href="{{ url_for('register') }}" class="btn btn-primary btn-lg">
+            Начать работу с нами
+        </a>
+    </div>
+</div>
+
+<div class="bg-gradient py-5">
+    <div class="container">
+        <div class="row">
+            <div class="col-md-4 text-center mb-4">
+                <i class="bi bi-lightning-charge-fill feature-icon"></i>
+                <h4 class="mt-3">Быстро</h4>
+                <p>Обработка заказов от 2 часов</p>
+            </div>
+            <div class="col-md-4 text-center mb-4">
+                <i class="bi bi-award-fill feature-icon"></i>
+                <h4 class="mt-3">Качественно</h4>
+                <p>Профессиональное оборудование и материалы</p>
+            </div>
+            <div class="col-md-4 text-center mb-4">
+                <i class="bi bi-shield-check-fill feature-icon"></i>
+                <h4 class="mt-3">Надежно</h4>
+                <p>Гарантия качества на все услуги</p>
+            </div>
+        </div>
+    </div>
+</div>
+{% endblock %}
+'''
+
+# Фрагменты кешируются готовым HTML (fragments.py): кроме переданных данных они
+# могут зависеть только от роли пользователя
+INDEX_SERVICE_CARD_FRAGMENT = '''
+        <div class="col-md-4 mb-4">
+            <div class="card h-100 card-hover service-card">
+                <div class="card-body">
+                    <h5 class="card-title">{{ service.name }}</h5>
+                    <p class="card-text">{{ service.description }}</p>
+                    <div class="d-flex justify-content-between align-items-center">
+                        <span class="h5 text-primary mb-0">{{ service.price }} ₽</span>
+                        <small class="text-muted">{{ service.processing_time }}ч</small>
+                    </div>
+                </div>
+            </div>
+        </div>
+'''
+
+LOGIN_TEMPLATE = '''
+{% extends "base.html" %}
+{% block title %}Вход - Фотолаборатория{% endblock %}
+{% block content %}
+<div class="container mt-5">
+    <div class="row justify-content-center">
+        <div class="col-md-6 col-lg-4">
+            <div class="card shadow">
+                <div class="card-body p-4">
+                    <div class="text-center mb-4">
+                        <i class="bi bi-camera-fill text-primary" style="font-size: 3rem;"></i>
+                        <h3 class="mt-2">Вход в систему</h3>
+                    </div>
+                    
+                    <form method="POST">
+                        <div class="mb-3">
+                            <label for="username" class="form-label">Имя пользователя</label>
+                            <input type="text" class="form-control" id="username" name="username" required>
+                        </div>
+                        <div class="mb-3">
+                            <label for="password" class="form-label">Пароль</label>
+                            <input type="password" class="form-control" id="password" name="password" required>
+                        </div>
+                        <button type="submit" class="btn btn-primary w-100">
+                            <i class="bi bi-box-arrow-in-right"></i> Войти
+                        </button>
+                    </form>
+                    
+                    <div class="text-center mt-3">
+                        <p>Нет аккаунта? <a href="{{ url_for('register') }}">Зарегистрироваться</a></p>
+                        <small class="text-muted">
+                            Тестовые данные:<br>
+                            admin / admin123 (администратор)<br>
+                            employee / emp123 (сотрудник)
+                        </small>
+                    </div>
+                </div>
+            </div>
+        </div>
+    </div>
+</div>
+{% endblock %}
+'''
+
+REGISTER_TEMPLATE = '''
+{% extends "base.html" %}
+{% block title %}Регистрация - Фотолаборатория{% endblock %}
+{% block content %}
+<div class="container mt-5">
+    <div class="row justify-content-center">
+        <div class="col-md-6 col-lg-5">
+            <div class="card shadow">
+                <div class="card-body p-4">
+                    <div class="text-center mb-4">
+                        <i class="bi bi-person-plus-fill text-primary" style="font-size: 3rem;"></i>
+                        <h3 class="mt-2">Регистрация</h3>
+                    </div>
+                    
+                    <form method="POST">
+                        <div class="mb-3">
+                            <label for="full_name" class="form-label">Полное имя</label>
+                            <input type="text" class="form-control" id="full_name" name="full_name">
+                        </div>
+                        <div class="mb-3">
+                            <label for="username" class="form-label">Имя пользователя *</label>
+                            <input type="text" class="form-control" id="username" name="username" required>
+                        </div>
+                        <div class="mb-3">
+                            <label for="email" class="form-label">Email *</label>
+                            <input type="email" class="form-control" id="email" name="email" required>
+                        </div>
+                        <div class="mb-3">
+                            <label for="phone" class="form-label">Телефон</label>
+                            <input type="tel" class="form-control" id="phone" name="phone">
+                        </div>
+                        <div class="mb-3">
+                            <label for="password" class="form-label">Пароль *</label>
+                            <input type="password" class="form-control" id="password" name="password" required>
+                        </div>
+                        <button type="submit" class="btn btn-primary w-100">
+                            <i class="bi bi-person-plus"></i> Зарегистрироваться
+                        </button>
+                    </form>
+                    
+                    <div class="text-center mt-3">
+                        <p>Уже есть аккаунт? <a href="{{ url_for('login') }}">Войти</a></p>
+                    </div>
+                </div>
+            </div>
+        </div>
+    </div>
+</div>
+{% endblock %}
+'''
+
+CLIENT_DASHBOARD_TEMPLATE = '''
+{% extends "base.html" %}
+{% block title %}Мои заказы - Фотолаборатория{% endblock %}
+{% block content %}
+<div class="container mt-4">
+    <div class="d-flex justify-content-between align-items-center mb-4">
+        <h2><i class="bi bi-person-circle"></i> Личный кабинет</h2>
+        <a href="{{ url_for('create_order') }}" class="btn btn-primary">
+            <i class="bi bi-plus-circle"></i> Новый заказ
+        </a>
+    </div>
+    
+    <!-- Статистика -->
+    <div class="row mb-4">
+        <div class="col-md-4">
+            <div class="card stats-card text-center">
+                <div class="card-body">
+                    <i class="bi bi-box-seam" style="font-size: 2rem;"></i>
+                    <h3 class="mt-2">{{ stats.total_orders }}</h3>
+                    <p class="mb-0">Всего заказов</p>
+                </div>
+            </div>
+        </div>
+        <div class="col-md-4">
+            <div class="card bg-warning text-center">
+                <div class="card-body">
+                    <i class="bi bi-clock-history" style="font-size: 2rem;"></i>
+                    <h3 class="mt-2">{{ stats.pending_orders }}</h3>
+                    <p class="mb-0">В обработке</p>
+                </div>
+            </div>
+        </div>
+        <div class="col-md-4">
+            <div class="card bg-success text-white text-center">
+                <div class="card-body">
+                    <i class="bi bi-check-circle" style="font-size: 2rem;"></i>
+                    <h3 class="mt-2">{{ stats.ready_orders }}</h3>
+                    <p class="mb-0">Готовы к выдаче</p>
+                </div>
+            </div>
+        </div>
+    </div>
+    
+    <!-- Поиск заказов -->
+    <div class="card mb-4">
+        <div class="card-body">
+            <form method="GET" action="{{ url_for('search_orders') }}" class="row g-3">
+                <div class="col-md-5">
+                    <input type="text" class="form-control" name="q" placeholder="Поиск по номеру заказа или примечаниям" value="{{ request.args.get('q', '') }}">
+                </div>
+                <div class="col-md-3">
+                    <select class="form-select" name="status">
+                        <option value="">Все статусы</option>
+                        <option value="pending" {% if request.args.get('status') == 'pending' %}selected{% endif %}>Ожидает обработки</option>
+                        <option value="processing" {% if request.args.get('status') == 'processing' %}selected{% endif %}>В работе</option>
+                        <option value="ready" {% if request.args.get('status') == 'ready' %}selected{% endif %}>Готов к выдаче</option>
+                        <option value="completed" {% if request.args.get('status') == 'completed' %}selected{% endif %}>Завершен</option>
+                    </select>
+                </div>
+                <div class="col-md-2 d-flex align-items-center">
+                    <div class="form-check">
+                        <input class="form-check-input" type="checkbox" name="archive" value="1" id="search-archive" {% if request.args.get('archive') %}checked{% endif %}>
+                        <label class="form-check-label" for="search-archive">Искать в архиве</label>
+                    </div>
+                </div>
+                <div class="col-md-2">
+                    <button type="submit" class="btn btn-outline-primary w-100">
+                        <i class="bi bi-search"></i> Поиск
+                    </button>
+                </div>
+            </form>
+        </div>
+    </div>
+    
+    <!-- Список заказов -->
+    <div class="row">
+        {% for order in orders %}
+        {{ fragment('client_order_card', order, order=order) }}
+        {% endfor %}
+        
+        {% if not orders %}
+        <div class="col-12">
+            <div class="text-center py-5">
+                <i class="bi bi-inbox" style="font-size: 4rem; color: #ccc;"></i>
+                <h4 class="mt-3 text-muted">У вас пока нет заказов</h4>
+                <p class="text-muted">Создайте свой первый заказ прямо сейчас!</p>
+                <a href="{{ url_for('create_order') }}" class="btn btn-primary">
+                    <i class="bi bi-plus-circle"></i> Создать заказ
+                </a>
+            </div>
+        </div>
+        {% endif %}
+    </div>
+</div>
+{% endblock %}
+'''
+
+CLIENT_ORDER_CARD_FRAGMENT = '''
+        <div class="col-md-6 col-lg-4 mb-4">
+            <div class="card order-card card-hover h-100">
+                <div class="card-body">
+                    <div class="d-flex justify-content-between align-items-start mb-2">
+                        <h6 class="card-title mb-0">{{ order.order_number }}</h6>
+                        <span class="badge status-badge
+                            {% if order.status == 'pending' %}bg-warning text-dark
+                            {% elif order.status == 'processing' %}bg-info
+                            {% elif order.status == 'ready' %}bg-success
+                            {% elif order.status == 'completed' %}bg-secondary
+                            {% elif order.status == 'cancelled' %}bg-danger
+                            {% endif %}">
+                            {% if order.status == 'pending' %}Ожидает
+                            {% elif order.status == 'processing' %}В работе
+                            {% elif order.status == 'ready' %}Готов
+                            {% elif order.status == 'completed' %}Завершен
+                            {% elif order.status == 'cancelled' %}Отменен
+                            {% endif %}
+                        </span>
+                    </div>
+                    
+                    <p class="card-text">
+                        <strong>Услуга:</strong> {{ order.service_name }}<br>
+                        <strong>Количество:</strong> {{ order.quantity }}<br>
+                        <strong>Сумма:</strong> {{ order.total_price }} ₽
+                    </p>
+                    
+                    <div class="small text-muted">
+                        <div><i class="bi bi-calendar"></i> Создан: {{ order.created_at.strftime('%d.%m.%Y %H:%M') }}</div>
+                        {% if order.due_date %}
+                        <div><i class="bi bi-clock"></i> Готовность: {{ order.due_date.strftime('%d.%m.%Y %H:%M') }}</div>
+                        {% endif %}
+                    </div>
+                    
+                    <div class="mt-3">
+                        <a href="{{ url_for('order_details', order_id=order.id) }}" class="btn btn-outline-primary btn-sm">
+                            <i class="bi bi-eye"></i> Подробнее
+                        </a>
+                    </div>
+                </div>
+            </div>
+        </div>
+'''
+
+ADMIN_DASHBOARD_TEMPLATE = '''
+{% extends "base.html" %}
+{% block title %}Панель управления - Фотолаборатория{% endblock %}
+{% block content %}
+<div class="container mt-4">
+    <div class="d-flex justify-content-between align-items-center mb-4">
+        <h2><i class="bi bi-speedometer2"></i> Панель управления</h2>
+        <div class="current-time badge bg-secondary fs-6"></div>
+    </div>
+    
+    <!-- Статистика -->
+    <div class="row mb-4">
+        <div class="col-md-3">
+            <div class="card stats-card text-center">
+                <div class="card-body">
+                    <i class="bi bi-box-seam" style="font-size: 2rem;"></i>
+                    <h3 class="mt-2">{{ stats.total_orders }}</h3>
+                    <p class="mb-0">Всего заказов</p>
+                </div>
+            </div>
+        </div>
+        <div class="col-md-3">
+            <div class="card bg-warning text-center">
+                <div class="card-body">
+                    <i class="bi bi-hourglass-split" style="font-size: 2rem;"></i>
+                    <h3 class="mt-2">{{ stats.pending_orders }}</h3>
+                    <p class="mb-0">Ожидают</p>
+                </div>
+            </div>
+        </div>
+        <div class="col-md-3">
+            <div class="card bg-info text-white text-center">
+                <div class="card-body">
+                    <i class="bi bi-gear-fill" style="font-size: 2rem;"></i>
+                    <h3 class="mt-2">{{ stats.processing_orders }}</h3>
+                    <p class="mb-0">В работе</p>
+                </div>
+            </div>
+        </div>
+        <div class="col-md-3">
+            <div class="card bg-success text-white text-center">
+                <div class="card-body">
+                    <i class="bi bi-check-circle" style="font-size: 2rem;"></i>
+                    <h3 class="mt-2">{{ stats.ready_orders }}</h3>
+                    <p class="mb-0">Готовы</p>
+                </div>
+            </div>
+        </div>
+    </div>
+    
+    <!-- Доходы -->
+    <div class="row mb-4">
+        <div class="col-md-12">
+            <div class="card bg-success text-white">
+                <div class="card-body text-center">
+                    <i class="bi bi-currency-ruble" style="font-size: 2rem;"></i>
+                    <h3 class="mt-2">{{ "%.2f"|format(stats.total_revenue) }} ₽</h3>
+                    <p class="mb-0">Общий доход от завершенных заказов</p>
+                </div>
+            </div>
+        </div>
+    </div>
+    
+    <!-- Последние заказы -->
+    <div class="card">
+        <div class="card-header d-flex justify-content-between align-items-center">
+            <h5 class="mb-0"><i class="bi bi-list-ul"></i> Последние заказы</h5>
+            <a href="{{ url_for('search_orders') }}" class="btn btn-outline-primary btn-sm">
+                <i class="bi bi-search"></i> Поиск
+            </a>
+        </div>
+        <div class="card-body p-0">
+            <div class="table-responsive">
+                <table class="table table-hover mb-0">
+                    <thead class="table-light">
+                        <tr>
+                            <th>Номер</th>
+                            <th>Клиент</th>
+                            <th>Услуга</th>
+                            <th>Статус</th>
+                            <th>Сумма</th>
+                            <th>Создан</th>
+                            <th>Действия</th>
+                        </tr>
+                    </thead>
+                    <tbody>
+                        {% for order in orders %}
+                        {{ fragment('admin_order_row', order, order=order) }}
+                        {% endfor %}
+                        
+                        {% if not orders %}
+                        <tr>
+                            <td colspan="7" class="text-center py-4 text-muted">
+                                <i class="bi bi-inbox"></i> Заказов пока нет
+                            </td>
+                        </tr>
+                        {% endif %}
+                    </tbody>
+                </table>
+            </div>
+        </div>
+    </div>
+</div>
+{% endblock %}
+'''
+
+ADMIN_ORDER_ROW_FRAGMENT = '''
+                        <tr>
+                            <td><strong>{{ order.order_number }}</strong></td>
+                            <td>{{ order.customer_name }}</td>
+                            <td>{{ order.service_name }}</td>
+                            <td>
+                                <select class="form-select form-select-sm" onchange="updateOrderStatus({{ order.id }}, this.value)">
+                                    <option value="pending" {% if order.status == 'pending' %}selected{% endif %}>Ожидает</option>
+                                    <option value="processing" {% if order.status == 'processing' %}selected{% endif %}>В работе</option>
+                                    <option value="ready" {% if order.status == 'ready' %}selected{% endif %}>Готов</option>
+                                    <option value="completed" {% if order.status == 'completed' %}selected{% endif %}>Завершен</option>
+                                    <option value="cancelled" {% if order.status == 'cancelled' %}selected{% endif %}>Отменен</option>
+                                </select>
+                            </td>
+                            <td>{{ order.total_price }} ₽</td>
+                            <td>{{ order.created_at.strftime('%d.%m %H:%M') }}</td>
+                            <td>
+                                <a href="{{ url_for('order_details', order_id=order.id) }}" class="btn btn-outline-primary btn-sm">
+                                    <i class="bi bi-eye"></i>
+                                </a>
+                            </td>
+                        </tr>
+'''
+
+CREATE_ORDER_TEMPLATE = '''
+{% extends "base.html" %}
+{% block title %}Новый заказ - Фотолаборатория{% endblock %}
+{% block content %}
+<div class="container mt-4">
+    <div class="row justify-content-center">
+        <div class="col-md-8">
+            <div class="card shadow">
+                <div class="card-header">
+                    <h4 class="mb-0"><i class="bi bi-plus-circle"></i> Создание нового заказа</h4>
+                </div>
+                <div class="card-body">
+                    <form method="POST" enctype="multipart/form-data">
+                        <div class="mb-3">
+                            <label for="service_id" class="form-label">Услуга *</label>
+                            <select class="form-select" id="service_id" name="service_id" required onchange="updatePrice()">
+                                <option value="">Выберите услугу</option>
+                                {% for service in services %}
+                                <option value="{{ service.id }}" data-price="{{ service.price }}" data-time="{{ service.processing_time }}" data-category="{{ service.category }}">
+                                    {{ service.name }} - {{ service.price }} ₽
+                                </option>
+                                {% endfor %}
+                            </select>
+                        </div>
+                        
+                        <div class="mb-3" id="paper_type_group" style="display: none;">
+                            <label for="paper_type" class="form-label">Тип бумаги</label>
+                            <select class="form-select" id="paper_type" name="paper_type">
+                                {% for value, label in paper_types.items() %}
+                                <option value="{{ value }}">{{ label }}</option>
+                                {% endfor %}
+                            </select>
+                        </div>
+                        
+                        <div class="mb-3">
+                            <label for="quantity" class="form-label">Количество *</label>
+                            <input type="number" class="form-control" id="quantity" name="quantity" value="1" min="1" required onchange="updatePrice()">
+                        </div>
+                        
+                        <div class="mb-3">
+                            <label class="form-label">Общая стоимость</label>
+                            <div class="form-control-plaintext h5 text-primary" id="total_price">0 ₽</div>
+                        </div>
+                        
+                        <div class="mb-3">
+                            <label class="form-label">Время выполнения</label>
+                            <div class="form-control-plaintext" id="processing_time">Выберите услугу</div>
+                        </div>
+                        
+                        <div class="mb-3">
+                            <label for="files" class="form-label">Загрузить файлы</label>
+                            <input type="file" class="form-control" id="files" name="files" multiple accept="image/*">
+                            <div class="form-text">Поддерживаются форматы: JPG, PNG, GIF, BMP, TIFF. Максимальный размер файла: 16 МБ</div>
+                        </div>
+                        
+                        <div class="mb-3">
+                            <label for="notes" class="form-label">Примечания</label>
+                            <textarea class="form-control" id="notes" name="notes" rows="3" placeholder="Дополнительные пожелания или инструкции"></textarea>
+                        </div>
+                        
+                        <div class="d-flex gap-2">
+                            <button type="submit" class="btn btn-primary">
+                                <i class="bi bi-plus-circle"></i> Создать заказ
+                            </button>
+                            <a href="{{ url_for('client_dashboard') }}" class="btn btn-outline-secondary">
+                                <i class="bi bi-arrow-left"></i> Отмена
+                            </a>
+                        </div>
+                    </form>
+                </div>
+            </div>
+        </div>
+    </div>
+</div>
+
+<script>
+function updatePrice() {
+    const serviceSelect = document.getElementById('service_id');
+    const quantityInput = document.getElementById('quantity');
+    const totalPriceDiv = document.getElementById('total_price');
+    const processingTimeDiv = document.getElementById('processing_time');
+    
+    const selectedOption = serviceSelect.options[serviceSelect.selectedIndex];
+    const price = parseFloat(selectedOption.dataset.price) || 0;
+    const time = parseInt(selectedOption.dataset.time) || 0;
+    const quantity = parseInt(quantityInput.value) || 1;
+    
+    const total = price * quantity;
+    totalPriceDiv.textContent = total.toFixed(2) + ' ₽';
+    
+    document.getElementById('paper_type_group').style.display = selectedOption.dataset.category === 'printing' ? '' : 'none';
+    
+    if (time > 0) {
+        const hours = time;
+        const days = Math.floor(hours / 24);
+        const remainingHours = hours % 24;
+        
+        let timeText = '';
+        if (days > 0) {
+            timeText += days + ' д. ';
+        }
+        if (remainingHours > 0) {
+            timeText += remainingHours + ' ч.';
+        }
+        processingTimeDiv.textContent = timeText || 'Не указано';
+    } else {
+        processingTimeDiv.textContent = 'Не указано';
+    }
+}
+</script>
+{% endblock %}
+'''
+
+ORDER_DETAILS_TEMPLATE = '''
+{% extends "base.html" %}
+{% block title %}Заказ {{ order.order_number }} - Фотолаборатория{% endblock %}
+{% block content %}
+<div class="container mt-4">
+    <div class="row justify-content-center">
+        <div class="col-md-8">
+            <div class="card shadow">
+                <div class="card-header d-flex justify-content-between align-items-center">
+                    <h4 class="mb-0">
+                        <i class="bi bi-file-earmark-text"></i> Заказ {{ order.order_number }}
+                        {% if order.is_archived %}<span class="badge bg-light text-dark border fs-6"><i class="bi bi-archive"></i> Архив</span>{% endif %}
+                    </h4>
+                    <span class="badge fs-6
+                        {% if order.status == 'pending' %}bg-warning text-dark
+                        {% elif order.status == 'processing' %}bg-info
+                        {% elif order.status == 'ready' %}bg-success
+                        {% elif order.status == 'completed' %}bg-secondary
+                        {% elif order.status == 'cancelled' %}bg-danger
+                        {% endif %}">
+                        {% if order.status == 'pending' %}Ожидает обработки
+                        {% elif order.status == 'processing' %}В работе
+                        {% elif order.status == 'ready' %}Готов к выдаче
+                        {% elif order.status == 'completed' %}Завершен
+                        {% elif order.status == 'cancelled' %}Отменен
+                        {% endif %}
+                    </span>
+                </div>
+                <div class="card-body">
+                    <div class="row">
+                        <div class="col-md-6">
+                            <h6>Информация о заказе</h6>
+                            <table class="table table-sm">
+                                <tr>
+                                    <td><strong>Номер заказа:</strong></td>
+                                    <td>{{ order.order_number }}</td>
+                                </tr>
+                                <tr>
+                                    <td><strong>Клиент:</strong></td>
+                                    <td>{{ order.customer.full_name or order.customer.username }}</td>
+                                </tr>
+                                <tr>
+                                    <td><strong>Email:</strong></td>
+                                    <td>{{ order.customer.email }}</td>
+                                </tr>
+                                {% if order.customer.phone %}
+                                <tr>
+                                    <td><strong>Телефон:</strong></td>
+                                    <td>{{ order.customer.phone }}</td>
+                                </tr>
+                                {% endif %}
+                                <tr>
+                                    <td><strong>Услуга:</strong></td>
+                                    <td>{{ order.service.name }}</td>
+                                </tr>
+                                <tr>
+                                    <td><strong>Количество:</strong></td>
+                                    <td>{{ order.quantity }}</td>
+                                </tr>
+                                {% if order.paper_type %}
+                                <tr>
+                                    <td><strong>Бумага:</strong></td>
+                                    <td>{{ paper_types.get(order.paper_type, order.paper_type) }}</td>
+                                </tr>
+                                {% endif %}
+                                <tr>
+                                    <td><strong>Сумма:</strong></td>
+                                    <td><strong>{{ order.total_price }} ₽</strong></td>
+                                </tr>
+                            </table>
+                        </div>
+                        <div class="col-md-6">
+                            <h6>Временные метки</h6>
+                            <table class="table table-sm">
+                                <tr>
+                                    <td><strong>Создан:</strong></td>
+                                    <td>{{ order.created_at.strftime('%d.%m.%Y %H:%M') }}</td>
+                                </tr>
+                                {% if order.due_date %}
+                                <tr>
+                                    <td><strong>Срок готовности:</strong></td>
+                                    <td>{{ order.due_date.strftime('%d.%m.%Y %H:%M') }}</td>
+                                </tr>
+                                {% endif %}
+                                {% if order.completed_at %}
+                                <tr>
+                                    <td><strong>Завершен:</strong></td>
+                                    <td>{{ order.completed_at.strftime('%d.%m.%Y %H:%M') }}</td>
+                                </tr>
+                                {% endif %}
+                            </table>
+                        </div>
+                    </div>
+                    
+                    {% if order.status_events %}
+                    <div class="mt-3">
+                        <h6>История статусов</h6>
+                        <table class="table table-sm">
+                            {% for event in order.status_events %}
+                            <tr>
+                                <td>{{ event.ts.strftime('%d.%m.%Y %H:%M') }}</td>
+                                <td>{{ status_labels.get(event.status, event.status) }}</td>
+                            </tr>
+                            {% endfor %}
+                        </table>
+                    </div>
+                    {% endif %}
+                    
+                    {% if order.notes %}
+                    <div class="mt-3">
+                        <h6>Примечания</h6>
+                        <div class="bg-light p-3 rounded">{{ order.notes }}</div>
+                    </div>
+                    {% endif %}
+                    
+                    {% if order.files %}
+                    <div class="mt-3">
+                        <h6>
+                            Загруженные файлы
+                            {% if not order.is_archived %}
+                            <a href="{{ url_for('download_orders_zip', order_id=order.id) }}" class="btn btn-outline-primary btn-sm ms-2">
+                                <i class="bi bi-file-earmark-zip"></i> Скачать все (ZIP)
+                            </a>
+                            {% if current_user.role in ['admin', 'employee'] %}
+                            <form method="POST" action="{{ url_for('color_correct', order_id=order.id) }}" class="d-inline">
+                                <button type="submit" class="btn btn-outline-secondary btn-sm ms-1"{% if order.color_correct_queued %} disabled{% endif %}>
+                                    <i class="bi bi-magic"></i> {{ 'Цветокоррекция в очереди' if order.color_correct_queued else 'Автоцветокоррекция' }}
+                                </button>
+                            </form>
+                            {% endif %}
+                            {% endif %}
+                        </h6>
+                        {% if duplicates %}
+                        <div class="alert alert-warning py-2">
+                            <i class="bi bi-exclamation-triangle"></i> Похоже, некоторые фотографии уже загружались раньше. Проверьте их перед печатью, чтобы не напечатать дважды.
+                        </div>
+                        {% endif %}
+                        <div class="row">
+                            {% for file in order.files if file.source_file_id is none %}
+                            <div class="col-md-3 mb-2">
+                                <div class="card">
+                                    <div class="card-body p-2 text-center">
+                                        <i class="bi bi-file-earmark-image text-primary" style="font-size: 2rem;"></i>
+                                        <div class="small">{{ file.original_filename }}</div>
+                                        <div class="small text-muted">{{ "%.1f"|format(file.file_size / 1024) }} КБ</div>
+                                        {% for match in duplicates.get(file.id, []) %}
+                                        <div class="small">
+                                            <span class="badge bg-warning text-dark" title="Различие хешей: {{ match.distance }} бит из 64">Повтор</span>
+                                            {{ match.original_filename }}
+                                            {% if match.order_id != order.id %}
+                                            из <a href="{{ url_for('order_details', order_id=match.order_id) }}">{{ match.order_number }}</a>
+                                            {% endif %}
+                                        </div>
+                                        {% endfor %}
+                                        {% for version in order.files if version.source_file_id == file.id %}
+                                        {% if current_user.role in ['admin', 'employee'] or version.review_status == 'approved' %}
+                                        <div class="border-top mt-2 pt-2 small">
+                                            <div>{{ version.original_filename }}</div>
+                                            <span class="badge {% if version.review_status == 'approved' %}bg-success{% elif version.review_status == 'rejected' %}bg-secondary{% else %}bg-warning text-dark{% endif %}">
+                                                {% if version.review_status == 'approved' %}Одобрена
+                                                {% elif version.review_status == 'rejected' %}Отклонена
+                                                {% else %}На проверке
+                                                {% endif %}
+                                            </span>
+                                            <div class="mt-1">
+                                                <a href="{{ url_for('uploaded_file', filename=version.filename) }}" class="btn btn-outline-primary btn-sm" target="_blank" title="Открыть">
+                                                    <i class="bi bi-download"></i>
+                                                </a>
+                                                {% if current_user.role in ['admin', 'employee'] and not order.is_archived %}
+                                                {% if version.review_status != 'approved' %}
+                                                <button type="button" class="btn btn-outline-success btn-sm" onclick="reviewOrderFile({{ version.id }}, 'approved')" title="Одобрить">
+                                                    <i class="bi bi-check"></i>
+                                                </button>
+                                                {% endif %}
+                                                {% if version.review_status != 'rejected' %}
+                                                <button type="button" class="btn btn-outline-danger btn-sm" onclick="reviewOrderFile({{ version.id }}, 'rejected')" title="Отклонить">
+                                                    <i class="bi bi-x"></i>
+                                                </button>
+                                                {% endif %}
+                                                {% endif %}
+                                            </div>
+                                        </div>
+                                        {% endif %}
+                                        {% endfor %}
+                                        <a href="{{ url_for('uploaded_file', filename=file.filename) }}" class="btn btn-outline-primary btn-sm mt-1" target="_blank">
+                                            <i class="bi bi-download"></i>
+                                        </a>
+                                    </div>
+                                </div>
+                            </div>
+                            {% endfor %}
+                        </div>
+                    </div>
+                    {% endif %}
+                    
+                    <div class="mt-4 d-flex gap-2">
+                        {% if current_user.role in ['admin', 'employee'] and not order.is_archived %}
+                            <div class="btn-group" role="group">
+                                <button type="button" class="btn btn-outline-warning btn-sm" onclick="updateOrderStatus({{ order.id }}, 'pending')">
+                                    <i class="bi bi-hourglass"></i> В ожидании
+                                </button>
+                                <button type="button" class="btn btn-outline-info btn-sm" onclick="updateOrderStatus({{ order.id }}, 'processing')">
+                                    <i class="bi bi-gear"></i> В работе
+                                </button>
+                                <button type="button" class="btn btn-outline-success btn-sm" onclick="updateOrderStatus({{ order.id }}, 'ready')">
+                                    <i class="bi bi-check"></i> Готов
+                                </button>
+                                <button type="button" class="btn btn-outline-secondary btn-sm" onclick="updateOrderStatus({{ order.id }}, 'completed')">
+                                    <i class="bi bi-check-all"></i> Завершен
+                                </button>
+                            </div>
+                        {% endif %}
+                        
+                        <a href="{% if current_user.role in ['admin', 'employee'] %}{{ url_for('admin_dashboard') }}{% else %}{{ url_for('client_dashboard') }}{% endif %}" class="btn btn-outline-secondary">
+                            <i class="bi bi-arrow-left"></i> Назад
+                        </a>
+                    </div>
+                </div>
+            </div>
+        </div>
+    </div>
+</div>
+{% endblock %}
+'''
+
+SERVICES_TEMPLATE = '''
+{% extends "base.html" %}
+{% block title %}Управление услугами - Фотолаборатория{% endblock %}
+{% block content %}
+<div class="container mt-4">
+    <div class="d-flex justify-content-between align-items-center mb-4">
+        <h2><i class="bi bi-gear-fill"></i> Управление услугами</h2>
+        {% if current_user.role == 'admin' %}
+        <a href="{{ url_for('create_service') }}" class="btn btn-primary">
+            <i class="bi bi-plus-circle"></i> Добавить услугу
+        </a>
+        {% endif %}
+    </div>
+    
+    <div class="row">
+        {% for service in services %}
+        {{ fragment('service_card', (service.id, service.version), service=service) }}
+        {% endfor %}
+    </div>
+</div>
+{% endblock %}
+'''
+
+SERVICE_CARD_FRAGMENT = '''
+        <div class="col-md-6 col-lg-4 mb-4">
+            <div class="card service-card card-hover h-100">
+                <div class="card-body">
+                    <div class="d-flex justify-content-between align-items-start mb-2">
+                        <h5 class="card-title">{{ service.name }}</h5>
+                        <span class="badge {% if service.is_active %}bg-success{% else %}bg-secondary{% endif %}">
+                            {% if service.is_active %}Активна{% else %}Неактивна{% endif %}
+                        </span>
+                    </div>
+                    
+                    <p class="card-text">{{ service.description }}</p>
+                    
+                    <div class="row text-center">
+                        <div class="col-6">
+                            <div class="h5 text-primary mb-0">{{ service.price }} ₽</div>
+                            <small class="text-muted">Цена</small>
+                        </div>
+                        <div class="col-6">
+                            <div class="h6 mb-0">{{ service.processing_time }}ч</div>
+                            <small class="text-muted">Время</small>
+                        </div>
+                    </div>
+                    
+                    {% if current_user.role == 'admin' %}
+                    <div class="mt-3">
+                        <a href="{{ url_for('edit_service', service_id=service.id) }}" class="btn btn-outline-primary btn-sm">
+                            <i class="bi bi-pencil"></i> Редактировать
+                        </a>
+                    </div>
+                    {% endif %}
+                </div>
+            </div>
+        </div>
+'''
+
+CREATE_SERVICE_TEMPLATE = '''
+{% extends "base.html" %}
+{% block title %}Новая услуга - Фотолаборатория{% endblock %}
+{% block content %}
+<div class="container mt-4">
+    <div class="row justify-content-center">
+        <div class="col-md-6">
+            <div class="card shadow">
+                <div class="card-header">
+                    <h4 class="mb-0"><i class="bi bi-plus-circle"></i> Добавление новой услуги</h4>
+                </div>
+                <div class="card-body">
+                    <form method="POST">
+                        <div class="mb-3">
+                            <label for="name" class="form-label">Название услуги *</label>
+                            <input type="text" class="form-control" id="name" name="name" required>
+                        </div>
+                        
+                        <div class="mb-3">
+                            <label for="description" class="form-label">Описание</label>
+                            <textarea class="form-control" id="description" name="description" rows="3"></textarea>
+                        </div>
+                        
+                        <div class="mb-3">
+                            <label for="category" class="form-label">Категория</label>
+                            <select class="form-select" id="category" name="category">
+                                <option value="printing">Печать</option>
+                                <option value="editing">Редактирование</option>
+                                <option value="restoration">Реставрация</option>
+                                <option value="products">Продукция</option>
+                            </select>
+                        </div>
+                        
+                        <div class="row">
+                            <div class="col-md-6">
+                                <div class="mb-3">
+                                    <label for="price" class="form-label">Цена (₽) *</label>
+                                    <input type="number" class="form-control" id="price" name="price" step="0.01" min="0" required>
+                                </div>
+                            </div>
+                            <div class="col-md-6">
+                                <div class="mb-3">
+                                    <label for="processing_time" class="form-label">Время выполнения (часы) *</label>
+                                    <input type="number" class="form-control" id="processing_time" name="processing_time" min="1" required>
+                                </div>
+                            </div>
+                        </div>
+                        
+                        <div class="row">
+                            <div class="col-md-6">
+                                <div class="mb-3">
+                                    <label for="print_width_mm" class="form-label">Ширина отпечатка (мм)</label>
+                                    <input type="number" class="form-control" id="print_width_mm" name="print_width_mm" min="1">
+                                </div>
+                            </div>
+                            <div class="col-md-6">
+                                <div class="mb-3">
+                                    <label for="print_height_mm" class="form-label">Высота отпечатка (мм)</label>
+                                    <input type="number" class="form-control" id="print_height_mm" name="print_height_mm" min="1">
+                                </div>
+                            </div>
+                        </div>
+                        <div class="form-text mb-3 mt-n2">Заполняется для печатных услуг: по этому формату фото раскладываются на печатные листы</div>
+                        
+                        <div class="d-flex gap-2">
+                            <button type="submit" class="btn btn-primary">
+                                <i class="bi bi-plus-circle"></i> Создать услугу
+                            </button>
+                            <a href="{{ url_for('services') }}" class="btn btn-outline-secondary">
+                                <i class="bi bi-arrow-left"></i> Отмена
+                            </a>
+                        </div>
+                    </form>
+                </div>
+            </div>
+        </div>
+    </div>
+</div>
+{% endblock %}
+'''
+
+EDIT_SERVICE_TEMPLATE = '''
+{% extends "base.html" %}
+{% block title %}Редактирование услуги - Фотолаборатория{% endblock %}
+{% block content %}
+<div class="container mt-4">
+    <div class="row justify-content-center">
+        <div class="col-md-6">
+            <div class="card shadow">
+                <div class="card-header">
+                    <h4 class="mb-0"><i class="bi bi-pencil"></i> Редактирование услуги</h4>
+                </div>
+                <div class="card-body">
+                    <form method="POST">
+                        <div class="mb-3">
+                            <label for="name" class="form-label">Название услуги *</label>
+                            <input type="text" class="form-control" id="name" name="name" value="{{ service.name }}" required>
+                        </div>
+                        
+                        <div class="mb-3">
+                            <label for="description" class="form-label">Описание</label>
+                            <textarea class="form-control" id="description" name="description" rows="3">{{ service.description }}</textarea>
+                        </div>
+                        
+                        <div class="mb-3">
+                            <label for="category" class="form-label">Категория</label>
+                            <select class="form-select" id="category" name="category">
+                                <option value="printing" {% if service.category == 'printing' %}selected{% endif %}>Печать</option>
+                                <option value="editing" {% if service.category == 'editing' %}selected{% endif %}>Редактирование</option>
+                                <option value="restoration" {% if service.category == 'restoration' %}selected{% endif %}>Реставрация</option>
+                                <option value="products" {% if service.category == 'products' %}selected{% endif %}>Продукция</option>
+                            </select>
+                        </div>
+                        
+                        <div class="row">
+                            <div class="col-md-6">
+                                <div class="mb-3">
+                                    <label for="price" class="form-label">Цена (₽) *</label>
+                                    <input type="number" class="form-control" id="price" name="price" step="0.01" min="0" value="{{ service.price }}" required>
+                                </div>
+                            </div>
+                            <div class="col-md-6">
+                                <div class="mb-3">
+                                    <label for="processing_time" class="form-label">Время выполнения (часы) *</label>
+                                    <input type="number" class="form-control" id="processing_time" name="processing_time" min="1" value="{{ service.processing_time }}" required>
+                                </div>
+                            </div>
+                        </div>
+                        
+                        <div class="row">
+                            <div class="col-md-6">
+                                <div class="mb-3">
+                                    <label for="print_width_mm" class="form-label">Ширина отпечатка (мм)</label>
+                                    <input type="number" class="form-control" id="print_width_mm" name="print_width_mm" min="1" value="{{ service.print_width_mm or '' }}">
+                                </div>
+                            </div>
+                            <div class="col-md-6">
+                                <div class="mb-3">
+                                    <label for="print_height_mm" class="form-label">Высота отпечатка (мм)</label>
+                                    <input type="number" class="form-control" id="print_height_mm" name="print_height_mm" min="1" value="{{ service.print_height_mm or '' }}">
+                                </div>
+                            </div>
+                        </div>
+                        <div class="form-text mb-3 mt-n2">Заполняется для печатных услуг: по этому формату фото раскладываются на печатные листы</div>
+                        
+                        <div class="mb-3">
+                            <div class="form-check">
+                                <input class="form-check-input" type="checkbox" id="is_active" name="is_active" {% if service.is_active %}checked{% endif %}>
+                                <label class="form-check-label" for="is_active">
+                                    Услуга активна
+                                </label>
+                            </div>
+                        </div>
+                        
+                        <div class="d-flex gap-2">
+                            <button type="submit" class="btn btn-primary">
+                                <i class="bi bi-check-circle"></i> Сохранить
+                            </button>
+                            <a href="{{ url_for('services') }}" class="btn btn-outline-secondary">
+                                <i class="bi bi-arrow-left"></i> Отмена
+                            </a>
+                        </div>
+                    </form>
+                </div>
+            </div>
+        </div>
+    </div>
+</div>
+{% endblock %}
+'''
+
+SEARCH_RESULTS_TEMPLATE = '''
+{% extends "base.html" %}
+{% block title %}Результаты поиска - Фотолаборатория{% endblock %}
+{% block content %}
+<div class="container mt-4">
+    <h2><i class="bi bi-search"></i> Результаты поиска</h2>
+    
+    {% if query or status_filter %}
+    <div class="alert alert-info">
+        Поиск по: 
+        {% if query %}"{{ query }}"{% endif %}
+        {% if status_filter %}статус "{{ status_filter }}"{% endif %}
+        - найдено {{ orders|length }} заказов{% if include_archive %}, включая архив{% endif %}
+        {% if not include_archive %}
+        <a href="{{ url_for('search_orders', q=query, status=status_filter, archive=1) }}" class="alert-link ms-2">Искать также в архиве</a>
+        {% endif %}
+    </div>
+    {% endif %}
+    
+    <div class="row">
+        {% for order in orders %}
+        {{ fragment('search_order_card', order, order=order) }}
+        {% endfor %}
+        
+        {% if not orders %}
+        <div class="col-12">
+            <div class="text-center py-5">
+                <i class="bi bi-search" style="font-size: 4rem; color: #ccc;"></i>
+                <h4 class="mt-3 text-muted">Заказы не найдены</h4>
+                <p class="text-muted">Попробуйте изменить параметры поиска</p>
+            </div>
+        </div>
+        {% endif %}
+    </div>
+    
+    <div class="mt-4">
+        <a href="{% if current_user.role in ['admin', 'employee'] %}{{ url_for('admin_dashboard') }}{% else %}{{ url_for('client_dashboard') }}{% endif %}" class="btn btn-outline-secondary">
+            <i class="bi bi-arrow-left"></i> Назад к панели
+        </a>
+    </div>
+</div>
+{% endblock %}
+'''
+
+SEARCH_ORDER_CARD_FRAGMENT = '''
+        <div class="col-md-6 col-lg-4 mb-4">
+            <div class="card order-card card-hover h-100">
+                <div class="card-body">
+                    <div class="d-flex justify-content-between align-items-start mb-2">
+                        <h6 class="card-title mb-0">
+                            {{ order.order_number }}
+                            {% if order.is_archived %}<i class="bi bi-archive text-muted" title="Архив"></i>{% endif %}
+                        </h6>
+                        <span class="badge status-badge
+                            {% if order.status == 'pending' %}bg-warning text-dark
+                            {% elif order.status == 'processing' %}bg-info
+                            {% elif order.status == 'ready' %}bg-success
+                            {% elif order.status == 'completed' %}bg-secondary
+                            {% elif order.status == 'cancelled' %}bg-danger
+                            {% endif %}">
+                            {% if order.status == 'pending' %}Ожидает
+                            {% elif order.status == 'processing' %}В работе
+                            {% elif order.status == 'ready' %}Готов
+                            {% elif order.status == 'completed' %}Завершен
+                            {% elif order.status == 'cancelled' %}Отменен
+                            {% endif %}
+                        </span>
+                    </div>
+                    
+                    <p class="card-text">
+                        {% if current_user.role in ['admin', 'employee'] %}
+                        <strong>Клиент:</strong> {{ order.customer_name }}<br>
+                        {% endif %}
+                        <strong>Услуга:</strong> {{ order.service_name }}<br>
+                        <strong>Количество:</strong> {{ order.quantity }}<br>
+                        <strong>Сумма:</strong> {{ order.total_price }} ₽
+                    </p>
+                    
+                    <div class="small text-muted">
+                        <div><i class="bi bi-calendar"></i> {{ order.created_at.strftime('%d.%m.%Y %H:%M') }}</div>
+                        {% if order.due_date %}
+                        <div><i class="bi bi-clock"></i> {{ order.due_date.strftime('%d.%m.%Y %H:%M') }}</div>
+                        {% endif %}
+                    </div>
+                    
+                    <div class="mt-3">
+                        <a href="{{ url_for('order_details', order_id=order.id, archive=1 if order.is_archived else None) }}" class="btn btn-outline-primary btn-sm">
+                            <i class="bi bi-eye"></i> Подробнее
+                        </a>
+                    </div>
+                </div>
+            </div>
+        </div>
+'''
+
+IMPOSITION_TEMPLATE = '''
+{% extends "base.html" %}
+{% block title %}Печатные листы - Фотолаборатория{% endblock %}
+{% block content %}
+<div class="container mt-4">
+    <h2 class="mb-4"><i class="bi bi-grid-3x3-gap-fill"></i> Раскладка на печатные листы</h2>
+    
+    <div class="card mb-4">
+        <div class="card-body">
+            <form method="GET" class="row g-3 align-items-end">
+                <div class="col-md-4">
+                    <label for="service_id" class="form-label">Услуга</label>
+                    <select class="form-select" id="service_id" name="service_id">
+                        <option value="">Все печатные услуги</option>
+                        {% for service in services %}
+                        <option value="{{ service.id }}" {% if service.id == service_id %}selected{% endif %}>
+                            {{ service.name }} ({{ service.print_width_mm }}×{{ service.print_height_mm }} мм)
+                        </option>
+                        {% endfor %}
+                    </select>
+                </div>
+                <div class="col-md-5">
+                    <label class="form-label d-block">Форматы листов</label>
+                    {% for name, size in sheet_sizes.items() %}
+                    <div class="form-check form-check-inline">
+                        <input class="form-check-input" type="checkbox" id="sheet_{{ name }}" name="sheets" value="{{ name }}" {% if name in selected_sheets %}checked{% endif %}>
+                        <label class="form-check-label" for="sheet_{{ name }}">{{ name }} ({{ size[0] }}×{{ size[1] }})</label>
+                    </div>
+                    {% endfor %}
+                </div>
+                <div class="col-md-3 d-flex gap-2">
+                    <button type="submit" class="btn btn-outline-primary">
+                        <i class="bi bi-arrow-repeat"></i> Пересчитать
+                    </button>
+                    <button type="submit" formmethod="POST" class="btn btn-primary" {% if not sheets %}disabled{% endif %}>
+                        <i class="bi bi-printer"></i> Сформировать
+                    </button>
+                </div>
+            </form>
+        </div>
+    </div>
+    
+    <div class="row mb-4">
+        <div class="col-md-3">
+            <div class="card stats-card text-center">
+                <div class="card-body">
+                    <h3>{{ orders|length }}</h3>
+                    <p class="mb-0">Заказов в очереди</p>
+                </div>
+            </div>
+        </div>
+        <div class="col-md-3">
+            <div class="card text-center">
+                <div class="card-body">
+                    <h3>{{ usage.prints }}</h3>
+                    <p class="mb-0">Отпечатков</p>
+                </div>
+            </div>
+        </div>
+        <div class="col-md-3">
+            <div class="card text-center">
+                <div class="card-body">
+                    <h3>{{ usage.sheets }}</h3>
+                    <p class="mb-0">Листов ({{ "%.2f"|format(usage.sheet_area_m2) }} м²)</p>
+                </div>
+            </div>
+        </div>
+        <div class="col-md-3">
+            <div class="card bg-success text-white text-center">
+                <div class="card-body">
+                    <h3>{{ "%.1f"|format(usage.utilization) }}%</h3>
+                    <p class="mb-0">Заполнение бумаги</p>
+                </div>
+            </div>
+        </div>
+    </div>
+    
+    {% if skipped %}
+    <div class="alert alert-warning">
+        <i class="bi bi-exclamation-triangle"></i> {{ skipped|length }} отпечатков не помещаются ни на один из выбранных форматов листа
+    </div>
+    {% endif %}
+    
+    {% if rendered %}
+    <div class="card mb-4">
+        <div class="card-header"><h5 class="mb-0"><i class="bi bi-download"></i> Готовые листы</h5></div>
+        <ul class="list-group list-group-flush">
+            {% for filename in rendered %}
+            <li class="list-group-item">
+                <a href="{{ url_for('print_sheet_file', filename=filename) }}" target="_blank">{{ filename }}</a>
+            </li>
+            {% endfor %}
+        </ul>
+    </div>
+    {% endif %}
+    
+    <div class="card">
+        <div class="card-header"><h5 class="mb-0"><i class="bi bi-list-ul"></i> Расход бумаги</h5></div>
+        <div class="card-body p-0">
+            <table class="table mb-0">
+                <thead class="table-light">
+                    <tr>
+                        <th>Формат</th>
+                        <th>Листов</th>
+                        <th>Отпечатков</th>
+                        <th>Заполнение</th>
+                    </tr>
+                </thead>
+                <tbody>
+                    {% for name, size_usage in usage.by_size.items() %}
+                    <tr>
+                        <td>{{ name }}</td>
+                        <td>{{ size_usage.sheets }}</td>
+                        <td>{{ size_usage.prints }}</td>
+                        <td>{{ "%.1f"|format(size_usage.utilization) }}%</td>
+                    </tr>
+                    {% endfor %}
+                    {% if not sheets %}
+                    <tr>
+                        <td colspan="4" class="text-center py-4 text-muted">
+                            <i class="bi bi-inbox"></i> Нет ожидающих заказов с файлами для печати
+                        </td>
+                    </tr>
+                    {% endif %}
+                </tbody>
+            </table>
+        </div>
+    </div>
+</div>
+{% endblock %}
+'''
+
+PRODUCTION_QUEUE_TEMPLATE = '''
+{% extends "base.html" %}
+{% block title %}Очередь печати - Фотолаборатория{% endblock %}
+{% block content %}
+<div class="container mt-4">
+    <div class="d-flex justify-content-between align-items-center mb-4">
+        <h2><i class="bi bi-stack"></i> Производственная очередь</h2>
+        <span class="badge bg-info fs-6">В работе: {{ processing_orders }}</span>
+    </div>
+    
+    <div class="card">
+        <div class="card-header">
+            <h5 class="mb-0"><i class="bi bi-list-ol"></i> Партии ожидающих заказов</h5>
+        </div>
+        <div class="card-body p-0">
+            <div class="table-responsive">
+                <table class="table table-hover mb-0 align-middle">
+                    <thead class="table-light">
+                        <tr>
+                            <th>#</th>
+                            <th>Услуга</th>
+                            <th>Бумага</th>
+                            <th>Заказов</th>
+                            <th>Отпечатков</th>
+                            <th>Срок</th>
+                            <th>Линия</th>
+                            <th>Расчетный старт</th>
+                            <th>Расчетное окончание</th>
+                            <th></th>
+                        </tr>
+                    </thead>
+                    <tbody>
+                        {% for batch in batches %}
+                        <tr {% if batch.late %}class="table-danger"{% endif %}>
+                            <td>{{ loop.index }}</td>
+                            <td>{{ batch.service.name }}</td>
+                            <td>{{ paper_types.get(batch.paper_type, '—') }}</td>
+                            <td>
+                                {{ batch.orders|length }}
+                                <div class="small text-muted">
+                                    {% for order in batch.orders[:5] %}
+                                    <a href="{{ url_for('order_details', order_id=order.id) }}">{{ order.order_number }}</a>{% if not loop.last %}, {% endif %}
+                                    {% endfor %}
+                                    {% if batch.orders|length > 5 %}и еще {{ batch.orders|length - 5 }}{% endif %}
+                                </div>
+                            </td>
+                            <td>{{ batch.prints }}</td>
+                            <td>{% if batch.due_date %}{{ batch.due_date.strftime('%d.%m %H:%M') }}{% else %}—{% endif %}</td>
+                            <td>{{ batch.lane }}</td>
+                            <td>{{ batch.estimated_start.strftime('%d.%m %H:%M') }}</td>
+                            <td>
+                                {{ batch.estimated_finish.strftime('%d.%m %H:%M') }}
+                                {% if batch.late %}<span class="badge bg-danger">опоздание</span>{% endif %}
+                            </td>
+                            <td>
+                                <form method="POST" action="{{ url_for('start_production_batch') }}">
+                                    {% for order in batch.orders %}
+                                    <input type="hidden" name="order_ids" value="{{ order.id }}">
+                                    {% endfor %}
+                                    <button type="submit" class="btn btn-primary btn-sm">
+                                        <i class="bi bi-play-fill"></i> Запустить
+                                    </button>
+                                    <a href="{{ url_for('download_orders_zip', order_id=batch.orders|map(attribute='id')|list) }}" class="btn btn-outline-secondary btn-sm" title="Файлы партии одним архивом">
+                                        <i class="bi bi-file-earmark-zip"></i>
+                                    </a>
+                                </form>
+                            </td>
+                        </tr>
+                        {% endfor %}
+                        
+                        {% if not batches %}
+                        <tr>
+                            <td colspan="9" class="text-center py-4 text-muted">
+                                <i class="bi bi-inbox"></i> Ожидающих заказов нет
+                            </td>
+                        </tr>
+                        {% endif %}
+                    </tbody>
+                </table>
+            </div>
+        </div>
+    </div>
+</div>
+{% endblock %}
+'''
+
+REPORTS_TEMPLATE = '''
+{% extends "base.html" %}
+{% block title %}Отчеты - Фотолаборатория{% endblock %}
+{% block content %}
+<div class="container mt-4">
+    <div class="d-flex justify-content-between align-items-center mb-4">
+        <h2><i class="bi bi-graph-up"></i> Отчеты</h2>
+        <form method="GET" class="d-flex gap-2">
+            <select class="form-select" name="days" onchange="this.form.submit()">
+                {% for value in [7, 30, 90, 365] %}
+                <option value="{{ value }}" {% if value == days %}selected{% endif %}>За {{ value }} дн.</option>
+                {% endfor %}
+            </select>
+        </form>
+    </div>
+    
+    <div class="card mb-4">
+        <div class="card-header"><h5 class="mb-0"><i class="bi bi-calendar3"></i> По дням</h5></div>
+        <div class="card-body p-0">
+            <table class="table table-sm mb-0">
+                <thead class="table-light">
+                    <tr>
+                        <th>Дата</th>
+                        <th style="width: 50%;">Заказов</th>
+                        <th>Выручка</th>
+                    </tr>
+                </thead>
+                <tbody>
+                    {% for day, orders_count, revenue in by_day %}
+                    <tr>
+                        <td>{{ day.strftime('%d.%m.%Y') }}</td>
+                        <td>
+                            <div class="d-flex align-items-center gap-2">
+                                <div class="bg-primary rounded" style="height: 0.75rem; width: {{ (orders_count / max_day_orders * 100) if max_day_orders else 0 }}%;"></div>
+                                <span>{{ orders_count }}</span>
+                            </div>
+                        </td>
+                        <td>{{ "%.2f"|format(revenue) }} ₽</td>
+                    </tr>
+                    {% endfor %}
+                    {% if not by_day %}
+                    <tr>
+                        <td colspan="3" class="text-center py-4 text-muted"><i class="bi bi-inbox"></i> Нет данных за период</td>
+                    </tr>
+                    {% endif %}
+                </tbody>
+            </table>
+        </div>
+    </div>
+    
+    <div class="row">
+        <div class="col-md-7 mb-4">
+            <div class="card h-100">
+                <div class="card-header"><h5 class="mb-0"><i class="bi bi-gear-fill"></i> По услугам</h5></div>
+                <div class="card-body p-0">
+                    <table class="table table-sm mb-0">
+                        <thead class="table-light">
+                            <tr><th>Услуга</th><th>Заказов</th><th>Выручка</th></tr>
+                        </thead>
+                        <tbody>
+                            {% for name, orders_count, revenue in by_service %}
+                            <tr><td>{{ name }}</td><td>{{ orders_count }}</td><td>{{ "%.2f"|format(revenue) }} ₽</td></tr>
+                            {% endfor %}
+                        </tbody>
+                    </table>
+                </div>
+            </div>
+        </div>
+        <div class="col-md-5 mb-4">
+            <div class="card h-100">
+                <div class="card-header"><h5 class="mb-0"><i class="bi bi-tags-fill"></i> По категориям</h5></div>
+                <div class="card-body p-0">
+                    <table class="table table-sm mb-0">
+                        <thead class="table-light">
+                            <tr><th>Категория</th><th>Заказов</th><th>Выручка</th></tr>
+                        </thead>
+                        <tbody>
+                            {% for category, orders_count, revenue in by_category %}
+                            <tr><td>{{ category }}</td><td>{{ orders_count }}</td><td>{{ "%.2f"|format(revenue) }} ₽</td></tr>
+                            {% endfor %}
+                        </tbody>
+                    </table>
+                </div>
+            </div>
+        </div>
+    </div>
+    <div class="card mb-4">
+        <div class="card-header"><h5 class="mb-0"><i class="bi bi-stopwatch"></i> Время выполнения, ч</h5></div>
+        <div class="card-body p-0">
+            <table class="table table-sm mb-0">
+                <thead class="table-light">
+                    <tr><th>Услуга</th><th>Заказов</th><th>Медиана</th><th>90%</th><th>95%</th></tr>
+                </thead>
+                <tbody>
+                    {% for row in turnaround %}
+                    <tr>
+                        <td>{{ row.service }}</td>
+                        <td>{{ row.orders }}</td>
+                        <td>{{ "%.1f"|format(row.p50) }}</td>
+                        <td>{{ "%.1f"|format(row.p90) }}</td>
+                        <td>{{ "%.1f"|format(row.p95) }}</td>
+                    </tr>
+                    {% endfor %}
+                    {% if not turnaround %}
+                    <tr>
+                        <td colspan="5" class="text-center py-4 text-muted"><i class="bi bi-inbox"></i> Нет завершенных заказов за период</td>
+                    </tr>
+                    {% endif %}
+                </tbody>
+            </table>
+        </div>
+    </div>
+    <p class="small text-muted">Выручка учитывает только завершенные заказы, заказы относятся к дню создания.</p>
+</div>
+{% endblock %}
+'''
@@ -0,0 +1,46 @@
+from flask import g, render_template
+from jinja2 import BaseLoader, TemplateNotFound
+import time
+
+class StringTemplateLoader(BaseLoader):
+    """Отдает шаблоны из констант модуля templates: 'admin_dashboard.html' -> ADMIN_DASHBOARD_TEMPLATE.
+
+    Фрагменты страниц 'fragments/admin_order_row.html' -> ADMIN_ORDER_ROW_FRAGMENT
+    отдаются как есть, без базового шаблона.
+
+    Модуль с шаблонами импортируется только при первом рендеринге, а
+    скомпилированные шаблоны Jinja кеширует, так что каждый шаблон
+    компилируется один раз на процесс.
+    """
+    
+    def get_source(self, environment, template):
+        from . import templates
+        
+        if template.startswith('fragments/'):
+            source = getattr(templates, template.split('/', 1)[1].rsplit('.', 1)[0].upper() + '_FRAGMENT', None)
+            if source is None:
+                raise TemplateNotFound(template)
+            return source.strip(), None, lambda: True
+        name = template.rsplit('.', 1)[0].upper() + '_TEMPLATE'
+        source = getattr(templates, name, None)
+        if source is None or name == 'BASE_TEMPLATE':
+            raise TemplateNotFound(template)
+        return merge_with_base(templates.BASE_TEMPLATE, source), None, lambda: True
+
+def merge_with_base(base_template, template_string):
+    """Подставляет блок content страницы в базовый шаблон"""
+    full_template = template_string.replace('{% extends "base.html" %}', '').strip()
+    if '{% block content %}' in full_template:
+        content = full_template.split('{% block content %}')[1].split('{% endblock %}')[0]
+        return base_template.replace('{% block content %}{% endblock %}', content)
+    return base_template.replace('{% block content %}{% endblock %}', full_template)
+
+def render_page(template_name, **context):
+    started = time.perf_counter()
+    try:
+        return render_template(template_name, **context)
+    finally:
+        # При включенном профилировании время рендеринга попадает в профиль запроса
+        profile = g.get('profile')
+        if profile is not None:
+            profile['template_time'] += time.perf_counter() - started
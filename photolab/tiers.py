@@ -0,0 +1,155 @@
+"""Уровни хранения загруженных файлов.
+
+Горячий уровень - папка UPLOAD_FOLDER на быстром диске, из нее файлы
+отдаются и печатаются. Холодный - сжатый архив в локальной папке или
+S3-совместимое хранилище. Файлы давно завершенных и отмененных заказов
+переносятся в холодный уровень командой archive-files и возвращаются в
+горячий при первом обращении; через ARCHIVE_AFTER_DAYS после возврата
+archive-files уносит их обратно, в том числе файлы архивных заказов.
+"""
+from flask import current_app
+from datetime import datetime, timedelta
+import contextlib
+import gzip
+import hashlib
+import os
+import shutil
+import uuid
+
+from .extensions import db
+from .models import ArchivedOrder, ArchivedOrderFile, Order, OrderFile
+from .storage import COPY_CHUNK_SIZE, upload_path
+
+ARCHIVED_STATUSES = ('completed', 'cancelled')
+
+class LocalArchiveStore:
+    """Холодный уровень в локальной папке, каждый файл сжат gzip"""
+    
+    def __init__(self, folder, compresslevel=6):
+        self.folder = folder
+        self.compresslevel = compresslevel
+    
+    def _path(self, key):
+        return os.path.join(self.folder, key + '.gz')
+    
+    def put(self, key, source_path):
+        os.makedirs(self.folder, exist_ok=True)
+        # Пишем во временный файл и переименовываем, чтобы в архиве не оставалось недописанных файлов
+        tmp_path = self._path(f'.{uuid.uuid4().hex}')
+        with open(source_path, 'rb') as src, gzip.open(tmp_path, 'wb', compresslevel=self.compresslevel) as dst:
+            shutil.copyfileobj(src, dst, COPY_CHUNK_SIZE)
+        os.replace(tmp_path, self._path(key))
+    
+    def open(self, key):
+        return gzip.open(self._path(key), 'rb')
+
+class S3Store:
+    """Холодный уровень в S3-совместимом хранилище (AWS, MinIO, Ceph)"""
+    
+    def __init__(self, bucket, prefix='', endpoint_url=None, storage_class=None):
+        import boto3
+        self.client = boto3.client('s3', endpoint_url=endpoint_url)
+        self.bucket = bucket
+        self.prefix = prefix
+        self.storage_class = storage_class
+    
+    def put(self, key, source_path):
+        extra = {'StorageClass': self.storage_class} if self.storage_class else None
+        self.client.upload_file(source_path, self.bucket, self.prefix + key, ExtraArgs=extra)
+    
+    def open(self, key):
+        return self.client.get_object(Bucket=self.bucket, Key=self.prefix + key)['Body']
+
+def cold_store():
+    """Холодное хранилище приложения, создается один раз по настройкам COLD_STORAGE_*"""
+    store = current_app.extensions.get('photolab_cold_store')
+    if store is None:
+        config = current_app.config
+        if config['COLD_STORAGE'] == 's3':
+            store = S3Store(config['COLD_STORAGE_S3_BUCKET'], config['COLD_STORAGE_S3_PREFIX'],
+                            config['COLD_STORAGE_S3_ENDPOINT_URL'], config['COLD_STORAGE_S3_STORAGE_CLASS'])
+        else:
+            store = LocalArchiveStore(config['COLD_STORAGE_FOLDER'])
+        current_app.extensions['photolab_cold_store'] = store
+    return store
+
+def ensure_hot(order_file):
+    """Путь к файлу в горячем уровне; файл из архива сначала возвращается на диск"""
+    path = upload_path(order_file.filename)
+    if order_file.storage_tier != 'cold':
+        return path
+    
+    os.makedirs(current_app.config['UPLOAD_FOLDER'], exist_ok=True)
+    tmp_path = upload_path(f'.{uuid.uuid4().hex}.part')
+    digest = hashlib.sha256()
+    try:
+        with contextlib.closing(cold_store().open(order_file.filename)) as src, open(tmp_path, 'wb') as dst:
+            for chunk in iter(lambda: src.read(COPY_CHUNK_SIZE), b''):
+                digest.update(chunk)
+                dst.write(chunk)
+        if order_file.checksum and digest.hexdigest() != order_file.checksum:
+            raise IOError(f'Архивная копия {order_file.filename} не совпадает с контрольной суммой')
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    
+    # Архивная копия остается: содержимое файлов не меняется, повторный перенос ее просто перезапишет
+    order_file.storage_tier = 'hot'
+    order_file.tier_changed_at = datetime.utcnow()
+    db.session.commit()
+    return path
+
+def archive_candidates(days, file_model=OrderFile, order_model=Order):
+    """Горячие файлы заказов, завершенных или отмененных больше days дней назад.
+
+    Для файлов архивных заказов - file_model=ArchivedOrderFile, order_model=ArchivedOrder:
+    их файлы тоже возвращаются на диск при открытии и должны уходить обратно.
+    """
+    cutoff = datetime.utcnow() - timedelta(days=days)
+    return (db.select(file_model)
+            .join(order_model, order_model.id == file_model.order_id)
+            .where(file_model.storage_tier == 'hot',
+                   order_model.status.in_(ARCHIVED_STATUSES),
+                   # У отмененных заказов нет completed_at, для них считаем от создания
+                   db.func.coalesce(order_model.completed_at, order_model.created_at) < cutoff,
+                   # Только что возвращенный из архива файл не уносим обратно сразу же
+                   db.or_(file_model.tier_changed_at.is_(None), file_model.tier_changed_at < cutoff))
+            .order_by(file_model.id))
+
+def archive_files(days=None, limit=None, dry_run=False, batch_size=500, echo=print):
+    """Переносит файлы старых заказов (и заказов из архивных таблиц) в холодный уровень, возвращает (файлов, байт)"""
+    days = current_app.config['ARCHIVE_AFTER_DAYS'] if days is None else days
+    store = cold_store()
+    moved = moved_bytes = 0
+    for file_model, order_model in ((OrderFile, Order), (ArchivedOrderFile, ArchivedOrder)):
+        last_id = 0
+        while limit is None or moved < limit:
+            size = batch_size if limit is None else min(batch_size, limit - moved)
+            batch = db.session.execute(archive_candidates(days, file_model, order_model)
+                                       .where(file_model.id > last_id).limit(size)).scalars().all()
+            if not batch:
+                break
+            last_id = batch[-1].id
+            
+            archived = []
+            for order_file in batch:
+                path = upload_path(order_file.filename)
+                if not os.path.exists(path):
+                    echo(f'Нет на диске: {path} (файл #{order_file.id})')
+                    continue
+                if not dry_run:
+                    store.put(order_file.filename, path)
+                    order_file.storage_tier = 'cold'
+                    order_file.tier_changed_at = datetime.utcnow()
+                archived.append(path)
+                moved += 1
+                moved_bytes += order_file.file_size or 0
+            
+            if not dry_run:
+                # Горячие копии удаляются только после фиксации: при сбое остается лишняя копия, а не потерянный файл
+                db.session.commit()
+                for path in archived:
+                    os.remove(path)
+                echo(f'Перенесено в архив: {moved} файлов, {moved_bytes / 2**20:.1f} МБ')
+    return moved, moved_bytes
@@ -0,0 +1,101 @@
+"""Потоковая сборка ZIP-архива из файлов на диске.
+
+Все записи хранятся без сжатия (фотографии в JPEG все равно не сжимаются),
+а CRC32 и размеры известны заранее, поэтому раскладка архива полностью
+определена до отправки первого байта: известен общий размер, и любой
+диапазон байт можно выдать, не собирая архив целиком. Так работают
+Content-Length и докачка через Range. Данные файлов читаются с диска
+кусками прямо при отправке, временных файлов нет.
+"""
+from collections import namedtuple
+import struct
+
+ZipEntry = namedtuple('ZipEntry', 'arcname path size crc32 modified')
+
+READ_CHUNK_SIZE = 256 * 1024
+ZIP64_LIMIT = 0xFFFFFFFF
+UTF8_FLAG = 0x0800
+VERSION_DEFAULT = 20
+VERSION_ZIP64 = 45
+
+def _dos_datetime(dt):
+    if dt.year < 1980:
+        return 0, (1 << 5) | 1
+    return ((dt.hour << 11) | (dt.minute << 5) | (dt.second // 2),
+            ((dt.year - 1980) << 9) | (dt.month << 5) | dt.day)
+
+class ZipLayout:
+    """Раскладка архива: список сегментов (байты заголовков или участок файла) и общий размер"""
+
+    def __init__(self, entries):
+        self.segments = []  # (смещение, длина, bytes или путь к файлу)
+        self.size = 0
+        central = []
+        for entry in entries:
+            offset = self.size
+            name = entry.arcname.encode('utf-8')
+            time, date = _dos_datetime(entry.modified)
+            zip64 = entry.size >= ZIP64_LIMIT
+            extra = struct.pack('<HHQQ', 1, 16, entry.size, entry.size) if zip64 else b''
+            size32 = ZIP64_LIMIT if zip64 else entry.size
+            version = VERSION_ZIP64 if zip64 else VERSION_DEFAULT
+            header = struct.pack('<IHHHHHIIIHH', 0x04034b50, version, UTF8_FLAG, 0, time, date,
+                                 entry.crc32, size32, size32, len(name), len(extra)) + name + extra
+            self._add(header)
+            self._add(entry.path, entry.size)
+            central.append((entry, name, time, date, offset))
+
+        cd_offset = self.size
+        for entry, name, time, date, offset in central:
+            # В центральном каталоге поля, не влезающие в 32 бита, переносятся в extra zip64
+            zip64_fields = []
+            if entry.size >= ZIP64_LIMIT:
+                zip64_fields += [entry.size, entry.size]
+            if offset >= ZIP64_LIMIT:
+                zip64_fields.append(offset)
+            extra = struct.pack(f'<HH{len(zip64_fields)}Q', 1, 8 * len(zip64_fields), *zip64_fields) if zip64_fields else b''
+            size32 = ZIP64_LIMIT if entry.size >= ZIP64_LIMIT else entry.size
+            version = VERSION_ZIP64 if zip64_fields else VERSION_DEFAULT
+            self._add(struct.pack('<IHHHHHHIIIHHHHHII', 0x02014b50, version, version, UTF8_FLAG, 0, time, date,
+                                  entry.crc32, size32, size32, len(name), len(extra), 0, 0, 0, 0,
+                                  min(offset, ZIP64_LIMIT)) + name + extra)
+        cd_size = self.size - cd_offset
+
+        count = len(central)
+        if count >= 0xFFFF or cd_offset >= ZIP64_LIMIT or cd_size >= ZIP64_LIMIT:
+            zip64_end = self.size
+            self._add(struct.pack('<IQHHIIQQQQ', 0x06064b50, 44, VERSION_ZIP64, VERSION_ZIP64, 0, 0,
+                                  count, count, cd_size, cd_offset))
+            self._add(struct.pack('<IIQI', 0x07064b50, 0, zip64_end, 1))
+        self._add(struct.pack('<IHHHHIIH', 0x06054b50, 0, 0, min(count, 0xFFFF), min(count, 0xFFFF),
+                              min(cd_size, ZIP64_LIMIT), min(cd_offset, ZIP64_LIMIT), 0))
+
+    def _add(self, data, length=None):
+        length = len(data) if length is None else length
+        if length:
+            self.segments.append((self.size, length, data))
+            self.size += length
+
+    def iter_bytes(self, start=0, stop=None):
+        """Байты архива в диапазоне [start, stop); файлы читаются с диска по мере отправки"""
+        stop = self.size if stop is None else stop
+        for offset, length, data in self.segments:
+            if offset + length <= start:
+                continue
+            if offset >= stop:
+                break
+            begin = max(start - offset, 0)
+            end = min(stop - offset, length)
+            if isinstance(data, bytes):
+                yield data[begin:end]
+                continue
+            with open(data, 'rb') as f:
+                f.seek(begin)
+                remaining = end - begin
+                while remaining > 0:
+                    chunk = f.read(min(READ_CHUNK_SIZE, remaining))
+                    if not chunk:
+                        # Файл укоротился после расчета раскладки: архив уже не собрать корректно
+                        raise IOError(f'Файл {data} изменился во время выгрузки')
+                    remaining -= len(chunk)
+                    yield chunk
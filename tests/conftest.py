@@ -0,0 +1,59 @@
+import io
+
+import pytest
+from PIL import Image
+from werkzeug.security import generate_password_hash
+
+from photolab import create_app
+from photolab.cli import init_db
+from photolab.extensions import db
+from photolab.models import Order, Service, User
+
+@pytest.fixture
+def app(tmp_path):
+    """Приложение на пустой базе во временной папке: услуги и учетные записи из init-db и клиент client / client123"""
+    app = create_app({
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{tmp_path / "photolab.db"}',
+        'UPLOAD_FOLDER': str(tmp_path / 'uploads'),
+        'PRINT_SHEETS_FOLDER': str(tmp_path / 'print_sheets'),
+        'COLD_STORAGE_FOLDER': str(tmp_path / 'cold_storage'),
+        'EXPORT_FOLDER': str(tmp_path / 'print_export'),
+        'ASSETS_FOLDER': str(tmp_path / 'assets'),
+        'BACKUP_FOLDER': str(tmp_path / 'backups'),
+        'ORDER_ARCHIVE_BATCH_SLEEP': 0,
+    })
+    with app.app_context():
+        init_db()
+        db.session.add(User(username='client', email='client@example.com',
+                            password_hash=generate_password_hash('client123'), role='client'))
+        db.session.commit()
+    return app
+
+@pytest.fixture
+def login(app):
+    """Тестовый клиент, вошедший под указанной учетной записью"""
+    def login(username, password):
+        client = app.test_client()
+        client.post('/login', data={'username': username, 'password': password})
+        return client
+    return login
+
+def jpeg_bytes(image):
+    buffer = io.BytesIO()
+    image.save(buffer, 'JPEG', quality=95)
+    return buffer.getvalue()
+
+@pytest.fixture
+def create_order(app, login):
+    """Заказ клиента client через форму создания; images - снимки PIL, возвращает id заказа"""
+    def create_order(service_name, images, quantity=1):
+        client = login('client', 'client123')
+        with app.app_context():
+            service_id = Service.query.filter_by(name=service_name).one().id
+        files = [(io.BytesIO(jpeg_bytes(image)), f'photo{i}.jpg') for i, image in enumerate(images)]
+        client.post('/create_order', data={'service_id': service_id, 'quantity': quantity, 'files': files},
+                    content_type='multipart/form-data')
+        with app.app_context():
+            return db.session.scalar(db.select(db.func.max(Order.id)))
+    return create_order
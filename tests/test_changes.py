@@ -0,0 +1,52 @@
+from PIL import Image
+from werkzeug.security import generate_password_hash
+
+from photolab.extensions import db
+from photolab.models import Order, User
+
+def _changes(client, since):
+    response = client.get(f'/api/orders/changes?since={since}')
+    assert response.status_code == 200
+    return response.json
+
+def _photo(shade):
+    return [Image.new('RGB', (300, 200), (shade, 100, 30))]
+
+def test_feed_returns_created_and_updated_orders(app, create_order, login):
+    first = create_order('Печать фото 10x15', _photo(10))
+    second = create_order('Печать фото 10x15', _photo(200))
+    client = login('client', 'client123')
+
+    feed = _changes(client, 0)
+    assert [order['id'] for order in feed['orders']] == [first, second]
+    assert not feed['has_more']
+    assert _changes(client, feed['cursor']) == {'cursor': feed['cursor'], 'has_more': False, 'orders': []}
+
+    # Любое изменение заказа выдает ему номер больше всех прежних - триггер, а не код приложения
+    with app.app_context():
+        db.session.get(Order, first).notes = 'Матовая бумага'
+        db.session.commit()
+    changed = _changes(client, feed['cursor'])
+    assert [order['id'] for order in changed['orders']] == [first]
+    assert changed['orders'][0]['change_seq'] > feed['orders'][-1]['change_seq']
+    assert changed['cursor'] == changed['orders'][0]['change_seq']
+
+def test_feed_pages_with_has_more(app, create_order, login):
+    ids = [create_order('Печать фото 10x15', _photo(shade)) for shade in (10, 80, 150)]
+    app.config['CHANGES_PAGE_SIZE'] = 2
+    client = login('client', 'client123')
+
+    page = _changes(client, 0)
+    assert [order['id'] for order in page['orders']] == ids[:2] and page['has_more']
+    page = _changes(client, page['cursor'])
+    assert [order['id'] for order in page['orders']] == ids[2:] and not page['has_more']
+
+def test_client_sees_only_own_changes(app, create_order, login):
+    order_id = create_order('Печать фото 10x15', _photo(10))
+    with app.app_context():
+        db.session.add(User(username='other', email='other@example.com',
+                            password_hash=generate_password_hash('other123'), role='client'))
+        db.session.commit()
+
+    assert _changes(login('other', 'other123'), 0)['orders'] == []
+    assert [order['id'] for order in _changes(login('admin', 'admin123'), 0)['orders']] == [order_id]
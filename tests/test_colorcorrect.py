@@ -0,0 +1,53 @@
+from PIL import Image
+
+from photolab.colorcorrect import color_correct_order, color_correction_orders, review_version
+from photolab.extensions import db
+from photolab.models import Order, OrderFile
+
+def _dull_photo():
+    # Узкий диапазон яркостей с синим оттенком: уровням и балансу белого есть что исправлять
+    image = Image.new('RGB', (200, 150))
+    image.putdata([(80 + x // 10, 90 + y // 10, 120) for y in range(150) for x in range(200)])
+    return image
+
+def test_only_queued_orders_are_corrected(app, create_order, login):
+    retouch = create_order('Ретушь фото', [_dull_photo()])
+    correction = create_order('Цветокоррекция', [_dull_photo()])
+    printing = create_order('Печать фото 10x15', [_dull_photo()])
+    login('admin', 'admin123').post(f'/order/{printing}/color_correct')
+    
+    with app.app_context():
+        assert [order.id for order in color_correction_orders()] == [correction, printing]
+        assert db.session.get(Order, retouch).color_correct_queued is None
+
+def test_corrected_version_waits_for_review(app, create_order):
+    order_id = create_order('Цветокоррекция', [_dull_photo(), _dull_photo()])
+    with app.app_context():
+        order = db.session.get(Order, order_id)
+        assert color_correct_order(order, workers=1, echo=lambda message: None) == (2, 0)
+        assert order.color_correct_queued is None
+        assert color_correction_orders() == []
+        
+        versions = OrderFile.query.filter(OrderFile.source_file_id.isnot(None)).order_by(OrderFile.id).all()
+        assert [version.review_status for version in versions] == ['pending', 'pending']
+        # Пока версия не одобрена, в печать идут исходники
+        assert [f.source_file_id for f in order.print_files] == [None, None]
+        
+        with Image.open(f"{app.config['UPLOAD_FOLDER']}/{versions[0].filename}") as corrected:
+            low, high = corrected.convert('L').getextrema()
+        assert high - low > 200
+        
+        review_version(versions[0], 'approved', user_id=1)
+        review_version(versions[1], 'rejected', user_id=1)
+        assert [f.id for f in order.print_files] == [versions[0].id, versions[1].source_file_id]
+        # Повторный запуск без redo не создает новых версий
+        assert color_correct_order(order, workers=1, echo=lambda message: None) == (0, 0)
+
+def test_broken_file_fails_alone(app, create_order):
+    order_id = create_order('Цветокоррекция', [_dull_photo(), _dull_photo()])
+    with app.app_context():
+        order = db.session.get(Order, order_id)
+        broken = min(order.files, key=lambda f: f.id)
+        with open(f"{app.config['UPLOAD_FOLDER']}/{broken.filename}", 'wb') as f:
+            f.write(b'\xff\xd8\xff\xe0' + b'not a jpeg' * 100)
+        assert color_correct_order(order, workers=1, echo=lambda message: None) == (1, 1)
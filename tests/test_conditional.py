@@ -0,0 +1,47 @@
+from PIL import Image
+
+def _viewer(login, username, password):
+    """Клиент после входа: пока сообщение о входе не показано, ответы не кешируются, поэтому сначала открываем главную"""
+    client = login(username, password)
+    assert 'ETag' not in client.get('/api/orders').headers
+    client.get('/', follow_redirects=True)
+    return client
+
+def _revalidate(client, url):
+    """(ответ на первый запрос, ответ на повтор с его ETag)"""
+    first = client.get(url)
+    assert first.status_code == 200 and first.headers['ETag']
+    return first, client.get(url, headers={'If-None-Match': first.headers['ETag']})
+
+def test_unchanged_order_page_and_api_answer_304(app, create_order, login):
+    order_id = create_order('Печать фото 10x15', [Image.new('RGB', (300, 200), (10, 200, 30))])
+    client = _viewer(login, 'client', 'client123')
+    for url in (f'/order/{order_id}', '/api/orders'):
+        first, second = _revalidate(client, url)
+        assert second.status_code == 304
+        assert second.headers['ETag'] == first.headers['ETag']
+        assert second.data == b''
+
+def test_status_change_and_new_order_change_etag(app, create_order, login):
+    order_id = create_order('Печать фото 10x15', [Image.new('RGB', (300, 200), (10, 200, 30))])
+    client = _viewer(login, 'client', 'client123')
+    page, api = client.get(f'/order/{order_id}'), client.get('/api/orders')
+
+    admin = _viewer(login, 'admin', 'admin123')
+    assert admin.post(f'/update_order_status/{order_id}', json={'status': 'processing'}).status_code == 200
+    response = client.get(f'/order/{order_id}', headers={'If-None-Match': page.headers['ETag']})
+    assert response.status_code == 200 and response.headers['ETag'] != page.headers['ETag']
+    response = client.get('/api/orders', headers={'If-None-Match': api.headers['ETag']})
+    assert response.status_code == 200 and response.json[0]['status'] == 'processing'
+
+    api = client.get('/api/orders')
+    create_order('Печать фото 10x15', [Image.new('RGB', (300, 200), (200, 10, 30))])
+    response = client.get('/api/orders', headers={'If-None-Match': api.headers['ETag']})
+    assert response.status_code == 200 and len(response.json) == 2
+
+def test_etag_depends_on_viewer(app, create_order, login):
+    order_id = create_order('Печать фото 10x15', [Image.new('RGB', (300, 200), (10, 200, 30))])
+    etag = _viewer(login, 'client', 'client123').get(f'/order/{order_id}').headers['ETag']
+    # Страница сотрудника с теми же данными другая (кнопки, меню) - чужой ETag не подходит
+    response = _viewer(login, 'admin', 'admin123').get(f'/order/{order_id}', headers={'If-None-Match': etag})
+    assert response.status_code == 200
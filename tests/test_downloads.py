@@ -0,0 +1,52 @@
+import io
+import zipfile
+
+from PIL import Image
+from werkzeug.security import generate_password_hash
+
+from photolab.extensions import db
+from photolab.models import User
+
+def _zip_url(create_order):
+    order_id = create_order('Печать фото 10x15', [Image.new('RGB', (300, 200), (10, 200, 30)),
+                                                 Image.new('RGB', (300, 200), (200, 10, 30))])
+    return f'/orders/files.zip?order_id={order_id}'
+
+def test_zip_contains_order_files(app, create_order, login):
+    url = _zip_url(create_order)
+    response = login('client', 'client123').get(url)
+    assert response.status_code == 200 and response.headers['Accept-Ranges'] == 'bytes'
+    assert int(response.headers['Content-Length']) == len(response.data)
+    with zipfile.ZipFile(io.BytesIO(response.data)) as archive:
+        assert archive.testzip() is None
+        names = archive.namelist()
+    assert len(names) == 2 and all(name.endswith(('/photo0.jpg', '/photo1.jpg')) for name in names)
+
+def test_zip_range_resumes_download(app, create_order, login):
+    client = login('client', 'client123')
+    url = _zip_url(create_order)
+    full = client.get(url)
+    size = len(full.data)
+
+    response = client.get(url, headers={'Range': 'bytes=100-', 'If-Range': full.headers['ETag']})
+    assert response.status_code == 206
+    assert response.headers['Content-Range'] == f'bytes 100-{size - 1}/{size}'
+    assert response.data == full.data[100:]
+
+    response = client.get(url, headers={'Range': 'bytes=10-19'})
+    assert response.status_code == 206 and response.data == full.data[10:20]
+    assert client.get(url, headers={'Range': f'bytes={size}-'}).status_code == 416
+    # Архив изменился (другой ETag в If-Range) - докачка невозможна, отдается целиком
+    response = client.get(url, headers={'Range': 'bytes=100-', 'If-Range': '"stale"'})
+    assert response.status_code == 200 and response.data == full.data
+    assert client.get(url, headers={'If-None-Match': full.headers['ETag']}).status_code == 304
+
+def test_zip_of_foreign_order_is_denied(app, create_order, login):
+    url = _zip_url(create_order)
+    with app.app_context():
+        db.session.add(User(username='other', email='other@example.com',
+                            password_hash=generate_password_hash('other123'), role='client'))
+        db.session.commit()
+    response = login('other', 'other123').get(url)
+    assert response.status_code == 302 and response.mimetype != 'application/zip'
+    assert login('admin', 'admin123').get(url).status_code == 200
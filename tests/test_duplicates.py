@@ -0,0 +1,87 @@
+import io
+from datetime import datetime, timedelta
+
+import numpy as np
+from PIL import Image
+from werkzeug.security import generate_password_hash
+
+from photolab.duplicates import MAX_DISTANCE, backfill_hashes, dhash, find_duplicates, hash_chunks
+from photolab.extensions import db
+from photolab.models import Order, OrderFile, Service, User
+
+def _photo(seed, size=(640, 480)):
+    """Снимок с крупными плавными пятнами - у однотонной картинки все биты dHash нулевые"""
+    noise = np.random.default_rng(seed).integers(0, 256, (12, 16, 3), dtype=np.uint8)
+    return Image.fromarray(noise).resize(size, Image.Resampling.BICUBIC)
+
+def _save(target, image, quality=95):
+    """Сохраняет снимок в JPEG по пути или в открытый файл; возвращает target"""
+    image.save(target, 'JPEG', quality=quality)
+    if hasattr(target, 'seek'):
+        target.seek(0)
+    return target
+
+def test_dhash_matches_resized_and_recompressed_copy(tmp_path):
+    original = dhash(_save(tmp_path / 'original.jpg', _photo(1)))
+    resized = dhash(_save(tmp_path / 'resized.jpg', _photo(1).resize((320, 240))))
+    recompressed = dhash(_save(tmp_path / 'recompressed.jpg', _photo(1), quality=40))
+    other = dhash(_save(tmp_path / 'other.jpg', _photo(2)))
+    assert (original ^ resized).bit_count() <= MAX_DISTANCE
+    assert (original ^ recompressed).bit_count() <= MAX_DISTANCE
+    assert (original ^ other).bit_count() > MAX_DISTANCE
+    assert dhash(tmp_path / 'missing.jpg') is None
+
+def _order_of(app, username, image):
+    """Заказ через форму под учетной записью username; возвращает id заказа"""
+    client = app.test_client()
+    client.post('/login', data={'username': username, 'password': f'{username}123'})
+    with app.app_context():
+        service_id = Service.query.filter_by(name='Печать фото 10x15').one().id
+    client.post('/create_order', data={'service_id': service_id, 'quantity': 1,
+                                       'files': [(_save(io.BytesIO(), image), 'photo.jpg')]},
+                content_type='multipart/form-data')
+    with app.app_context():
+        return db.session.scalar(db.select(db.func.max(Order.id)))
+
+def _add_client(app, username):
+    with app.app_context():
+        db.session.add(User(username=username, email=f'{username}@example.com',
+                            password_hash=generate_password_hash(f'{username}123'), role='client'))
+        db.session.commit()
+
+def test_repeated_upload_of_same_customer_is_found(app):
+    _add_client(app, 'other')
+    first = _order_of(app, 'client', _photo(1))
+    _order_of(app, 'other', _photo(1))
+    repeated = _order_of(app, 'client', _photo(1).resize((320, 240)))
+    unrelated = _order_of(app, 'client', _photo(2))
+    with app.app_context():
+        original = db.session.get(Order, first)
+        # Сравнивается только с более ранними файлами: оригинал повтором не считается
+        assert find_duplicates(original) == {}
+        assert find_duplicates(db.session.get(Order, unrelated)) == {}
+
+        order = db.session.get(Order, repeated)
+        matches = find_duplicates(order)
+        assert list(matches) == [order.files[0].id]
+        # Такой же снимок другого клиента в предупреждение не попадает
+        assert [(match['id'], match['order_number']) for match in matches[order.files[0].id]] == \
+            [(original.files[0].id, original.order_number)]
+
+def test_backfill_hashes_marks_later_repeat(app):
+    first = _order_of(app, 'client', _photo(1))
+    repeated = _order_of(app, 'client', _photo(1))
+    stale = datetime.utcnow() - timedelta(days=1)
+    with app.app_context():
+        # Первый файл загружен до появления хешей
+        db.session.execute(db.update(OrderFile).where(OrderFile.order_id == first).values(**hash_chunks(None)))
+        db.session.execute(db.update(Order).values(updated_at=stale))
+        db.session.commit()
+        assert find_duplicates(db.session.get(Order, repeated)) == {}
+
+        assert backfill_hashes(workers=1, echo=lambda message: None) == (1, 0)
+        assert backfill_hashes(workers=1, echo=lambda message: None) == (0, 0)
+        # Повтор теперь виден, и у его заказа новая версия - иначе страница осталась бы в кеше
+        order = db.session.get(Order, repeated)
+        assert len(find_duplicates(order)) == 1
+        assert order.updated_at > stale and db.session.get(Order, first).updated_at > stale
@@ -0,0 +1,43 @@
+from photolab.extensions import db
+from photolab.models import DailyOrderStats, Order, OrderStatusEvent
+from photolab.orders import rebuild_daily_stats, set_order_status
+
+def _stats():
+    rows = db.session.execute(db.select(DailyOrderStats.day, DailyOrderStats.service_id, DailyOrderStats.status,
+                                        DailyOrderStats.order_count, DailyOrderStats.quantity)
+                              .where(DailyOrderStats.order_count != 0))
+    return sorted(map(tuple, rows))
+
+def test_daily_stats_follow_repeated_status_changes(app, create_order):
+    order_id = create_order('Печать фото 10x15', [], quantity=3)
+    with app.app_context():
+        order = db.session.get(Order, order_id)
+        for status in ['processing', 'ready', 'processing', 'processing', 'completed', 'cancelled']:
+            set_order_status(order, status)
+            db.session.commit()
+        
+        incremental = _stats()
+        rebuild_daily_stats()
+        assert incremental == _stats()
+        assert [row[2:] for row in incremental] == [('cancelled', 1, 3)]
+        assert OrderStatusEvent.query.filter_by(order_id=order_id).count() == 6
+
+def test_concurrent_transition_is_counted_once(app, create_order):
+    order_id = create_order('Печать фото 10x15', [], quantity=2)
+    with app.app_context():
+        order = db.session.get(Order, order_id)
+        # Другой запрос уже перевел заказ в работу, у этого в памяти прежний статус
+        with db.engine.begin() as connection:
+            connection.execute(db.text('UPDATE "order" SET status = :status WHERE id = :id'),
+                               {'status': 'processing', 'id': order_id})
+            connection.execute(db.text("UPDATE daily_order_stats SET status = 'processing'"))
+        assert order.status == 'pending'
+        
+        assert set_order_status(order, 'processing') is False
+        db.session.commit()
+        assert order.status == 'processing'
+        assert [row[2:] for row in _stats()] == [('processing', 1, 2)]
+        
+        assert set_order_status(order, 'ready') is True
+        db.session.commit()
+        assert [row[2:] for row in _stats()] == [('ready', 1, 2)]
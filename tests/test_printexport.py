@@ -0,0 +1,53 @@
+import os
+
+from PIL import Image, ImageCms
+
+from photolab.extensions import db
+from photolab.models import Order
+from photolab.printexport import export_prints, processing_print_orders
+
+def _processing_order(app, create_order, images):
+    order_id = create_order('Печать фото 10x15', images)
+    with app.app_context():
+        db.session.get(Order, order_id).status = 'processing'
+        db.session.commit()
+    return order_id
+
+def _photo(color=(200, 120, 60)):
+    return Image.new('RGB', (600, 400), color)
+
+def test_file_errors_do_not_stop_export(app, create_order):
+    blocked = _processing_order(app, create_order, [_photo(), _photo()])
+    mixed = _processing_order(app, create_order, [_photo(), _photo()])
+    with app.app_context():
+        # Папку заказа нельзя создать: на ее месте файл
+        blocked_order = db.session.get(Order, blocked)
+        os.makedirs(app.config['EXPORT_FOLDER'], exist_ok=True)
+        open(os.path.join(app.config['EXPORT_FOLDER'], blocked_order.order_number), 'w').close()
+        # Один снимок заказа не декодируется
+        broken = min(db.session.get(Order, mixed).files, key=lambda f: f.id)
+        with open(os.path.join(app.config['UPLOAD_FOLDER'], broken.filename), 'wb') as f:
+            f.write(b'\xff\xd8\xff\xe0' + b'broken' * 100)
+        
+        counts = export_prints(processing_print_orders(), workers=1, echo=lambda message: None)
+        
+        assert counts == {'exported': 1, 'skipped': 0, 'failed': 3}
+        mixed_folder = os.path.join(app.config['EXPORT_FOLDER'], db.session.get(Order, mixed).order_number)
+        assert len(os.listdir(mixed_folder)) == 1
+        assert not [name for name in os.listdir(mixed_folder) if name.endswith('.part')]
+
+def test_other_profile_exports_again(app, create_order, tmp_path):
+    _processing_order(app, create_order, [_photo()])
+    profile = tmp_path / 'printer.icc'
+    profile.write_bytes(ImageCms.ImageCmsProfile(ImageCms.createProfile('sRGB')).tobytes())
+    with app.app_context():
+        def export(icc_profile=None):
+            return export_prints(processing_print_orders(), icc_profile=icc_profile, workers=1,
+                                 echo=lambda message: None)
+        
+        assert export()['exported'] == 1
+        assert export()['skipped'] == 1
+        assert export(str(profile))['exported'] == 1
+        assert export(str(profile))['skipped'] == 1
+        app.config['EXPORT_RENDERING_INTENT'] = 'relative'
+        assert export(str(profile))['exported'] == 1
@@ -0,0 +1,27 @@
+def test_form_pages_do_not_spend_submissions(app):
+    app.config['RATELIMIT_RULES'] = {'login': (2, 60, ('POST',))}
+    client = app.test_client()
+    for _ in range(5):
+        assert client.get('/login').status_code == 200
+    
+    credentials = {'username': 'client', 'password': 'wrong'}
+    assert client.post('/login', data=credentials).status_code == 200
+    assert client.post('/login', data=credentials).status_code == 200
+    response = client.post('/login', data=credentials)
+    assert response.status_code == 429
+    assert int(response.headers['Retry-After']) >= 1
+
+def test_rule_without_methods_counts_every_request(app, login):
+    app.config['RATELIMIT_RULES'] = {'api_orders': (2, 60)}
+    client = login('client', 'client123')
+    responses = [client.get('/api/orders') for _ in range(3)]
+    assert [response.status_code for response in responses] == [200, 200, 429]
+    assert responses[1].headers['X-RateLimit-Remaining'] == '0'
+    assert 'error' in responses[2].json
+
+def test_limits_are_per_user(app, login):
+    app.config['RATELIMIT_RULES'] = {'api_orders': (1, 60)}
+    first, second = login('client', 'client123'), login('admin', 'admin123')
+    assert first.get('/api/orders').status_code == 200
+    assert first.get('/api/orders').status_code == 429
+    assert second.get('/api/orders').status_code == 200
@@ -0,0 +1,62 @@
+from datetime import datetime, timedelta
+
+from PIL import Image
+
+from photolab.extensions import db
+from photolab.models import ArchivedOrder, ArchivedOrderFile, Order, OrderFile
+from photolab.retention import archive_orders
+
+def _orders(app, create_order, count, completed_days_ago=400):
+    """count завершенных давно заказов и за ними свежий, который архив не трогает"""
+    ids = [create_order('Печать фото 10x15', [Image.new('RGB', (300, 200), (shade, 100, 30))])
+           for shade in range(0, 50 * count, 50)]
+    create_order('Печать фото 10x15', [Image.new('RGB', (300, 200), (250, 250, 250))])
+    with app.app_context():
+        for order_id in ids:
+            order = db.session.get(Order, order_id)
+            order.status = 'completed'
+            order.completed_at = datetime.utcnow() - timedelta(days=completed_days_ago)
+        db.session.commit()
+    return ids
+
+def test_archive_moves_orders_in_batches(app, create_order):
+    ids = _orders(app, create_order, 3)
+    messages = []
+    with app.app_context():
+        assert archive_orders(days=365, dry_run=True, echo=messages.append) == (3, 0)
+        assert messages == [] and Order.query.count() == 4
+
+        assert archive_orders(days=365, batch_size=2, echo=messages.append) == (3, 3)
+        # Каждая порция - своя транзакция со своей строкой прогресса
+        assert messages == ['Перенесено в архив: 2 заказов, 2 файлов', 'Перенесено в архив: 3 заказов, 3 файлов']
+        assert [order.id for order in ArchivedOrder.query.order_by(ArchivedOrder.id)] == ids
+        assert ArchivedOrderFile.query.count() == 3
+        assert Order.query.count() == 1 and OrderFile.query.count() == 1
+        assert archive_orders(days=365, echo=messages.append) == (0, 0)
+
+def test_archive_respects_age_and_limit(app, create_order):
+    _orders(app, create_order, 2, completed_days_ago=30)
+    with app.app_context():
+        assert archive_orders(days=365, echo=lambda message: None) == (0, 0)
+        assert archive_orders(days=7, limit=1, echo=lambda message: None) == (1, 1)
+
+def test_archived_order_is_a_tombstone_in_feed(app, create_order, login):
+    order_id, = _orders(app, create_order, 1)
+    client = login('client', 'client123')
+    feed = client.get('/api/orders/changes?since=0').json
+    seq = next(order['change_seq'] for order in feed['orders'] if order['id'] == order_id)
+
+    with app.app_context():
+        archive_orders(days=365, echo=lambda message: None)
+    changed = client.get(f'/api/orders/changes?since={feed["cursor"]}').json
+    assert [(order['id'], order['archived']) for order in changed['orders']] == [(order_id, True)]
+    assert changed['orders'][0]['change_seq'] > seq
+
+def test_archived_order_page_only_on_request(app, create_order, login):
+    order_id, = _orders(app, create_order, 1)
+    with app.app_context():
+        archive_orders(days=365, echo=lambda message: None)
+    client = login('client', 'client123')
+    assert client.get(f'/order/{order_id}').status_code == 404
+    response = client.get(f'/order/{order_id}?archive=1')
+    assert response.status_code == 200 and 'photo0.jpg' in response.text
@@ -0,0 +1,39 @@
+from datetime import datetime, timedelta
+
+from photolab.extensions import db
+from photolab.models import Order, Service, User
+from photolab.scheduling import build_production_queue
+
+NOW = datetime(2026, 1, 5, 9, 0)
+
+def _order(number, service, due_hours):
+    customer = User.query.filter_by(username='client').one()
+    return Order(order_number=f'T{number:04d}', customer_id=customer.id, service_id=service.id, status='pending',
+                 quantity=1, total_price=service.price, due_date=NOW + timedelta(hours=due_hours),
+                 created_at=NOW - timedelta(hours=1))
+
+def test_batches_use_lanes_of_their_category(app):
+    app.config['PRODUCTION_BATCH_SIZE'] = 1
+    app.config['PRODUCTION_LANES'] = {'printing': 2, 'editing': 1}
+    with app.app_context():
+        printing = Service(name='Печать', price=10, processing_time=4, category='printing')
+        editing = Service(name='Ретушь', price=100, processing_time=10, category='editing')
+        db.session.add_all([printing, editing])
+        db.session.flush()
+        db.session.add_all([
+            _order(1, printing, 5), _order(2, printing, 6), _order(3, printing, 9),
+            _order(4, editing, 12), _order(5, editing, 15),
+        ])
+        db.session.commit()
+        
+        batches = build_production_queue(now=NOW)
+    
+    schedule = {batch['orders'][0].order_number: batch for batch in batches}
+    hours = {number: (batch['estimated_start'] - NOW) / timedelta(hours=1) for number, batch in schedule.items()}
+    # Две линии печати: первые две партии начинаются сразу, третья - когда освободится первая линия
+    assert hours == {'T0001': 0, 'T0002': 0, 'T0003': 4, 'T0004': 0, 'T0005': 10}
+    assert schedule['T0001']['lane'] != schedule['T0002']['lane']
+    assert schedule['T0003']['lane'] == schedule['T0001']['lane']
+    # Ретушь не ждет печать и успевает к сроку, а вторая партия ретуши ждет первую на единственной линии
+    assert schedule['T0003']['estimated_finish'] == NOW + timedelta(hours=8)
+    assert [number for number, batch in schedule.items() if batch['late']] == ['T0005']
@@ -0,0 +1,23 @@
+from werkzeug.test import Client
+
+from photolab import cli
+
+def test_serve_does_not_share_cli_app_context(app, monkeypatch):
+    """Sync-воркер gunicorn обслуживает запросы в главном потоке: контекст CLI не должен в него попадать"""
+    statuses = []
+    
+    def fake_gunicorn(served_app, *args):
+        # Запросы идут так же, как в воркере после fork: в том же потоке, где запущен сервер
+        admin, anonymous = Client(served_app), Client(served_app)
+        admin.post('/login', data={'username': 'admin', 'password': 'admin123'})
+        statuses.append(admin.get('/admin_dashboard').status_code)
+        response = anonymous.get('/admin_dashboard')
+        statuses.append((response.status_code, response.headers.get('Location')))
+    
+    monkeypatch.setattr(cli, '_serve_gunicorn', fake_gunicorn)
+    result = app.test_cli_runner().invoke(args=['serve', '--server', 'gunicorn', '--workers', '1', '--threads', '1'])
+    
+    assert result.exit_code == 0, result.output
+    assert statuses[0] == 200
+    assert statuses[1][0] == 302
+    assert statuses[1][1].startswith('/login')
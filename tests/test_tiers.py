@@ -0,0 +1,49 @@
+from datetime import datetime, timedelta
+
+from PIL import Image
+
+from photolab.extensions import db
+from photolab.models import ArchivedOrderFile, Order, OrderFile
+from photolab.retention import archive_orders
+from photolab.tiers import archive_files
+
+def _old_completed_order(app, create_order):
+    order_id = create_order('Печать фото 10x15', [Image.new('RGB', (300, 200), (10, 200, 30))])
+    # Самый новый заказ архив не трогает, поэтому за ним создается еще один
+    create_order('Печать фото 10x15', [Image.new('RGB', (300, 200), (200, 10, 30))])
+    with app.app_context():
+        order = db.session.get(Order, order_id)
+        order.status = 'completed'
+        order.completed_at = datetime.utcnow() - timedelta(days=400)
+        db.session.commit()
+        assert archive_files(echo=lambda message: None)[0] == 1
+        return order_id, order.files[0].filename
+
+def test_only_owner_or_staff_restores_cold_file(app, create_order, login):
+    order_id, filename = _old_completed_order(app, create_order)
+    
+    def tier():
+        with app.app_context():
+            return OrderFile.query.filter_by(filename=filename).one().storage_tier
+    
+    assert app.test_client().get(f'/uploads/{filename}').status_code == 404
+    assert tier() == 'cold'
+    response = login('client', 'client123').get(f'/uploads/{filename}')
+    assert response.status_code == 200
+    response.close()
+    assert tier() == 'hot'
+
+def test_restored_file_of_archived_order_goes_back_to_cold(app, create_order, login):
+    order_id, filename = _old_completed_order(app, create_order)
+    with app.app_context():
+        assert archive_orders(days=365, echo=lambda message: None) == (1, 1)
+    
+    response = login('admin', 'admin123').get(f'/uploads/{filename}')
+    assert response.status_code == 200
+    response.close()
+    with app.app_context():
+        assert ArchivedOrderFile.query.filter_by(filename=filename).one().storage_tier == 'hot'
+        # Только что возвращенный файл остается на диске, пока не пройдет срок
+        assert archive_files(echo=lambda message: None)[0] == 0
+        assert archive_files(days=0, echo=lambda message: None)[0] == 1
+        assert ArchivedOrderFile.query.filter_by(filename=filename).one().storage_tier == 'cold'
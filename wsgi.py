@@ -0,0 +1,4 @@
+"""WSGI-точка входа для внешних серверов: gunicorn wsgi:application, waitress-serve wsgi:application"""
+from photolab import create_app
+
+application = create_app()